@@ -0,0 +1,43 @@
+"""
+Compares the size and the save and load times of plain and compressed
+snapshots, in the records and the columnar layout.
+
+Run from the repository root:
+    python -m benchmarks.bench_compressed_snapshots [count]
+"""
+import os
+import sys
+import tempfile
+import time
+from benchmarks.bench_json_profiles import make_data
+from data_handler import DataHandler
+
+
+def main(count: int):
+    data = make_data(count)
+    print(f"{count} products")
+    print(f"{'file':>14} {'layout':>9} {'size MB':>8} {'ratio':>6} "
+          f"{'save s':>7} {'load s':>7} {'stream s':>8}")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        plain_size = None
+        for extension in ("", ".gz", ".xz"):
+            for layout in DataHandler.LAYOUTS:
+                filename = os.path.join(tmpdir, "data.json" + extension)
+                start = time.perf_counter()
+                DataHandler.save_to_json_file(data, filename, layout=layout)
+                saved = time.perf_counter()
+                DataHandler.load_from_json_file(filename)
+                loaded = time.perf_counter()
+                for _ in DataHandler.iter_json_records(filename):
+                    pass
+                streamed = time.perf_counter()
+                size = os.path.getsize(filename)
+                plain_size = plain_size or size
+                print(f"{os.path.basename(filename):>14} {layout:>9} "
+                      f"{size / 1e6:>8.2f} {plain_size / size:>6.1f} "
+                      f"{saved - start:>7.2f} {loaded - saved:>7.2f} "
+                      f"{streamed - loaded:>8.2f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
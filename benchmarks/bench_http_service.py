@@ -0,0 +1,124 @@
+"""
+Load test of the local HTTP service. Starts an InventoryHTTPServer with
+generated products in a child process, then runs each scenario with
+several clients on kept-alive connections and reports the requests per
+second and the latency percentiles.
+
+Run from the repository root:
+    python -m benchmarks.bench_http_service [clients] [seconds] [products]
+"""
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from benchmarks.bench_json_profiles import make_data
+
+
+def serve(count: int, directory: str, ports: multiprocessing.Queue):
+    """Serves an inventory of count products until the process ends."""
+    from inventory.http_service import InventoryHTTPServer
+    from inventory.inventory_manager import InventoryManager
+    # The log file of the inventory goes to a scratch directory
+    os.chdir(directory)
+    data = make_data(count)
+    for product in data["products"]:
+        product["quantity"] = 1 << 30
+    inventory = InventoryManager()
+    inventory.load_data_from_json(data)
+    server = InventoryHTTPServer(("127.0.0.1", 0), inventory)
+    ports.put(server.server_address[1])
+    server.serve_forever()
+
+
+def scenarios(count: int) -> list[tuple]:
+    """Returns (name, operations per request, request factory) triples,
+    a factory returns a (method, path, body) triple."""
+    def product_id():
+        return random.randint(1, count)
+
+    return [
+        ("get product", 1,
+         lambda: ("GET", f"/products/{product_id()}", None)),
+        ("adjust stock", 1,
+         lambda: ("POST", f"/products/{product_id()}/stock", {"delta": -1})),
+        ("50 movements", 50,
+         lambda: ("POST", "/stock", {"movements": [
+             [product_id(), -1] for _ in range(50)]})),
+        ("batch of 50 gets", 50,
+         lambda: ("POST", "/batch", {"requests": [
+             {"path": f"/products/{product_id()}"} for _ in range(50)]})),
+        ("total value", 1, lambda: ("GET", "/value", None)),
+    ]
+
+
+def run_client(port: int, make_request, deadline: float,
+               latencies: list):
+    """Sends requests on one connection until the deadline."""
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+    headers = {"Content-Type": "application/json"}
+    while time.perf_counter() < deadline:
+        method, path, body = make_request()
+        content = json.dumps(body) if body is not None else None
+        start = time.perf_counter()
+        connection.request(method, path, content, headers)
+        response = connection.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - start)
+        if response.status >= 400:
+            raise RuntimeError(f"{method} {path} failed with "
+                               f"{response.status}.")
+    connection.close()
+
+
+def percentile(values: list[float], share: float) -> float:
+    """Returns the value below which the given share of values lies."""
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * share), len(ordered) - 1)]
+
+
+def main(clients: int, seconds: float, count: int):
+    directory = tempfile.TemporaryDirectory()
+    ports = multiprocessing.Queue()
+    server = multiprocessing.Process(target=serve,
+                                     args=(count, directory.name, ports),
+                                     daemon=True)
+    server.start()
+    port = ports.get(timeout=60)
+    print(f"{count} products, {clients} clients, {seconds} s per scenario")
+    print(f"{'scenario':>18} {'requests/s':>11} {'ops/s':>9} "
+          f"{'p50 ms':>7} {'p99 ms':>7}")
+    try:
+        for name, operations, make_request in scenarios(count):
+            deadline = time.perf_counter() + seconds
+            latencies = [[] for _ in range(clients)]
+            threads = [threading.Thread(
+                target=run_client,
+                args=(port, make_request, deadline, latencies[client]))
+                for client in range(clients)]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+            merged = [latency for client in latencies for latency in client]
+            rate = len(merged) / elapsed
+            print(f"{name:>18} {rate:>11.0f} {rate * operations:>9.0f} "
+                  f"{percentile(merged, 0.5) * 1000:>7.2f} "
+                  f"{percentile(merged, 0.99) * 1000:>7.2f}")
+    finally:
+        server.terminate()
+        server.join()
+        directory.cleanup()
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if len(args) > 0 else 8,
+         float(args[1]) if len(args) > 1 else 3.0,
+         int(args[2]) if len(args) > 2 else 10_000)
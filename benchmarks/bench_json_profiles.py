@@ -0,0 +1,61 @@
+"""
+Compares save and load throughput of the JSON serialization profiles of
+DataHandler for inventories of different sizes.
+
+Run from the repository root:
+    python -m benchmarks.bench_json_profiles [count ...]
+"""
+import os
+import sys
+import tempfile
+import time
+from data_handler import DataHandler
+
+
+def make_data(count: int) -> dict:
+    """Returns an exported inventory with count products."""
+    now = time.time()
+    return {
+        "categories": [{"id": cat_id, "name": f"Category {cat_id}"}
+                       for cat_id in range(1, 21)],
+        "products": [{"id": product_id,
+                      "name": f"Product {product_id}",
+                      "price": round(product_id * 0.37 % 1000, 2),
+                      "quantity": product_id % 500,
+                      "category_id": product_id % 20 + 1,
+                      "date_added": now - product_id,
+                      "last_modified": now,
+                      "description": "Lorem ipsum dolor sit amet"}
+                     for product_id in range(1, count + 1)],
+        "sequences": {"product": count + 1, "category": 21},
+    }
+
+
+def measure(data: dict, filename: str, profile: str) -> tuple:
+    """Returns the seconds to save and to load data, and the file size."""
+    start = time.perf_counter()
+    DataHandler.save_to_json_file(data, filename, profile=profile)
+    saved = time.perf_counter()
+    DataHandler.load_from_json_file(filename, profile=profile)
+    loaded = time.perf_counter()
+    return saved - start, loaded - saved, os.path.getsize(filename)
+
+
+def main(counts: list[int]):
+    print(f"fast profile uses {DataHandler.fast_json_library()}")
+    print(f"{'products':>10} {'profile':>8} {'size MB':>8} "
+          f"{'save s':>8} {'save MB/s':>10} {'load s':>8} {'load MB/s':>10}")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filename = os.path.join(tmpdir, "data.json")
+        for count in counts:
+            data = make_data(count)
+            for profile in DataHandler.PROFILES:
+                save, load, size = measure(data, filename, profile)
+                megabytes = size / 1e6
+                print(f"{count:>10} {profile:>8} {megabytes:>8.1f} "
+                      f"{save:>8.3f} {megabytes / save:>10.1f} "
+                      f"{load:>8.3f} {megabytes / load:>10.1f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000])
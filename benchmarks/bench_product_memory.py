@@ -0,0 +1,54 @@
+"""
+Measures the memory used per Product, compared with the same fields
+stored in a regular class with a per-instance __dict__.
+
+Run from the repository root:
+    python -m benchmarks.bench_product_memory [count]
+"""
+import sys
+import tracemalloc
+from inventory.product import Product
+
+
+class DictProduct:
+    """Product layout without __slots__, as a baseline."""
+
+    def __init__(self, id, name, price, quantity, date_added, last_modified,
+                 category_id=0, description=''):
+        self.__id = id
+        self.__name = name
+        self.__price = price
+        self.__quantity = quantity
+        self.__category_id = category_id
+        self.__date_added = date_added
+        self.__last_modified = last_modified
+        self.__description = description
+        self.__watcher = None
+
+
+def bytes_per_product(cls, count: int) -> float:
+    """Returns the memory allocated per instance of cls. Names and
+    descriptions are shared by all instances and not counted."""
+    name, description = "Product", "Description"
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    products = [cls(id=i + 1, name=name, price=9.99, quantity=1,
+                    date_added=1734447720.0, last_modified=1734447720.0,
+                    category_id=1, description=description)
+                for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # The list itself holds one pointer per product
+    list_size = sys.getsizeof(products)
+    return (after - before - list_size) / count
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(f"Bytes per product over {count} products:")
+    for label, cls in (("__dict__", DictProduct), ("__slots__", Product)):
+        print(f"  {label:<10}{bytes_per_product(cls, count):8.1f}")
+
+
+if __name__ == "__main__":
+    main()
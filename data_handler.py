@@ -1,34 +1,492 @@
+import contextlib
+import gzip
+import hashlib
 import json
+import lzma
 import os
+import re
+import shutil
+import tempfile
+
+# Faster JSON libraries are optional, the fast profile falls back to the
+# standard library without them
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import ujson
+except ImportError:
+    ujson = None
 
 class DataHandler:
     """Handles loading and saving data to and from JSON files."""
 
+    # Serialization profiles: "pretty" is indented for reading, "compact"
+    # has no whitespace, "fast" is compact and uses orjson or ujson if
+    # one of them is installed
+    PROFILES: tuple[str, ...] = ("pretty", "compact", "fast")
+    # Layouts of lists of records: "records" stores every record as an
+    # object, "columnar" stores one list of values per key
+    LAYOUTS: tuple[str, ...] = ("records", "columnar")
+    # Number of list elements serialized per write
+    WRITE_BATCH: int = 1000
+
+    @staticmethod
+    def fast_json_library() -> str:
+        """Returns the name of the library used by the fast profile."""
+        if orjson is not None:
+            return "orjson"
+        if ujson is not None:
+            return "ujson"
+        return "json"
+
+    @staticmethod
+    def _check_profile(profile: str):
+        if profile not in DataHandler.PROFILES:
+            raise ValueError(f"Invalid profile '{profile}', expected one "
+                             f"of {', '.join(DataHandler.PROFILES)}.")
+
+    @staticmethod
+    def dumps(data, profile: str = "fast") -> bytes:
+        """Serializes data to UTF-8 encoded JSON with the given profile."""
+        DataHandler._check_profile(profile)
+        if profile == "pretty":
+            return json.dumps(data, indent=4).encode("utf-8")
+        if profile == "fast":
+            if orjson is not None:
+                try:
+                    return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+                except TypeError:
+                    # e.g. integers beyond 64 bits, the stdlib handles them
+                    pass
+            elif ujson is not None:
+                return ujson.dumps(data, ensure_ascii=False).encode("utf-8")
+        return json.dumps(data, separators=(",", ":"),
+                          ensure_ascii=False).encode("utf-8")
+
+    @staticmethod
+    def loads(content, profile: str = "fast"):
+        """Deserializes JSON text or UTF-8 bytes. The fast profile uses
+        orjson or ujson if one of them is installed."""
+        DataHandler._check_profile(profile)
+        if profile == "fast":
+            if orjson is not None:
+                try:
+                    return orjson.loads(content)
+                except json.JSONDecodeError:
+                    # orjson rejects some valid JSON, like huge integers
+                    pass
+            elif ujson is not None:
+                try:
+                    return ujson.loads(content)
+                except ValueError:
+                    pass
+        return json.loads(content)
+
+    @staticmethod
+    def compression(filename: str) -> str:
+        """Returns "gz" or "xz" if the file is compressed according to its
+        extension, also for numbered backups like data.json.gz.1."""
+        match = re.search(r"\.(gz|xz)(\.\d+)?$", filename)
+        return match.group(1) if match else None
+
+    @staticmethod
+    def open_json_file(filename: str, mode: str = "rb"):
+        """Opens a JSON file for reading, decompressing .gz and .xz
+        files on the fly."""
+        compression = DataHandler.compression(filename)
+        if compression == "gz":
+            return gzip.open(filename, mode,
+                             encoding="utf-8" if "t" in mode else None)
+        if compression == "xz":
+            return lzma.open(filename, mode,
+                             encoding="utf-8" if "t" in mode else None)
+        if "t" in mode:
+            return open(filename, mode.replace("t", ""), encoding="utf-8")
+        return open(filename, mode)
+
+    @staticmethod
+    def _compressor(filename: str, file):
+        """Returns a writer that compresses into file according to the
+        extension of filename."""
+        compression = DataHandler.compression(filename)
+        if compression == "gz":
+            return gzip.GzipFile(filename=os.path.basename(filename),
+                                 mode="wb", fileobj=file, compresslevel=6)
+        if compression == "xz":
+            return lzma.LZMAFile(file, "wb")
+        return contextlib.nullcontext(file)
+
+    @staticmethod
+    def to_columnar(data: dict) -> dict:
+        """
+        Returns data with every list of records that share the same keys
+        stored as one list per key, e.g. {"products": {"id": [1, 2], ...}}.
+        The converted keys are listed under "columnar".
+        """
+        result = {"columnar": []}
+        for key, value in data.items():
+            if (isinstance(value, list) and value
+                    and all(isinstance(record, dict) for record in value)):
+                fields = list(value[0])
+                if all(list(record) == fields for record in value):
+                    result["columnar"].append(key)
+                    value = {field: [record[field] for record in value]
+                             for field in fields}
+            result[key] = value
+        return result
+
+    @staticmethod
+    def _iter_columnar_records(columns: dict):
+        """Yields the records of a columnar list."""
+        fields = list(columns)
+        for values in zip(*columns.values()):
+            yield dict(zip(fields, values))
+
+    @staticmethod
+    def from_columnar(data: dict) -> dict:
+        """Reverses to_columnar, other data is returned unchanged."""
+        if not isinstance(data, dict) or "columnar" not in data:
+            return data
+        result = dict(data)
+        for key in result.pop("columnar"):
+            result[key] = list(
+                DataHandler._iter_columnar_records(result[key]))
+        return result
+
+    @staticmethod
+    def iter_json_chunks(data, profile: str = "fast"):
+        """
+        Serializes data piece by piece and yields UTF-8 encoded chunks, so
+        the whole document is never built in memory. The elements of
+        top-level lists and of columns are serialized in batches.
+        """
+        DataHandler._check_profile(profile)
+        if profile == "pretty" or not isinstance(data, dict):
+            for chunk in json.JSONEncoder(
+                    indent=4 if profile == "pretty" else None,
+                    separators=None if profile == "pretty" else (",", ":"),
+                    ensure_ascii=False).iterencode(data):
+                yield chunk.encode("utf-8")
+            return
+        columnar = data.get("columnar", [])
+        yield b"{"
+        for index, (key, value) in enumerate(data.items()):
+            yield (b"," if index else b"") + DataHandler.dumps(key, profile) \
+                + b":"
+            if key in columnar and key != "columnar":
+                yield b"{"
+                for column, (field, values) in enumerate(value.items()):
+                    yield (b"," if column else b"") \
+                        + DataHandler.dumps(field, profile) + b":"
+                    yield from DataHandler._iter_list_chunks(values, profile)
+                yield b"}"
+            elif isinstance(value, list):
+                yield from DataHandler._iter_list_chunks(value, profile)
+            else:
+                yield DataHandler.dumps(value, profile)
+        yield b"}"
+
+    @staticmethod
+    def _iter_list_chunks(values: list, profile: str):
+        """Yields a JSON list in batches of WRITE_BATCH elements."""
+        yield b"["
+        for start in range(0, len(values), DataHandler.WRITE_BATCH):
+            batch = values[start:start + DataHandler.WRITE_BATCH]
+            # One call per batch, the brackets of the batch are dropped
+            yield (b"," if start else b"") \
+                + DataHandler.dumps(batch, profile)[1:-1]
+        yield b"]"
+
+    @staticmethod
+    def save_to_json_file(data, filename: str, backups: int = 0,
+                          checksum: bool = False, profile: str = "fast",
+                          layout: str = "records"):
+        """
+        Saves data to a JSON file. The data is written to a temporary file
+        that replaces the target only once it is complete on disk, so a
+        crash never leaves a truncated file behind. Files ending with .gz
+        or .xz are compressed while they are written.
+        :param backups: Number of previous versions kept as filename.1
+        (newest) to filename.N.
+        :param checksum: Also write a SHA-256 checksum to filename.sha256,
+        which the loaders use to detect a corrupted file.
+        :param profile: Serialization profile, one of PROFILES.
+        :param layout: Layout of lists of records, one of LAYOUTS.
+        """
+        if not isinstance(backups, int):
+            raise TypeError("Backups must be an integer.")
+        if backups < 0:
+            raise ValueError("Backups must be non-negative.")
+        DataHandler._check_profile(profile)
+        if layout not in DataHandler.LAYOUTS:
+            raise ValueError(f"Invalid layout '{layout}', expected one of "
+                             f"{', '.join(DataHandler.LAYOUTS)}.")
+        if layout == "columnar" and isinstance(data, dict):
+            data = DataHandler.to_columnar(data)
+        directory = os.path.dirname(os.path.abspath(filename))
+        fd, temp_filename = tempfile.mkstemp(
+            dir=directory, prefix=os.path.basename(filename) + ".",
+            suffix=".tmp")
+        try:
+            if os.path.exists(filename):
+                # mkstemp creates the file readable by the owner only
+                shutil.copymode(filename, temp_filename)
+            with open(fd, "wb") as file:
+                with DataHandler._compressor(filename, file) as writer:
+                    for chunk in DataHandler.iter_json_chunks(data, profile):
+                        writer.write(chunk)
+                file.flush()
+                os.fsync(file.fileno())
+            digest = DataHandler._file_checksum(temp_filename) \
+                if checksum else None
+            DataHandler._settle_checksum(filename)
+            if backups and os.path.exists(filename):
+                DataHandler._rotate_backups(filename, backups)
+            if digest:
+                # Written before the file is replaced, verify_checksum
+                # accepts it until it replaces the current checksum
+                DataHandler._write_checksum(filename + ".sha256.new", digest)
+            elif os.path.exists(filename + ".sha256"):
+                # A checksum of an older version would reject this one
+                os.remove(filename + ".sha256")
+            os.replace(temp_filename, filename)
+        except BaseException:
+            if os.path.exists(temp_filename):
+                os.remove(temp_filename)
+            raise
+        if digest:
+            os.replace(filename + ".sha256.new", filename + ".sha256")
+        DataHandler._sync_directory(directory)
+
+    @staticmethod
+    def _rotate_backups(filename: str, backups: int):
+        """Moves filename to filename.1, filename.1 to filename.2 and so
+        on, dropping the oldest backup."""
+        for number in range(backups, 0, -1):
+            source = filename if number == 1 else f"{filename}.{number - 1}"
+            target = f"{filename}.{number}"
+            for suffix in ("", ".sha256"):
+                if os.path.exists(source + suffix):
+                    os.replace(source + suffix, target + suffix)
+                elif os.path.exists(target + suffix):
+                    os.remove(target + suffix)
+
+    @staticmethod
+    def _file_checksum(filename: str) -> str:
+        """Returns the SHA-256 hex digest of a file."""
+        digest = hashlib.sha256()
+        with open(filename, "rb") as file:
+            for chunk in iter(lambda: file.read(1 << 20), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _write_checksum(checksum_filename: str, digest: str):
+        """Writes a checksum file atomically."""
+        temp_filename = checksum_filename + ".tmp"
+        with open(temp_filename, "w", encoding="utf-8") as file:
+            file.write(digest + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_filename, checksum_filename)
+
+    @staticmethod
+    def _read_checksum(checksum_filename: str) -> str:
+        """Returns the digest of a checksum file, or None if it is
+        missing."""
+        try:
+            with open(checksum_filename, "r", encoding="utf-8") as file:
+                return file.read().strip()
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _settle_checksum(filename: str):
+        """Completes or drops the pending checksum of a save that was
+        interrupted, so it does not follow the file into a backup."""
+        pending = DataHandler._read_checksum(filename + ".sha256.new")
+        if pending is None:
+            return
+        if (os.path.exists(filename)
+                and DataHandler._file_checksum(filename) == pending):
+            os.replace(filename + ".sha256.new", filename + ".sha256")
+        else:
+            os.remove(filename + ".sha256.new")
+
     @staticmethod
-    def save_to_json_file(data, filename: str):
-        """Saves data to a JSON file."""
-        with open(filename, "w", encoding="utf-8") as file:
-            json.dump(data, file, indent=4)
-        print(f"Data successfully saved to {filename}.")
+    def _sync_directory(directory: str):
+        """Forces a rename in the directory to disk where supported."""
+        try:
+            fd = os.open(directory, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
 
     @staticmethod
-    def load_from_json_file(filename: str):
-        """Loads data from a JSON file and returns the appropriate structure based on the file type."""
+    def verify_checksum(filename: str) -> bool:
+        """Returns False if the file is missing or does not match its
+        checksum file, True if it matches or has no checksum file. The
+        pending checksum of an interrupted save is accepted as well."""
         if not os.path.exists(filename):
-            print(f"{filename} does not exist. Returning a default structure.")
-            return DataHandler._get_default_structure(filename)
+            return False
+        expected = DataHandler._read_checksum(filename + ".sha256")
+        if expected is None:
+            return True
+        actual = DataHandler._file_checksum(filename)
+        return actual == expected or actual == DataHandler._read_checksum(
+            filename + ".sha256.new")
 
+    @staticmethod
+    def snapshot_candidates(filename: str) -> list[str]:
+        """Returns the existing versions of a file, newest first: the file
+        itself followed by its backups."""
+        candidates = [filename] if os.path.exists(filename) else []
+        number = 1
+        while os.path.exists(f"{filename}.{number}"):
+            candidates.append(f"{filename}.{number}")
+            number += 1
+        return candidates
+
+    @staticmethod
+    def latest_valid_snapshot(filename: str) -> str:
+        """Returns the newest version of a file that matches its checksum,
+        or None if there is none."""
+        for candidate in DataHandler.snapshot_candidates(filename):
+            if DataHandler.verify_checksum(candidate):
+                if candidate != filename:
+                    print(f"{filename} is corrupted. Using {candidate}.")
+                return candidate
+        return None
+
+    @staticmethod
+    def _read_candidate(candidate: str, profile: str):
+        """Returns the parsed data of a version of a file, or None if it
+        cannot be read or decoded."""
         try:
-            with open(filename, "r", encoding="utf-8") as file:
+            with DataHandler.open_json_file(candidate) as file:
                 content = file.read().strip()
-                if not content:
-                    print(f"{filename} is empty. Returning a default structure.")
-                    return DataHandler._get_default_structure(filename)
-                return json.loads(content)
-        except json.JSONDecodeError as e:
-            print(f"Error decoding JSON in {filename}: {e}")
+        except (OSError, EOFError, lzma.LZMAError) as e:
+            # Also truncated or damaged compressed files
+            print(f"Error reading {candidate}: {e}")
+            return None
+        if not content:
+            print(f"{candidate} is empty.")
+            return None
+        try:
+            return DataHandler.from_columnar(
+                DataHandler.loads(content, profile))
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            print(f"Error decoding JSON in {candidate}: {e}")
+            return None
+
+    @staticmethod
+    def load_from_json_file(filename: str, profile: str = "fast"):
+        """Loads data from a JSON file and returns the appropriate structure based on the file type.
+        A corrupted file is skipped in favour of its newest good backup.
+        The fast profile parses with orjson or ujson if one is installed."""
+        DataHandler._check_profile(profile)
+        candidates = DataHandler.snapshot_candidates(filename)
+        if not candidates:
+            print(f"{filename} does not exist. Returning a default structure.")
             return DataHandler._get_default_structure(filename)
 
+        mismatched = []
+        for candidate in candidates:
+            if not DataHandler.verify_checksum(candidate):
+                print(f"Checksum mismatch in {candidate}.")
+                mismatched.append(candidate)
+                continue
+            data = DataHandler._read_candidate(candidate, profile)
+            if data is not None:
+                if candidate != filename:
+                    print(f"Loaded the backup {candidate} instead of "
+                          f"{filename}.")
+                return data
+        # Still better than an empty inventory if only a checksum is wrong
+        for candidate in mismatched:
+            data = DataHandler._read_candidate(candidate, profile)
+            if data is not None:
+                print(f"Loaded {candidate} despite its checksum mismatch.")
+                return data
+        print(f"No readable version of {filename}. Returning a default structure.")
+        return DataHandler._get_default_structure(filename)
+
+    @staticmethod
+    def iter_json_records(filename: str, chunk_size: int = 1 << 16):
+        """
+        Reads a JSON object from a file incrementally and yields its
+        top-level entries as (key, value) pairs. The elements of a
+        top-level list are yielded one by one as (key, element), so the
+        whole file is never held in memory at once. Compressed files are
+        decompressed on the fly, and columnar lists are yielded as records.
+        """
+        if not os.path.exists(filename):
+            print(f"{filename} does not exist. Returning no records.")
+            return
+        columnar = []
+        with DataHandler.open_json_file(filename, "rt") as file:
+            for key, value, _, _ in DataHandler._iter_json_entries(
+                    filename, _JsonStream(file, chunk_size)):
+                if key == "columnar":
+                    columnar.append(value)
+                elif key in columnar:
+                    for record in DataHandler._iter_columnar_records(value):
+                        yield key, record
+                else:
+                    yield key, value
+
+    @staticmethod
+    def iter_json_offsets(filename: str, chunk_size: int = 1 << 16):
+        """
+        Like iter_json_records, but yields (key, value, start, end) with the
+        byte offsets of every record in the file. The values are decoded as
+        Latin-1, so only numbers and ASCII text in them are reliable; use
+        read_json_record to decode a record properly.
+        """
+        if not os.path.exists(filename):
+            print(f"{filename} does not exist. Returning no records.")
+            return
+        # Latin-1 maps every byte to one character, so the positions in
+        # the text are byte offsets
+        with open(filename, "r", encoding="latin-1", newline="") as file:
+            yield from DataHandler._iter_json_entries(
+                filename, _JsonStream(file, chunk_size))
+
+    @staticmethod
+    def read_json_record(file, start: int, end: int):
+        """Decodes the record between two byte offsets of a file opened in
+        binary mode."""
+        file.seek(start)
+        return json.loads(file.read(end - start))
+
+    @staticmethod
+    def _iter_json_entries(filename: str, stream: "_JsonStream"):
+        """Yields (key, value, start, end) for the top-level entries."""
+        if stream.at_end():
+            print(f"{filename} is empty. Returning no records.")
+            return
+        stream.expect("{")
+        if stream.consume("}"):
+            return
+        while True:
+            key = stream.decode_value()
+            stream.expect(":")
+            if stream.consume("["):
+                for value, start, end in stream.iter_array():
+                    yield key, value, start, end
+            else:
+                yield (key, *stream.decode_value_with_offsets())
+            if stream.consume("}"):
+                return
+            stream.expect(",")
+
     @staticmethod
     def _get_default_structure(filename: str):
         """Returns the default structure based on the file type."""
@@ -39,3 +497,131 @@ class DataHandler:
         else:
             print("Unknown file type. Returning an empty dictionary.")
             return {}
+
+
+_WHITESPACE = re.compile(r"[ \t\r\n]*")
+_SEPARATOR = re.compile(r"[ \t\r\n]*([,\]])[ \t\r\n]*")
+# Characters that can continue a number, none of them follows a valid value
+_NUMBER_CHARS = frozenset("0123456789.eE+-")
+
+
+class _JsonStream:
+    """Buffered reader decoding one JSON value at a time from a file."""
+
+    def __init__(self, file, chunk_size: int):
+        self._file = file
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        # Position of the start of the buffer in the file
+        self._base = 0
+        self._eof = False
+
+    def _read_more(self, size: int = None) -> bool:
+        """Reads the next chunk into the buffer, False at the end of file.
+        :param size: Number of characters to read instead of a chunk."""
+        if self._eof:
+            return False
+        chunk = self._file.read(size or self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        # Drop the consumed part so the buffer stays around one chunk
+        self._base += self._pos
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _skip_whitespace(self):
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer) or not self._read_more():
+                return
+
+    def _error(self, message: str):
+        raise json.JSONDecodeError(message, self._buffer, self._pos)
+
+    def at_end(self) -> bool:
+        """Returns True if only whitespace is left."""
+        self._skip_whitespace()
+        return self._pos >= len(self._buffer)
+
+    def consume(self, char: str) -> bool:
+        """Consumes char if it is the next non-whitespace character."""
+        self._skip_whitespace()
+        if self._buffer.startswith(char, self._pos):
+            self._pos += 1
+            return True
+        return False
+
+    def expect(self, char: str):
+        """Consumes char or raises a JSONDecodeError."""
+        if not self.consume(char):
+            self._error(f"Expecting '{char}'")
+
+    def decode_value_with_offsets(self) -> tuple:
+        """Decodes the next JSON value and returns it with its start and
+        end position in the file."""
+        self._skip_whitespace()
+        start = self._base + self._pos
+        value = self.decode_value()
+        return value, start, self._base + self._pos
+
+    def _is_complete(self, end: int) -> bool:
+        """Returns True if a value decoded up to end cannot continue in
+        the part of the file that is not read yet, e.g. "-25." of
+        "-25.0"."""
+        return (end < len(self._buffer)
+                and self._buffer[end] not in _NUMBER_CHARS)
+
+    def iter_array(self):
+        """Yields (value, start, end) for the elements of an array whose
+        opening bracket was consumed, including the closing bracket."""
+        if self.consume("]"):
+            return
+        while True:
+            self._skip_whitespace()
+            start = self._base + self._pos
+            # Fast path for values that end well inside the buffer
+            try:
+                value, end = self._decoder.raw_decode(self._buffer,
+                                                      self._pos)
+            except json.JSONDecodeError:
+                end = len(self._buffer)
+            if self._is_complete(end):
+                self._pos = end
+            else:
+                value = self.decode_value()
+            yield value, start, self._base + self._pos
+            match = _SEPARATOR.match(self._buffer, self._pos)
+            if match and match.end() < len(self._buffer):
+                self._pos = match.end()
+                if match.group(1) == "]":
+                    return
+            elif self.consume("]"):
+                return
+            else:
+                self.expect(",")
+
+    def decode_value(self):
+        """Decodes the next JSON value."""
+        self._skip_whitespace()
+        # A large value is retried with doubling reads, so that decoding it
+        # stays linear in its size
+        size = self._chunk_size
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+                # A number may be cut off at the end of the buffer, so it
+                # is only accepted once a character that ends it follows
+                if self._is_complete(end) or self._eof:
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            if not self._read_more(size):
+                if self._pos >= len(self._buffer):
+                    self._error("Expecting value")
+            size *= 2
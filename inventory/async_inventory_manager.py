@@ -0,0 +1,234 @@
+import asyncio
+import functools
+from concurrent.futures import Executor
+from contextlib import asynccontextmanager
+from inventory.inventory_manager import InventoryManager
+from inventory.product import Product
+from inventory.category import Category
+from inventory.transaction import Transaction
+
+
+class AsyncInventoryManager:
+    """
+    asyncio facade over an InventoryManager. Every call runs in an
+    executor thread, so file I/O of the journal, the storage backend and
+    the saves never blocks the event loop. Reads run in parallel, changes
+    are queued behind an asyncio lock so they do not occupy the executor
+    while they wait for each other.
+    """
+
+    def __init__(self, inventory: InventoryManager = None,
+                 executor: Executor = None):
+        """
+        Initialize the facade.
+        :param inventory: Inventory to wrap, a new one by default. Thread
+        safety is enabled on it.
+        :param executor: Executor the calls run in, by default the one of
+        the event loop.
+        """
+        if inventory is None:
+            inventory = InventoryManager()
+        if not isinstance(inventory, InventoryManager):
+            raise TypeError("Inventory must be an InventoryManager.")
+        inventory.enable_thread_safety()
+        self._inventory: InventoryManager = inventory
+        self._executor: Executor = executor
+        self._write_lock = asyncio.Lock()
+
+    @property
+    def inventory(self) -> InventoryManager:
+        """Returns the wrapped inventory."""
+        return self._inventory
+
+    async def _read(self, method, *args, **kwargs):
+        """Runs a method of the inventory in the executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(method, *args, **kwargs))
+
+    async def _write(self, method, *args, **kwargs):
+        """Runs a changing method of the inventory in the executor, after
+        the changes queued before it."""
+        async with self._write_lock:
+            return await self._read(method, *args, **kwargs)
+
+    # queries #
+    async def product_exists(self, product_id: int) -> bool:
+        """Returns True if a product with the id exists."""
+        return await self._read(self._inventory.product_exists, product_id)
+
+    async def find_product_by_id(self, product_id: int) -> Product:
+        """Finds a product by ID."""
+        return await self._read(self._inventory.find_product_by_id,
+                                product_id)
+
+    async def find_category_by_id(self, category_id: int) -> Category:
+        """Finds a category by ID."""
+        return await self._read(self._inventory.find_category_by_id,
+                                category_id)
+
+    async def get_product_info_by_id(self, product_id: int,
+                                     info_type: str = None) -> str:
+        """Returns the info of a product, see InventoryManager."""
+        return await self._read(self._inventory.get_product_info_by_id,
+                                product_id, info_type)
+
+    async def search_product(self, keyword: str,
+                             prefix: bool = False) -> list[Product]:
+        """Searches for products by a keyword in their names."""
+        return await self._read(self._inventory.search_product, keyword,
+                                prefix)
+
+    async def get_products_by_category(self, category_id: int) -> list:
+        """Returns the infos of the products of a category."""
+        return await self._read(self._inventory.get_products_by_category,
+                                category_id)
+
+    async def get_product_ids_by_category(self,
+                                          category_id: int) -> list[int]:
+        """Returns the sorted ids of the products of a category."""
+        return await self._read(
+            self._inventory.get_product_ids_by_category, category_id)
+
+    async def get_products_in_range(self, field: str, low=None,
+                                    high=None) -> list[int]:
+        """Returns the sorted ids of the products whose field lies between
+        low and high."""
+        return await self._read(self._inventory.get_products_in_range,
+                                field, low, high)
+
+    async def get_total_inventory_value(self, verify: bool = False):
+        """Returns the total value of the inventory."""
+        return await self._read(self._inventory.get_total_inventory_value,
+                                verify)
+
+    async def get_total_inventory_value_by_category(self, category_id: int,
+                                                    verify: bool = False):
+        """Returns the total value of the inventory for a category."""
+        return await self._read(
+            self._inventory.get_total_inventory_value_by_category,
+            category_id, verify)
+
+    async def get_available_quantity(self, product_id: int) -> int:
+        """Returns the quantity of a product that is not reserved."""
+        return await self._read(self._inventory.get_available_quantity,
+                                product_id)
+
+    async def export_to_json(self, since: float = None) -> dict:
+        """Exports the inventory, or the changes since a timestamp."""
+        return await self._read(self._inventory.export_to_json, since)
+
+    # changes #
+    async def add_category(self, name: str) -> int:
+        """Adds a category and returns its id."""
+        return await self._write(self._inventory.add_category, name)
+
+    async def add_product(self, product_data: dict) -> int:
+        """Adds a product and returns its id."""
+        return await self._write(self._inventory.add_product, product_data)
+
+    async def bulk_add_products(self, products_data) -> list[int]:
+        """Adds many products at once, all or none."""
+        return await self._write(self._inventory.bulk_add_products,
+                                 list(products_data))
+
+    async def remove_product(self, product_id: int):
+        """Removes a product from the inventory."""
+        await self._write(self._inventory.remove_product, product_id)
+
+    async def remove_category(self, category_id: int):
+        """Removes a category from the inventory."""
+        await self._write(self._inventory.remove_category, category_id)
+
+    async def update_product_name(self, product_id: int, name: str):
+        """Updates the name of a product."""
+        await self._write(self._inventory.update_product_name, product_id,
+                          name)
+
+    async def update_product_price(self, product_id: int, price: float):
+        """Updates the price of a product."""
+        await self._write(self._inventory.update_product_price, product_id,
+                          price)
+
+    async def update_product_quantity(self, product_id: int, quantity: int):
+        """Updates the quantity of a product."""
+        await self._write(self._inventory.update_product_quantity,
+                          product_id, quantity)
+
+    async def update_product_description(self, product_id: int,
+                                         description: str):
+        """Updates the description of a product."""
+        await self._write(self._inventory.update_product_description,
+                          product_id, description)
+
+    async def update_product_category(self, product_id: int,
+                                      category_id: int):
+        """Updates the category id of a product."""
+        await self._write(self._inventory.update_product_category,
+                          product_id, category_id)
+
+    async def update_category_name(self, category_id: int, name: str):
+        """Updates the name of a category."""
+        await self._write(self._inventory.update_category_name, category_id,
+                          name)
+
+    async def bulk_update(self, updates) -> int:
+        """Updates fields of many products at once, all or none."""
+        return await self._write(self._inventory.bulk_update, list(updates))
+
+    async def adjust_quantity(self, product_id: int, delta: int) -> int:
+        """Changes the quantity of a product by delta."""
+        return await self._write(self._inventory.adjust_quantity,
+                                 product_id, delta)
+
+    async def reserve(self, product_id: int, quantity: int) -> int:
+        """Holds stock for an open order and returns the reservation id."""
+        return await self._write(self._inventory.reserve, product_id,
+                                 quantity)
+
+    async def release(self, reservation_id: int):
+        """Cancels a reservation."""
+        await self._write(self._inventory.release, reservation_id)
+
+    async def commit(self, reservation_id: int) -> int:
+        """Takes the stock of a reservation from the inventory."""
+        return await self._write(self._inventory.commit, reservation_id)
+
+    async def apply_stock_movements(self, movements) -> int:
+        """Applies many quantity changes at once, all or none."""
+        return await self._write(self._inventory.apply_stock_movements,
+                                 list(movements))
+
+    @asynccontextmanager
+    async def transaction(self):
+        """
+        Stages changes like InventoryManager.transaction and applies them
+        when the async with block ends:
+
+            async with inventory.transaction() as transaction:
+                transaction.update_product(1, name="Pen", price=1.5)
+        """
+        transaction = Transaction()
+        yield transaction
+        await self._write(self._inventory.commit_transaction, transaction)
+
+    # persistence #
+    async def load_from_storage(self, lazy: bool = False):
+        """Loads products and categories from the storage backend."""
+        await self._write(self._inventory.load_from_storage, lazy)
+
+    async def flush_journal(self):
+        """Forces the journaled changes to disk."""
+        await self._write(self._inventory.flush_journal)
+
+    async def autosave(self, idle: bool = False) -> bool:
+        """Saves the pending changes if the autosave policy says so."""
+        return await self._write(self._inventory.autosave, idle)
+
+    async def checkpoint(self) -> list[tuple[str, Exception]]:
+        """
+        Persists all changes, see InventoryManager.checkpoint. Changes
+        made while the checkpoint is written wait for it.
+        Returns the finished background saves like poll_saves.
+        """
+        return await self._write(self._inventory.checkpoint)
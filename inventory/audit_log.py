@@ -0,0 +1,213 @@
+import atexit
+import json
+import os
+import time
+
+
+class AuditLog:
+    """
+    Structured audit trail of inventory changes.
+    Every change is one JSON object per line with a timestamp, the event,
+    the kind and id of the changed entity and its old and new values. The
+    file is rotated by size, and every segment is indexed by entity and
+    time so queries read only the matching records.
+    """
+
+    def __init__(self, filename: str, max_bytes: int = 10 * 1024 * 1024,
+                 backup_count: int = 5):
+        """
+        Initialize the audit log.
+        :param max_bytes: Size after which the file is rotated.
+        :param backup_count: Number of rotated files that are kept.
+        """
+        if not isinstance(filename, str):
+            raise TypeError("Filename must be a string.")
+        if not filename.strip():
+            raise ValueError("Filename must be a non-empty string.")
+        if not isinstance(max_bytes, int):
+            raise TypeError("Max bytes must be an integer.")
+        if max_bytes <= 0:
+            raise ValueError("Max bytes must be a positive integer.")
+        if not isinstance(backup_count, int):
+            raise TypeError("Backup count must be an integer.")
+        if backup_count < 0:
+            raise ValueError("Backup count must be non-negative.")
+        self.__filename: str = filename
+        self.__max_bytes: int = max_bytes
+        self.__backup_count: int = backup_count
+        # Indexes of the rotated segments, loaded on first use
+        self.__segment_indexes: dict[str, dict] = {}
+        self._filestream = None
+        self.__size: int = 0
+        self.__torn: bool = False
+        self.__index: dict = self._build_index(filename)
+        atexit.register(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+    @property
+    def filename(self) -> str:
+        """Returns the filename of the current segment."""
+        return self.__filename
+
+    @staticmethod
+    def _new_index() -> dict:
+        """Returns an empty segment index."""
+        return {"min_ts": None, "max_ts": None, "ids": {}}
+
+    @staticmethod
+    def _add_to_index(index: dict, entry: dict, offset: int):
+        """Adds the offset of an entry to a segment index."""
+        ts = entry["ts"]
+        if index["min_ts"] is None or ts < index["min_ts"]:
+            index["min_ts"] = ts
+        if index["max_ts"] is None or ts > index["max_ts"]:
+            index["max_ts"] = ts
+        key = f"{entry['entity']}:{entry['id']}"
+        index["ids"].setdefault(key, []).append(offset)
+
+    def _build_index(self, filename: str) -> dict:
+        """Builds the index of a segment by scanning it."""
+        index = self._new_index()
+        if not os.path.exists(filename):
+            return index
+        offset = 0
+        line = b"\n"
+        with open(filename, "rb") as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn last line from an interrupted write is skipped
+                    offset += len(line)
+                    continue
+                self._add_to_index(index, entry, offset)
+                offset += len(line)
+        if filename == self.__filename:
+            self.__size = offset
+            # New entries must not be glued to a torn last line
+            self.__torn = not line.endswith(b"\n")
+        return index
+
+    def _segment_name(self, number: int) -> str:
+        """Returns the filename of a segment, 0 is the current one."""
+        if number == 0:
+            return self.__filename
+        return f"{self.__filename}.{number}"
+
+    def _segment_index(self, filename: str) -> dict:
+        """Returns the index of a segment."""
+        if filename == self.__filename:
+            return self.__index
+        if filename not in self.__segment_indexes:
+            try:
+                with open(filename + ".idx", "r", encoding="utf-8") as file:
+                    index = json.load(file)
+            except (OSError, json.JSONDecodeError):
+                index = self._build_index(filename)
+            self.__segment_indexes[filename] = index
+        return self.__segment_indexes[filename]
+
+    def _rotate(self):
+        """Moves the current segment aside and starts a new one."""
+        self.close()
+        with open(self.__filename + ".idx", "w", encoding="utf-8") as file:
+            json.dump(self.__index, file, separators=(",", ":"))
+        for suffix in ("", ".idx"):
+            oldest = self._segment_name(self.__backup_count) + suffix
+            if os.path.exists(oldest):
+                os.remove(oldest)
+            for number in range(self.__backup_count - 1, -1, -1):
+                source = self._segment_name(number) + suffix
+                if os.path.exists(source):
+                    os.replace(source, self._segment_name(number + 1) + suffix)
+        self.__segment_indexes.clear()
+        self.__index = self._new_index()
+        self.__size = 0
+
+    def record(self, event: str, entity_id: int, old=None, new=None,
+               timestamp: float = None, entity: str = "product"):
+        """Records a change of the entity with the given id."""
+        entry = {"ts": time.time() if timestamp is None else timestamp,
+                 "event": event, "entity": entity, "id": entity_id,
+                 "old": old, "new": new}
+        line = (json.dumps(entry, separators=(",", ":")) + "\n").encode()
+        if self.__size and self.__size + len(line) > self.__max_bytes:
+            self._rotate()
+        if self._filestream is None:
+            self._filestream = open(self.__filename, "ab")
+            if self.__torn:
+                self._filestream.write(b"\n")
+                self.__size += 1
+                self.__torn = False
+        self._filestream.write(line)
+        self._add_to_index(self.__index, entry, self.__size)
+        self.__size += len(line)
+
+    def query(self, entity_id: int = None, since: float = None,
+              until: float = None, entity: str = "product") -> list[dict]:
+        """
+        Returns the recorded changes, oldest first.
+        :param entity_id: Only changes of the entity with this id.
+        :param entity: Kind of the entity, "product" or "category".
+        :param since: Only changes at or after this timestamp.
+        :param until: Only changes at or before this timestamp.
+        """
+        self.flush()
+        results = []
+        for number in range(self.__backup_count, -1, -1):
+            filename = self._segment_name(number)
+            if not os.path.exists(filename):
+                continue
+            index = self._segment_index(filename)
+            if index["min_ts"] is None:
+                continue
+            if since is not None and index["max_ts"] < since:
+                continue
+            if until is not None and index["min_ts"] > until:
+                continue
+            with open(filename, "rb") as file:
+                if entity_id is None:
+                    entries = self._read_all(file)
+                else:
+                    entries = self._read_at(
+                        file, index["ids"].get(f"{entity}:{entity_id}", []))
+                for entry in entries:
+                    if since is not None and entry["ts"] < since:
+                        continue
+                    if until is not None and entry["ts"] > until:
+                        continue
+                    results.append(entry)
+        return results
+
+    @staticmethod
+    def _read_all(file):
+        """Yields all readable entries of a segment."""
+        for line in file:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+    @staticmethod
+    def _read_at(file, offsets: list[int]):
+        """Yields the entries starting at the given offsets."""
+        for offset in offsets:
+            file.seek(offset)
+            yield json.loads(file.readline())
+
+    def flush(self):
+        """Writes buffered entries to the file."""
+        if self._filestream:
+            self._filestream.flush()
+
+    def close(self):
+        """Close the current segment."""
+        if self._filestream:
+            self._filestream.close()
+            self._filestream = None
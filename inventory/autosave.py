@@ -0,0 +1,71 @@
+import time
+
+
+class AutosavePolicy:
+    """
+    Decides when pending changes are saved. Changes are saved once no
+    further change came in for the debounce interval, when too many are
+    pending, or when the application becomes idle. Saves never follow
+    each other faster than the minimum interval, which grows when saves
+    take long, so saving never occupies more than a share of the time.
+    """
+
+    def __init__(self, debounce: float = 2.0, max_pending: int = 100,
+                 min_interval: float = 1.0, max_busy: float = 0.2):
+        """
+        Initialize the policy.
+        :param debounce: Seconds without changes after which they are saved.
+        :param max_pending: Number of pending changes that are saved without
+        waiting for the debounce interval.
+        :param min_interval: Minimum seconds between two saves.
+        :param max_busy: Largest share of the time spent saving, between 0
+        and 1.
+        """
+        for name, value in (("Debounce", debounce),
+                            ("Min interval", min_interval)):
+            if not isinstance(value, (int, float)):
+                raise TypeError(f"{name} must be an integer or float.")
+            if value < 0:
+                raise ValueError(f"{name} must be non-negative.")
+        if not isinstance(max_pending, int):
+            raise TypeError("Max pending must be an integer.")
+        if max_pending <= 0:
+            raise ValueError("Max pending must be a positive integer.")
+        if not isinstance(max_busy, (int, float)):
+            raise TypeError("Max busy must be an integer or float.")
+        if not 0 < max_busy <= 1:
+            raise ValueError("Max busy must be between 0 and 1.")
+        self.__debounce: float = debounce
+        self.__max_pending: int = max_pending
+        self.__min_interval: float = min_interval
+        self.__max_busy: float = max_busy
+        self.__last_save: float = None
+        self.__last_duration: float = 0.0
+
+    @property
+    def interval(self) -> float:
+        """Returns the current minimum number of seconds between saves."""
+        return max(self.__min_interval,
+                   self.__last_duration / self.__max_busy)
+
+    def due(self, pending: int, last_change: float, idle: bool = False,
+            now: float = None) -> bool:
+        """
+        Returns True if pending changes should be saved now.
+        :param pending: Number of changes since the last save.
+        :param last_change: time.monotonic() of the latest change.
+        :param idle: The application waits for the user.
+        """
+        if pending <= 0:
+            return False
+        now = time.monotonic() if now is None else now
+        if (self.__last_save is not None
+                and now - self.__last_save < self.interval):
+            return False
+        return (idle or pending >= self.__max_pending
+                or now - last_change >= self.__debounce)
+
+    def saved(self, duration: float, now: float = None):
+        """Records a save that took the given number of seconds."""
+        self.__last_save = time.monotonic() if now is None else now
+        self.__last_duration = duration
@@ -0,0 +1,276 @@
+import json
+import mmap
+import os
+import struct
+from inventory.storage import StorageBackend
+
+
+class BinaryFileBackend(StorageBackend):
+    """
+    Stores the products in a binary file that is read through mmap.
+
+    The file starts with a header, followed by one fixed-width column per
+    numeric field, an offset table into a heap of UTF-8 encoded names and
+    descriptions, a column of row flags, the heap itself and finally the
+    categories and sequences as JSON. Numeric fields are read straight
+    from the mapped pages, and price, quantity and category changes are
+    patched in place. Other changes are persisted by save_all.
+    """
+
+    MAGIC: bytes = b"INVPROD\x00"
+    VERSION: int = 1
+    # magic, version, number of rows, offset of the string heap,
+    # offset of the categories and sequences
+    HEADER = struct.Struct("<8sIIQQ")
+    # Numeric columns with their struct type codes, all 8 bytes wide
+    COLUMNS: dict[str, str] = {
+        "id": "q",
+        "price": "d",
+        "quantity": "q",
+        "category_id": "q",
+        "date_added": "d",
+        "last_modified": "d",
+    }
+    # Fields that can be patched in place besides last_modified
+    PATCHABLE: tuple[str, ...] = ("price", "quantity", "category_id")
+    DELETED: int = 1
+
+    def __init__(self, filename: str, readonly: bool = False):
+        """
+        Open the file, it is created by the first save_all.
+        :param readonly: Map the file read-only, so that several processes
+        can share the pages. Changes are then rejected.
+        """
+        if not isinstance(filename, str):
+            raise TypeError("Filename must be a string.")
+        if not filename.strip():
+            raise ValueError("Filename must be a non-empty string.")
+        self.__filename: str = filename
+        self.__readonly: bool = readonly
+        self.incremental: bool = not readonly
+        self.dirty: bool = False
+        self._file = None
+        self._map: mmap.mmap = None
+        self.__count: int = 0
+        self.__heap_offset: int = 0
+        self.__meta_offset: int = 0
+        # Row numbers by product id, deleted rows are left out
+        self.__rows: dict[int, int] = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+    @property
+    def filename(self) -> str:
+        """Returns the filename of the binary file."""
+        return self.__filename
+
+    @property
+    def readonly(self) -> bool:
+        """Returns True if the file is mapped read-only."""
+        return self.__readonly
+
+    def _open(self) -> bool:
+        """Maps the file if it is not mapped yet, returns False if there is
+        nothing to map."""
+        if self._map is not None:
+            return True
+        if (not os.path.exists(self.__filename)
+                or os.path.getsize(self.__filename) == 0):
+            return False
+        self._file = open(self.__filename, "rb" if self.__readonly else "r+b")
+        self._map = mmap.mmap(self._file.fileno(), 0,
+                              access=mmap.ACCESS_READ if self.__readonly
+                              else mmap.ACCESS_WRITE)
+        if len(self._map) < self.HEADER.size:
+            self.close()
+            raise ValueError(f"{self.__filename} is not a binary "
+                             "inventory file.")
+        magic, version, count, heap_offset, meta_offset = \
+            self.HEADER.unpack_from(self._map)
+        if magic != self.MAGIC or version != self.VERSION:
+            self.close()
+            raise ValueError(f"{self.__filename} is not a binary "
+                             "inventory file.")
+        self.__count = count
+        self.__heap_offset = heap_offset
+        self.__meta_offset = meta_offset
+        flags = self._flags()
+        self.__rows = {product_id: row
+                       for row, product_id in enumerate(self.column("id"))
+                       if not flags[row] & self.DELETED}
+        return True
+
+    def _column_offset(self, name: str) -> int:
+        """Returns the offset of the first value of a numeric column."""
+        return (self.HEADER.size
+                + list(self.COLUMNS).index(name) * 8 * self.__count)
+
+    def _offset_table(self) -> int:
+        """Returns the offset of the string offset table. The name of row i
+        spans the heap between entries 2i and 2i + 1, its description
+        between 2i + 1 and 2i + 2."""
+        return self.HEADER.size + len(self.COLUMNS) * 8 * self.__count
+
+    def _flags(self) -> memoryview:
+        """Returns the flags of the rows."""
+        start = self._offset_table() + 8 * (2 * self.__count + 1)
+        return memoryview(self._map)[start:start + self.__count]
+
+    def column(self, name: str) -> memoryview:
+        """
+        Returns a numeric column as a memoryview of the mapped file,
+        including deleted rows. No data is copied, the view must be
+        released before the backend is closed.
+        :param name: One of the keys of COLUMNS.
+        """
+        if name not in self.COLUMNS:
+            raise ValueError(f"Invalid column '{name}' specified.")
+        if not self._open():
+            return memoryview(b"").cast(self.COLUMNS[name])
+        start = self._column_offset(name)
+        return memoryview(self._map)[
+            start:start + 8 * self.__count].cast(self.COLUMNS[name])
+
+    def _read_field(self, name: str, row: int):
+        """Reads one numeric field of a row."""
+        return struct.unpack_from("<" + self.COLUMNS[name], self._map,
+                                  self._column_offset(name) + 8 * row)[0]
+
+    def _read_string(self, index: int) -> str:
+        """Reads an entry of the string heap."""
+        start, end = struct.unpack_from("<2Q", self._map,
+                                        self._offset_table() + 8 * index)
+        return str(self._map[self.__heap_offset + start:
+                             self.__heap_offset + end], "utf-8")
+
+    def _read_product(self, row: int) -> dict:
+        product = {name: self._read_field(name, row) for name in self.COLUMNS}
+        product["name"] = self._read_string(2 * row)
+        product["description"] = self._read_string(2 * row + 1)
+        return product
+
+    def _read_meta(self) -> dict:
+        return json.loads(str(self._map[self.__meta_offset:], "utf-8"))
+
+    def load(self):
+        if not self._open():
+            return
+        meta = self._read_meta()
+        for category in meta["categories"]:
+            yield "categories", category
+        for row in self.__rows.values():
+            yield "products", self._read_product(row)
+        yield "sequences", meta["sequences"]
+
+    def load_index(self):
+        if not self._open():
+            return
+        meta = self._read_meta()
+        for category in meta["categories"]:
+            yield "categories", category
+        for product_id in list(self.__rows):
+            yield "products", product_id
+        yield "sequences", meta["sequences"]
+
+    def get_product(self, product_id: int) -> dict:
+        if not self._open() or product_id not in self.__rows:
+            return None
+        return self._read_product(self.__rows[product_id])
+
+    def _write_field(self, name: str, row: int, value):
+        struct.pack_into("<" + self.COLUMNS[name], self._map,
+                         self._column_offset(name) + 8 * row, value)
+
+    def _patch_product(self, product_id: int, values: dict,
+                       last_modified: float):
+        """Writes numeric fields of a product in place, marks the backend
+        dirty if that is not possible."""
+        row = self.__rows.get(product_id)
+        if row is None or any(field not in self.PATCHABLE
+                              for field in values):
+            self.dirty = True
+            return
+        for field, value in values.items():
+            self._write_field(field, row, value)
+        self._write_field("last_modified", row, last_modified)
+
+    def _apply_record(self, record: dict):
+        op = record.get("op")
+        if op == "update_product":
+            self._patch_product(record["id"],
+                                {record["field"]: record["value"]},
+                                record["last_modified"])
+        elif op == "update_products":
+            for update in record["updates"]:
+                self._patch_product(update["id"], update["values"],
+                                    record["last_modified"])
+        elif op == "remove_product" and record["id"] in self.__rows:
+            row = self.__rows.pop(record["id"])
+            self._flags()[row] |= self.DELETED
+        else:
+            # New rows, strings and categories need a rewrite
+            self.dirty = True
+
+    def apply(self, records: list[dict]):
+        if self.__readonly:
+            raise ValueError(f"{self.__filename} is opened read-only.")
+        if not self._open():
+            self.dirty = True
+            return
+        for record in records:
+            self._apply_record(record)
+
+    def save_all(self, data: dict):
+        if self.__readonly:
+            raise ValueError(f"{self.__filename} is opened read-only.")
+        self.close()
+        products = data.get("products", [])
+        count = len(products)
+        heap = bytearray()
+        offsets = [0]
+        for product in products:
+            heap += product["name"].encode("utf-8")
+            offsets.append(len(heap))
+            heap += product.get("description", "").encode("utf-8")
+            offsets.append(len(heap))
+        heap_offset = (self.HEADER.size + len(self.COLUMNS) * 8 * count
+                       + 8 * len(offsets) + count)
+        meta_offset = heap_offset + len(heap)
+        temp_filename = self.__filename + ".tmp"
+        with open(temp_filename, "wb") as file:
+            file.write(self.HEADER.pack(self.MAGIC, self.VERSION, count,
+                                        heap_offset, meta_offset))
+            for name, code in self.COLUMNS.items():
+                file.write(struct.pack(f"<{count}{code}",
+                                       *(product[name]
+                                         for product in products)))
+            file.write(struct.pack(f"<{len(offsets)}Q", *offsets))
+            file.write(bytes(count))
+            file.write(heap)
+            file.write(json.dumps(
+                {"categories": data.get("categories", []),
+                 "sequences": data.get("sequences", {})},
+                separators=(",", ":")).encode("utf-8"))
+        os.replace(temp_filename, self.__filename)
+        self.dirty = False
+
+    def flush(self):
+        """Writes the patched pages to the file."""
+        if self._map is not None and not self.__readonly:
+            self._map.flush()
+
+    def close(self):
+        if self._map is not None:
+            self.flush()
+            self._map.close()
+            self._map = None
+        if self._file:
+            self._file.close()
+            self._file = None
+        self.__rows = {}
+        self.__count = 0
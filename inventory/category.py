@@ -1,6 +1,9 @@
 class Category:
     """Represents a category with an id and name."""
 
+    # No per-instance __dict__, which keeps the category compact
+    __slots__ = ("__id", "__name", "__watcher")
+
     def __init__(self, category_id: int, name: str):
         if not isinstance(category_id, int):
             raise TypeError("Category ID must be an integer.")
@@ -13,6 +16,7 @@ class Category:
 
         self.__id = category_id
         self.__name = name
+        self.__watcher = None
 
     def __str__(self) -> str:
         return self.get_info()
@@ -34,7 +38,20 @@ class Category:
             raise TypeError("Category name must be a string.")
         if not name.strip():
             raise ValueError("Category name must be a non-empty string.")
+        old_name = self.__name
         self.__name = name
+        if self.__watcher is not None:
+            self.__watcher(self, "name", old_name)
+
+    def set_watcher(self, watcher):
+        """
+        Sets a callable that is notified after the category changed,
+        as watcher(category, field, old_value).
+        None removes the watcher.
+        """
+        if watcher is not None and not callable(watcher):
+            raise TypeError("Watcher must be callable or None.")
+        self.__watcher = watcher
 
     def get_info(self) -> str:
         """Return a string representation of the categorie's information."""
@@ -0,0 +1,157 @@
+from array import array
+
+# NumPy is optional, without it the columns are stdlib arrays
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class ColumnarStore:
+    """
+    Stores the numeric fields of products in contiguous columns, one array
+    per field, for aggregations and range queries over many products.
+    Uses NumPy for vectorized queries when it is installed.
+    """
+
+    # Column name and array type code
+    COLUMNS: dict[str, str] = {
+        "id": "q",
+        "price": "d",
+        "quantity": "q",
+        "category_id": "q",
+        "date_added": "d",
+        "last_modified": "d",
+    }
+
+    def __init__(self, use_numpy: bool = None):
+        """
+        Initialize empty columns.
+        :param use_numpy: Use NumPy arrays, by default if NumPy is installed.
+        """
+        if use_numpy is None:
+            use_numpy = np is not None
+        if use_numpy and np is None:
+            raise ValueError("NumPy is not installed.")
+        self.__use_numpy: bool = use_numpy
+        self.__rows: dict[int, int] = {}  # product id -> row
+        self.__size: int = 0
+        if use_numpy:
+            self.__columns = {name: np.zeros(16, dtype=np.dtype(code))
+                              for name, code in self.COLUMNS.items()}
+        else:
+            self.__columns = {name: array(code)
+                              for name, code in self.COLUMNS.items()}
+
+    def __len__(self) -> int:
+        return self.__size
+
+    def __contains__(self, product_id: int) -> bool:
+        return product_id in self.__rows
+
+    @property
+    def uses_numpy(self) -> bool:
+        """Returns True if the columns are NumPy arrays."""
+        return self.__use_numpy
+
+    def column(self, name: str):
+        """Returns the values of a column for all stored products."""
+        if name not in self.COLUMNS:
+            raise ValueError(f"Invalid column '{name}'.")
+        return self.__columns[name][:self.__size]
+
+    def _grow(self):
+        """Doubles the capacity of the NumPy columns."""
+        for name, values in self.__columns.items():
+            grown = np.zeros(len(values) * 2, dtype=values.dtype)
+            grown[:self.__size] = values[:self.__size]
+            self.__columns[name] = grown
+
+    def add(self, product):
+        """Adds a product, or refreshes it if it is already stored."""
+        if product.id in self.__rows:
+            self.update(product)
+            return
+        row = self.__size
+        if self.__use_numpy:
+            if row == len(self.__columns["id"]):
+                self._grow()
+            for name in self.COLUMNS:
+                self.__columns[name][row] = getattr(product, name)
+        else:
+            for name in self.COLUMNS:
+                self.__columns[name].append(getattr(product, name))
+        self.__rows[product.id] = row
+        self.__size += 1
+
+    def update(self, product):
+        """Copies the current fields of a stored product into the columns."""
+        row = self.__rows[product.id]
+        for name in self.COLUMNS:
+            self.__columns[name][row] = getattr(product, name)
+
+    def update_last_modified(self, product_id: int, timestamp: float):
+        """Sets the last_modified value of a stored product."""
+        self.__columns["last_modified"][self.__rows[product_id]] = timestamp
+
+    def remove(self, product_id: int):
+        """Removes a product by moving the last row into its place."""
+        row = self.__rows.pop(product_id, None)
+        if row is None:
+            return
+        last = self.__size - 1
+        if row != last:
+            for values in self.__columns.values():
+                values[row] = values[last]
+            self.__rows[int(self.__columns["id"][row])] = row
+        if not self.__use_numpy:
+            for values in self.__columns.values():
+                values.pop()
+        self.__size = last
+
+    def total_value(self, category_id: int = None) -> float:
+        """Returns the sum of price * quantity, optionally of a category."""
+        price = self.column("price")
+        quantity = self.column("quantity")
+        if self.__use_numpy:
+            if category_id is not None:
+                mask = self.column("category_id") == category_id
+                price, quantity = price[mask], quantity[mask]
+            return float(np.dot(price, quantity))
+        if category_id is None:
+            return sum(p * q for p, q in zip(price, quantity))
+        return sum(p * q for p, q, c in
+                   zip(price, quantity, self.column("category_id"))
+                   if c == category_id)
+
+    def value_by_category(self) -> dict[int, float]:
+        """Returns the sum of price * quantity for every category."""
+        categories = self.column("category_id")
+        if self.__use_numpy:
+            values = self.column("price") * self.column("quantity")
+            keys, positions = np.unique(categories, return_inverse=True)
+            sums = np.bincount(positions, weights=values)
+            return {int(key): float(value) for key, value in zip(keys, sums)}
+        result: dict[int, float] = {}
+        for p, q, c in zip(self.column("price"), self.column("quantity"),
+                           categories):
+            result[c] = result.get(c, 0.0) + p * q
+        return result
+
+    def ids_in_range(self, name: str, low=None, high=None) -> list[int]:
+        """
+        Returns the sorted ids of the products whose column value lies
+        between low and high, both inclusive. None leaves a side open.
+        """
+        values = self.column(name)
+        ids = self.column("id")
+        if self.__use_numpy:
+            mask = np.ones(self.__size, dtype=bool)
+            if low is not None:
+                mask &= values >= low
+            if high is not None:
+                mask &= values <= high
+            return sorted(ids[mask].tolist())
+        return sorted(product_id for product_id, value in zip(ids, values)
+                      if (low is None or value >= low)
+                      and (high is None or value <= high))
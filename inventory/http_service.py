@@ -0,0 +1,294 @@
+import json
+import re
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from inventory.inventory_manager import InventoryManager
+from data_handler import DataHandler
+
+
+class InventoryService:
+    """
+    JSON API over a single InventoryManager, independent of the transport.
+    Requests are (method, path, body) triples, responses (status, payload)
+    pairs:
+
+        GET    /products                 products, ?q= searches names
+                                         (?prefix=1), ?category_id= filters,
+                                         ?offset= and ?limit= page them
+        POST   /products                 add a product, or a list of them
+        PATCH  /products                 list of updates, see bulk_update
+        GET    /products/<id>            one product
+        PATCH  /products/<id>            fields to update, all or none
+        DELETE /products/<id>            remove a product
+        POST   /products/<id>/stock      {"delta": n}, see adjust_quantity
+        GET    /categories               categories
+        POST   /categories               {"name": name}
+        PATCH  /categories/<id>          {"name": name}
+        POST   /stock                    {"movements": [[id, delta], ...]}
+        GET    /value                    total value, ?category_id= filters
+        POST   /batch                    {"requests": [{"method", "path",
+                                         "body"}, ...]}, run in order
+
+    Invalid requests are answered with status 400 and {"error": message}.
+    """
+
+    _ROUTES = [
+        ("GET", re.compile(r"/products"), "_list_products"),
+        ("POST", re.compile(r"/products"), "_add_products"),
+        ("PATCH", re.compile(r"/products"), "_update_products"),
+        ("GET", re.compile(r"/products/(\d+)"), "_get_product"),
+        ("PATCH", re.compile(r"/products/(\d+)"), "_update_product"),
+        ("DELETE", re.compile(r"/products/(\d+)"), "_remove_product"),
+        ("POST", re.compile(r"/products/(\d+)/stock"), "_adjust_quantity"),
+        ("GET", re.compile(r"/categories"), "_list_categories"),
+        ("POST", re.compile(r"/categories"), "_add_category"),
+        ("PATCH", re.compile(r"/categories/(\d+)"), "_update_category"),
+        ("POST", re.compile(r"/stock"), "_apply_stock_movements"),
+        ("GET", re.compile(r"/value"), "_get_value"),
+        ("POST", re.compile(r"/batch"), "_batch"),
+    ]
+
+    def __init__(self, inventory: InventoryManager):
+        """
+        Initialize the service.
+        :param inventory: Inventory served, thread safety is enabled on it
+        so requests can be handled by several threads.
+        """
+        if not isinstance(inventory, InventoryManager):
+            raise TypeError("Inventory must be an InventoryManager.")
+        inventory.enable_thread_safety()
+        self._inventory: InventoryManager = inventory
+
+    @property
+    def inventory(self) -> InventoryManager:
+        """Returns the served inventory."""
+        return self._inventory
+
+    def handle(self, method: str, path: str, body=None) -> tuple[int, dict]:
+        """
+        Handles a request with an already decoded JSON body.
+        :return: The HTTP status and the JSON-compatible payload.
+        """
+        url = urlsplit(path)
+        query = {key: values[-1]
+                 for key, values in parse_qs(url.query).items()}
+        allowed = False
+        for route_method, pattern, handler in self._ROUTES:
+            match = pattern.fullmatch(url.path)
+            if not match:
+                continue
+            if route_method != method:
+                allowed = True
+                continue
+            args = [int(group) for group in match.groups()]
+            try:
+                return getattr(self, handler)(*args, query=query, body=body)
+            except KeyError as e:
+                return 400, {"error": f"Missing field {e}."}
+            except (TypeError, ValueError) as e:
+                return 400, {"error": str(e)}
+        if allowed:
+            return 405, {"error": f"Method {method} not allowed for "
+                                  f"{url.path}."}
+        return 404, {"error": f"Path {url.path} not found."}
+
+    def handle_raw(self, method: str, path: str,
+                   content: bytes) -> tuple[int, dict]:
+        """Handles a request whose body is JSON encoded, like handle."""
+        try:
+            body = DataHandler.loads(content) if content else None
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            return 400, {"error": f"Invalid JSON body: {e}"}
+        return self.handle(method, path, body)
+
+    @staticmethod
+    def _require(body, kind: type, name: str):
+        """Raises a TypeError unless the body has the expected type."""
+        if not isinstance(body, kind):
+            raise TypeError(f"Body must be {name}.")
+
+    @staticmethod
+    def _int_param(query: dict, name: str) -> int:
+        """Returns an integer query parameter, or None if it is missing."""
+        if name not in query:
+            return None
+        try:
+            return int(query[name])
+        except ValueError:
+            raise ValueError(f"Parameter {name} must be an integer.")
+
+    def _product_payload(self, product_id: int) -> tuple[int, dict]:
+        """Returns a product, or status 404 if it does not exist."""
+        product = self._inventory.find_product_by_id(product_id)
+        if product is None:
+            return 404, {"error": f"Product id {product_id} not found."}
+        return 200, self._inventory.product_to_dict(product)
+
+    def _list_products(self, query: dict, body) -> tuple[int, list]:
+        category_id = self._int_param(query, "category_id")
+        offset = self._int_param(query, "offset") or 0
+        limit = self._int_param(query, "limit")
+        if offset < 0 or (limit is not None and limit < 0):
+            raise ValueError("Parameters offset and limit must be "
+                             "non-negative.")
+        end = None if limit is None else offset + limit
+        if "q" in query:
+            products = self._inventory.search_product(
+                query["q"], prefix=query.get("prefix") in ("1", "true"))
+            products = [product for product in products or ()
+                        if category_id is None
+                        or product.category_id == category_id][offset:end]
+        else:
+            if category_id is None:
+                product_ids = self._inventory.products
+            else:
+                product_ids = self._inventory.get_product_ids_by_category(
+                    category_id)
+            # Only the products of the page are read
+            products = map(self._inventory.find_product_by_id,
+                           product_ids[offset:end])
+        # Products removed while the list was read are skipped
+        return 200, [self._inventory.product_to_dict(product)
+                     for product in products if product is not None]
+
+    def _add_products(self, query: dict, body) -> tuple[int, dict]:
+        if isinstance(body, list):
+            return 201, {"ids": self._inventory.bulk_add_products(body)}
+        self._require(body, dict, "a product or a list of products")
+        return 201, {"id": self._inventory.add_product(body)}
+
+    def _update_products(self, query: dict, body) -> tuple[int, dict]:
+        self._require(body, list, "a list of updates")
+        return 200, {"updated": self._inventory.bulk_update(body)}
+
+    def _get_product(self, product_id: int, query: dict,
+                     body) -> tuple[int, dict]:
+        return self._product_payload(product_id)
+
+    def _update_product(self, product_id: int, query: dict,
+                        body) -> tuple[int, dict]:
+        self._require(body, dict, "an object of fields")
+        if not self._inventory.product_exists(product_id):
+            return 404, {"error": f"Product id {product_id} not found."}
+        if body:
+            with self._inventory.transaction() as transaction:
+                transaction.update_product(product_id, **body)
+        return self._product_payload(product_id)
+
+    def _remove_product(self, product_id: int, query: dict,
+                        body) -> tuple[int, dict]:
+        if not self._inventory.product_exists(product_id):
+            return 404, {"error": f"Product id {product_id} not found."}
+        self._inventory.remove_product(product_id)
+        return 200, {"removed": product_id}
+
+    def _adjust_quantity(self, product_id: int, query: dict,
+                         body) -> tuple[int, dict]:
+        self._require(body, dict, "an object with a delta")
+        if not self._inventory.product_exists(product_id):
+            return 404, {"error": f"Product id {product_id} not found."}
+        return 200, {"quantity": self._inventory.adjust_quantity(
+            product_id, body["delta"])}
+
+    def _list_categories(self, query: dict, body) -> tuple[int, list]:
+        categories = map(self._inventory.find_category_by_id,
+                         self._inventory.categories)
+        return 200, [{"id": category.id, "name": category.name}
+                     for category in categories if category is not None]
+
+    def _add_category(self, query: dict, body) -> tuple[int, dict]:
+        self._require(body, dict, "an object with a name")
+        return 201, {"id": self._inventory.add_category(body["name"])}
+
+    def _update_category(self, category_id: int, query: dict,
+                         body) -> tuple[int, dict]:
+        self._require(body, dict, "an object with a name")
+        if not self._inventory.category_exists(category_id):
+            return 404, {"error": f"Category ID {category_id} not found."}
+        self._inventory.update_category_name(category_id, body["name"])
+        return 200, {"id": category_id, "name": body["name"]}
+
+    def _apply_stock_movements(self, query: dict, body) -> tuple[int, dict]:
+        self._require(body, dict, "an object with movements")
+        movements = [tuple(movement) if isinstance(movement, list)
+                     else movement for movement in body["movements"]]
+        return 200, {"updated":
+                     self._inventory.apply_stock_movements(movements)}
+
+    def _get_value(self, query: dict, body) -> tuple[int, dict]:
+        category_id = self._int_param(query, "category_id")
+        if category_id is None:
+            return 200, {"value":
+                         self._inventory.get_total_inventory_value()}
+        return 200, {"value": self._inventory.
+                     get_total_inventory_value_by_category(category_id)}
+
+    def _batch(self, query: dict, body) -> tuple[int, dict]:
+        self._require(body, dict, "an object with requests")
+        requests = body["requests"]
+        self._require(requests, list, "an object with a list of requests")
+        responses = []
+        for request in requests:
+            if not isinstance(request, dict) or "path" not in request:
+                status, payload = 400, {"error": "Request must be an object "
+                                                 "with a method and a path."}
+            elif urlsplit(request["path"]).path == "/batch":
+                status, payload = 400, {"error": "Batches cannot be nested."}
+            else:
+                status, payload = self.handle(request.get("method", "GET"),
+                                              request["path"],
+                                              request.get("body"))
+            responses.append({"status": status, "body": payload})
+        return 200, {"responses": responses}
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """Passes HTTP requests to the InventoryService of the server."""
+
+    # HTTP/1.1 keeps connections open between requests
+    protocol_version = "HTTP/1.1"
+    server_version = "InventoryService"
+    # Headers and body are small separate writes, which Nagle would delay
+    disable_nagle_algorithm = True
+
+    def _handle(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        content = self.rfile.read(length) if length else b""
+        status, payload = self.server.service.handle_raw(
+            self.command, self.path, content)
+        data = DataHandler.dumps(payload)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_PATCH = do_DELETE = _handle
+
+    def log_message(self, format, *args):
+        # A line per request would cost more than most requests
+        pass
+
+
+class InventoryHTTPServer(ThreadingHTTPServer):
+    """
+    HTTP server of an InventoryService, one thread per connection. The
+    inventory is the single writer of its files, clients share it through
+    the server instead of loading their own copy. Pending changes are
+    autosaved between requests if autosave is enabled.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int],
+                 inventory: InventoryManager):
+        """
+        Initialize the server and bind it to the address.
+        :param address: (host, port) pair, port 0 picks a free port.
+        """
+        self.service = InventoryService(inventory)
+        super().__init__(address, _RequestHandler)
+
+    def service_actions(self):
+        # Called by serve_forever about twice a second
+        self.service.inventory.autosave()
@@ -0,0 +1,128 @@
+import json
+import os
+
+
+class InventoryJournal:
+    """
+    Append-only journal of inventory changes.
+    Every change is stored as one compact JSON record per line, so writing
+    a change costs the size of the change and not the size of the inventory.
+    """
+
+    def __init__(self, filename: str):
+        """Initialize the journal for the given file."""
+        if not isinstance(filename, str):
+            raise TypeError("Filename must be a string.")
+        if not filename.strip():
+            raise ValueError("Filename must be a non-empty string.")
+        self.__filename: str = filename
+        self.__count: int = sum(1 for _ in self.records())
+        # Number of records removed from the front by truncate
+        self.__dropped: int = 0
+        self._filestream = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+    @property
+    def filename(self) -> str:
+        """Returns the filename of the journal."""
+        return self.__filename
+
+    @property
+    def count(self) -> int:
+        """Returns the number of records in the journal."""
+        return self.__count
+
+    @property
+    def position(self) -> int:
+        """Returns the number of records appended since the journal was
+        opened, including the removed ones. Pass it to truncate to remove
+        the records written until now."""
+        return self.__dropped + self.__count
+
+    def append(self, record: dict):
+        """Append one record to the journal."""
+        if not isinstance(record, dict):
+            raise TypeError("Journal record must be a dictionary.")
+        if self._filestream is None:
+            torn = self._has_torn_tail()
+            self._filestream = open(self.__filename, "a", encoding="utf-8")
+            if torn:
+                # New records must not be glued to a torn last line
+                self._filestream.write("\n")
+        self._filestream.write(json.dumps(record, separators=(",", ":")))
+        self._filestream.write("\n")
+        self._filestream.flush()
+        self.__count += 1
+
+    def _has_torn_tail(self) -> bool:
+        """Returns True if the file does not end with a line break, e.g.
+        after an interrupted write."""
+        try:
+            with open(self.__filename, "rb") as file:
+                file.seek(0, os.SEEK_END)
+                if file.tell() == 0:
+                    return False
+                file.seek(-1, os.SEEK_END)
+                return file.read(1) != b"\n"
+        except FileNotFoundError:
+            return False
+
+    def records(self):
+        """Yield the records of the journal in the order they were written."""
+        if not os.path.exists(self.__filename):
+            return
+        with open(self.__filename, "r", encoding="utf-8") as file:
+            for line in file:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn last line from an interrupted write is skipped
+                    continue
+
+    def sync(self):
+        """Flush the journal and force it to disk."""
+        if self._filestream:
+            self._filestream.flush()
+            os.fsync(self._filestream.fileno())
+
+    def truncate(self, position: int = None):
+        """
+        Remove all records from the journal.
+        :param position: Only remove the records before this position.
+        """
+        self.close()
+        if position is None:
+            open(self.__filename, "w", encoding="utf-8").close()
+            self.__dropped += self.__count
+            self.__count = 0
+            return
+        removed = min(position - self.__dropped, self.__count)
+        if removed <= 0:
+            return
+        kept = list(self.records())[removed:]
+        # The kept records are replaced at once, so a crash loses nothing
+        temp_filename = self.__filename + ".tmp"
+        with open(temp_filename, "w", encoding="utf-8") as file:
+            for record in kept:
+                file.write(json.dumps(record, separators=(",", ":")))
+                file.write("\n")
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_filename, self.__filename)
+        self.__dropped += removed
+        self.__count = len(kept)
+
+    def close(self):
+        """Close the journal file."""
+        if self._filestream:
+            self._filestream.close()
+            self._filestream = None
@@ -1,5 +1,8 @@
+from collections import deque
 from datetime import datetime
 import atexit
+import threading
+import time
 
 
 class InventoryLogger:
@@ -8,10 +11,41 @@ class InventoryLogger:
     and optional in a file.
     """
 
-    def __init__(self, filename: str = None):
-        """Initialize the logger and set up the log storage."""
-        self.__logs: list[str] = []
+    def __init__(self, filename: str = None, max_messages: int = 10000,
+                 buffered: bool = False, flush_size: int = 1000,
+                 flush_interval: float = 1.0):
+        """
+        Initialize the logger and set up the log storage.
+        :param max_messages: Number of recent messages kept in memory.
+        :param buffered: Write to the file in batches from a background
+        thread instead of on every call.
+        :param flush_size: Number of pending lines that triggers a write.
+        :param flush_interval: Seconds after which pending lines are written.
+        """
+        if not isinstance(max_messages, int):
+            raise TypeError("Max messages must be an integer.")
+        if max_messages <= 0:
+            raise ValueError("Max messages must be a positive integer.")
+        if not isinstance(flush_size, int):
+            raise TypeError("Flush size must be an integer.")
+        if flush_size <= 0:
+            raise ValueError("Flush size must be a positive integer.")
+        if not isinstance(flush_interval, (int, float)):
+            raise TypeError("Flush interval must be an integer or float.")
+        if flush_interval <= 0:
+            raise ValueError("Flush interval must be positive.")
+        self.__logs: deque[str] = deque(maxlen=max_messages)
         self.__filename: str = filename
+        self.__buffered: bool = buffered
+        self.__flush_size: int = flush_size
+        self.__flush_interval: float = flush_interval
+        self.__pending: list[str] = []
+        self.__condition = threading.Condition()
+        self.__write_lock = threading.Lock()
+        self.__flusher: threading.Thread = None
+        self.__stopping: bool = False
+        self.__timestamp_second: int = None
+        self.__timestamp: str = ""
         self._filestream = None
         if filename:
             self.logToFile(filename=filename)
@@ -37,27 +71,80 @@ class InventoryLogger:
             raise ValueError("Filename must be a non-empty string.")
         self.__filename = filename
 
+    @property
+    def buffered(self) -> bool:
+        """Returns True if file writes are batched."""
+        return self.__buffered
+
+    def _timestamp(self) -> str:
+        """Returns the current time as text, formatted once per second."""
+        second = int(time.time())
+        if second != self.__timestamp_second:
+            self.__timestamp = datetime.fromtimestamp(second).strftime(
+                "%Y-%m-%d %H:%M:%S")
+            self.__timestamp_second = second
+        return self.__timestamp
+
     def _open_filestream(self):
         if self.__filename:
             self._filestream = open(self.__filename, "a")
-            now: str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            self.log(f"Start logging at {now}.")
+            if self.__buffered:
+                self.__stopping = False
+                self.__flusher = threading.Thread(target=self._run_flusher,
+                                                  daemon=True)
+                self.__flusher.start()
+            self.log(f"Start logging at {self._timestamp()}.")
         else:
             self._filestream = None
 
     def _close_filestream(self):
         if self._filestream:
-            now: str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            self.log(f"Stop logging at {now}.")
+            self.log(f"Stop logging at {self._timestamp()}.")
+            if self.__flusher:
+                with self.__condition:
+                    self.__stopping = True
+                    self.__condition.notify()
+                self.__flusher.join()
+                self.__flusher = None
+            self.flush()
             self._filestream.close()
             self._filestream = None
 
+    def _run_flusher(self):
+        """Writes the pending lines in batches until the file is closed."""
+        while True:
+            with self.__condition:
+                if (not self.__stopping
+                        and len(self.__pending) < self.__flush_size):
+                    self.__condition.wait(self.__flush_interval)
+                stopping = self.__stopping
+            self.flush()
+            if stopping:
+                return
+
+    def flush(self):
+        """Writes all pending lines to the file."""
+        with self.__condition:
+            lines, self.__pending = self.__pending, []
+        with self.__write_lock:
+            if self._filestream:
+                if lines:
+                    self._filestream.write("".join(lines))
+                self._filestream.flush()
+
     def log(self, message: str):
         """Log a message by appending it to the log storage."""
         self.__logs.append(message)
         if self._filestream:
-            now: str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            self._filestream.write(f"[{now}]" + message + '\n')
+            line = f"[{self._timestamp()}]" + message + '\n'
+            if self.__buffered:
+                with self.__condition:
+                    self.__pending.append(line)
+                    if len(self.__pending) >= self.__flush_size:
+                        self.__condition.notify()
+            else:
+                with self.__write_lock:
+                    self._filestream.write(line)
 
     def get_logs(self) -> str:
         """Return the stored messages as a text with line breaks."""
@@ -1,6 +1,20 @@
 from inventory.product import Product
 from inventory.category import Category
 from inventory.inventory_logger import InventoryLogger
+from inventory.inventory_journal import InventoryJournal
+from inventory.audit_log import AuditLog
+from inventory.storage import StorageBackend
+from inventory.lazy_products import LazyProducts
+from inventory.save_worker import SaveWorker
+from inventory.autosave import AutosavePolicy
+from inventory.modification_index import ModificationIndex
+from inventory.search_index import SearchIndex
+from inventory.columnar_store import ColumnarStore
+from inventory.rw_lock import ReadWriteLock, read_locked, write_locked
+from inventory.transaction import Transaction
+from data_handler import DataHandler
+from contextlib import contextmanager
+import threading
 import time
 from user.user_manager import require_login
 
@@ -28,39 +42,130 @@ class InventoryManager:
         """Initializes the inventory manager with products and categories."""
         self._products: dict[int, Product] = {}
         self._categories: dict[int, Category] = {}
-        self._logger: InventoryLogger = InventoryLogger()
+        # Log lines are written in batches by a background thread
+        self._logger: InventoryLogger = InventoryLogger(buffered=True)
         self._logger.logToFile(filename="inventory.log")
+        self._journal: InventoryJournal = None
+        self._snapshot_filename: str = None
+        self._compact_threshold: int = 0
+        self._snapshot_options: dict = {}
+        # Writes journal compactions off the calling thread if enabled
+        self._save_worker: SaveWorker = None
+        self._compacting: bool = False
+        # Number of the latest change and of the latest saved change
+        self._change_count: int = 0
+        self._saved_change_count: int = 0
+        self._last_change_time: float = None
+        # Number of the latest unsaved change by product and category id
+        self._changed_products: dict[int, int] = {}
+        self._changed_categories: dict[int, int] = {}
+        self._autosave_policy: AutosavePolicy = None
+        # Products and categories by the time of their latest change, the
+        # products that were not changed are added on the first delta export
+        self._modifications: ModificationIndex = ModificationIndex()
+        self._modifications_complete: bool = False
+        self._audit_log: AuditLog = None
+        self._storage: StorageBackend = None
+        # Next free ids, persisted with the data so ids are never reused
+        self._next_product_id: int = 1
+        self._next_category_id: int = 1
+        self._category_names: dict[str, set[int]] = {}
+        # Built on the first search and kept current afterwards
+        self._search_index: SearchIndex = None
+        self._category_index: dict[int, set[int]] = None
+        # Running totals of price * quantity, built on first use
+        self._total_value: float = None
+        self._category_values: dict[int, list] = None
+        # Optional numeric columns for analytics queries
+        self._columns: ColumnarStore = None
+        # Stock held for open orders, by reservation id and by product id
+        self._reservations: dict[int, tuple[int, int]] = {}
+        self._reserved: dict[int, int] = {}
+        self._next_reservation_id: int = 1
+        # Held by the public methods once thread safety is enabled
+        self._lock: ReadWriteLock = None
+        # Serializes the caches that readers build on first use
+        self._cache_lock = threading.RLock()
 
+    @staticmethod
+    def _product_from_dict(prod: dict) -> Product:
+        """Creates a product from its JSON representation."""
+        return Product(
+            id=prod["id"],
+            name=prod["name"],
+            price=prod["price"],
+            quantity=prod["quantity"],
+            date_added=prod["date_added"],
+            last_modified=prod["last_modified"],
+            category_id=prod.get("category_id", 0),
+            description=prod.get("description", '')
+        )
+
+    @staticmethod
+    def product_to_dict(prod: Product) -> dict:
+        """Returns the JSON representation of a product."""
+        return {
+            "id": prod.id,
+            "name": prod.name,
+            "price": prod.price,
+            "quantity": prod.quantity,
+            "category_id": prod.category_id,
+            "date_added": prod.date_added,
+            "last_modified": prod.last_modified,
+            "description": prod.description
+        }
+
+    @staticmethod
+    def _iter_data_records(data: dict):
+        """Yields the entries of a JSON structure as (key, record) pairs,
+        like DataHandler.iter_json_records does for a file."""
+        for key, value in data.items():
+            if isinstance(value, list):
+                for record in value:
+                    yield key, record
+            else:
+                yield key, value
+
+    @write_locked
     def load_data_from_json(self, data):
-        """Loads products and categories from a JSON structure."""
-        # Load categories from the data
-        for cat in data.get("categories", []):
+        """Loads products and categories from a JSON structure, or from
+        (key, record) pairs as yielded by DataHandler.iter_json_records.
+        Records are loaded one at a time as they arrive.
+        If a journal is enabled, its changes are replayed afterwards."""
+        if isinstance(data, dict):
+            data = self._iter_data_records(data)
+
+        for key, record in data:
+            self._load_record(key, record)
+
+        if self._journal:
+            self.replay_journal()
+
+    def _load_record(self, key: str, record):
+        """Loads a single (key, record) pair of the JSON structure."""
+        if key == "categories":
             category = Category(
-                cat["id"],
-                cat["name"]
+                record["id"],
+                record["name"]
                 )
             # Add the category to the inventory
             self.load_categories(category=category)
+        elif key == "products":
+            self.load_products(product=self._product_from_dict(record))
+        elif key == "sequences":
+            self._next_product_id = max(self._next_product_id,
+                                        record.get("product", 1))
+            self._next_category_id = max(self._next_category_id,
+                                         record.get("category", 1))
 
-        # Load products from the data
-        for prod in data.get("products", []):
-            category_id = prod.get("category_id", 0)
-            description = prod.get("description", '')
-            product = Product(
-                id=prod["id"],
-                name=prod["name"],
-                price=prod["price"],
-                quantity=prod["quantity"],
-                date_added=prod["date_added"],
-                last_modified=prod["last_modified"],
-                category_id=category_id,
-                description=description
-            )
-            self.load_products(product=product)
-
-    def export_to_json(self):
+    @read_locked
+    def export_to_json(self, since: float = None):
         """Exports the current products and categories to a
-        JSON-compatible dictionary."""
+        JSON-compatible dictionary.
+        :param since: Only export the products and categories changed at or
+        after this timestamp, and the ids of the products removed since."""
+        if since is not None:
+            return self._export_delta(since)
         # Serialize categories
         categories = [
             {
@@ -71,31 +176,760 @@ class InventoryManager:
         ]
 
         # Serialize products
-        products = [
-            {
-                "id": prod.id,
-                "name": prod.name,
-                "price": prod.price,
-                "quantity": prod.quantity,
-                "category_id": prod.category_id,
-                "date_added": prod.date_added,
-                "last_modified": prod.last_modified,
-                "description": prod.description
-            }
-            for prod in self._products.values()
-        ]
+        products = [self.product_to_dict(prod)
+                    for prod in self._products.values()]
+
+        sequences = {"product": self._next_product_id,
+                     "category": self._next_category_id}
 
         # Combine categories and products into a single dictionary
-        return {"categories": categories, "products": products}
+        return {"categories": categories, "products": products,
+                "sequences": sequences}
+
+    def _export_delta(self, since: float) -> dict:
+        """Exports the changes since a timestamp, see export_to_json."""
+        if not isinstance(since, (int, float)):
+            raise TypeError("Since must be an integer or float.")
+        until = time.time()
+        with self._cache_lock:
+            if not self._modifications_complete:
+                # Products that were only loaded are indexed once
+                self._modifications.extend(
+                    (("product", prod.id), prod.last_modified)
+                    for prod in self._products.values())
+                self._modifications_complete = True
+        categories = []
+        products = []
+        removed = []
+        for entity, entity_id in self._modifications.since(since):
+            if entity == "category":
+                cat = self._categories[entity_id]
+                categories.append({"id": cat.id, "name": cat.name})
+            elif entity_id in self._products:
+                products.append(
+                    self.product_to_dict(self._products[entity_id]))
+            else:
+                removed.append({"id": entity_id, "removed":
+                                self._modifications.get(("product",
+                                                         entity_id))})
+        return {"since": since, "until": until, "categories": categories,
+                "products": products, "removed_products": removed,
+                "sequences": {"product": self._next_product_id,
+                              "category": self._next_category_id}}
+
+    # concurrency #
+    def enable_thread_safety(self):
+        """
+        Lets several threads use the inventory at the same time. Reads run
+        in parallel, changes wait for the running reads and exclude each
+        other. Enable it before the inventory is shared between threads.
+        Objects handed out, like the dictionary of get_products, are not
+        protected.
+        """
+        if self._lock is None:
+            self._lock = ReadWriteLock()
+
+    @write_locked
+    def disable_thread_safety(self):
+        """Stops locking, for an inventory used by a single thread."""
+        self._lock = None
+
+    @property
+    def thread_safe(self) -> bool:
+        """Returns True if thread safety is enabled."""
+        return self._lock is not None
+
+    # journal #
+    @write_locked
+    def enable_journal(self, filename: str, snapshot_filename: str,
+                       compact_threshold: int = 1000, backups: int = 0,
+                       checksum: bool = False, layout: str = "records"):
+        """
+        Records every change in an append-only journal instead of
+        rewriting the whole snapshot.
+        :param filename: File of the journal.
+        :param snapshot_filename: JSON snapshot the journal is compacted into.
+        :param compact_threshold: Number of journal records after which the
+        journal is compacted automatically, 0 disables automatic compaction.
+        :param backups: Number of previous snapshots kept.
+        :param checksum: Write a checksum file with every snapshot.
+        :param layout: Layout of the products in the snapshot, see
+        DataHandler.LAYOUTS. A snapshot filename ending with .gz or .xz
+        is compressed.
+        """
+        if not isinstance(compact_threshold, int):
+            raise TypeError("Compact threshold must be an integer.")
+        if compact_threshold < 0:
+            raise ValueError("Compact threshold must be non-negative.")
+        if not isinstance(backups, int):
+            raise TypeError("Backups must be an integer.")
+        if backups < 0:
+            raise ValueError("Backups must be non-negative.")
+        if layout not in DataHandler.LAYOUTS:
+            raise ValueError(f"Invalid layout '{layout}', expected one of "
+                             f"{', '.join(DataHandler.LAYOUTS)}.")
+        self.disable_journal()
+        self._journal = InventoryJournal(filename)
+        self._snapshot_filename = snapshot_filename
+        self._compact_threshold = compact_threshold
+        self._snapshot_options = {"backups": backups, "checksum": checksum,
+                                  "layout": layout}
+
+    @write_locked
+    def disable_journal(self):
+        """Stops recording changes in the journal."""
+        self.disable_background_saves()
+        if self._journal:
+            self._journal.close()
+        self._journal = None
+
+    @write_locked
+    def flush_journal(self):
+        """Forces the journaled changes to disk."""
+        if self._journal:
+            self._journal.sync()
+
+    @write_locked
+    def compact_journal(self):
+        """Writes the current state to the snapshot file and empties the
+        journal."""
+        if not self._journal:
+            return
+        data = self.export_to_json()
+        self._release_storage()
+        if self._save_worker:
+            # The snapshot is taken now and written in the background
+            self._save_worker.submit(
+                (data, self._snapshot_filename, self._snapshot_options),
+                tag=(self._snapshot_filename, self._journal.position,
+                     self._change_count))
+            self._compacting = True
+            return
+        change_count = self._change_count
+        DataHandler.save_to_json_file(data, self._snapshot_filename,
+                                      **self._snapshot_options)
+        self._journal.truncate()
+        self._mark_saved(change_count)
+        self._logger.log(f"Compacted journal into {self._snapshot_filename}.")
+
+    def _release_storage(self):
+        """Lets the storage backend close the files of lazy reads once all
+        products are loaded. A file held open could not be replaced by the
+        snapshot on Windows."""
+        if (self._storage is not None
+                and isinstance(self._products, LazyProducts)
+                and not self._products.unloaded):
+            self._storage.release()
+
+    @write_locked
+    def enable_background_saves(self):
+        """
+        Writes the snapshots of compact_journal in a background thread.
+        Snapshots requested while one is waiting are coalesced. poll_saves
+        must be called regularly on the thread that changes the inventory
+        to finish the saves.
+        """
+        if not self._journal:
+            raise ValueError("Background saves need an enabled journal.")
+        self.disable_background_saves()
+        self._save_worker = SaveWorker(self._write_snapshot)
+
+    @write_locked
+    def disable_background_saves(self) -> list[tuple[str, Exception]]:
+        """Waits for the pending background save and stops the worker.
+        Returns the finished saves like poll_saves."""
+        if not self._save_worker:
+            return []
+        self._save_worker.close()
+        results = self.poll_saves()
+        self._save_worker = None
+        self._compacting = False
+        return results
+
+    @staticmethod
+    def _write_snapshot(job: tuple):
+        """Writes a snapshot in the save worker thread."""
+        data, filename, options = job
+        DataHandler.save_to_json_file(data, filename, **options)
+
+    @write_locked
+    def poll_saves(self) -> list[tuple[str, Exception]]:
+        """
+        Finishes the background saves completed since the last call by
+        removing the saved changes from the journal.
+        Returns (filename, error) pairs, error is None if the save succeeded.
+        """
+        if not self._save_worker:
+            return []
+        results = []
+        for (filename, position, change_count), error in \
+                self._save_worker.poll():
+            if error is None:
+                if self._journal:
+                    self._journal.truncate(position)
+                self._mark_saved(change_count)
+                self._logger.log(f"Compacted journal into {filename}.")
+            else:
+                self._logger.log(f"Saving {filename} failed: {error}")
+            results.append((filename, error))
+        if not self._save_worker.busy:
+            self._compacting = False
+        return results
+
+    def wait_for_saves(self,
+                       timeout: float = None) -> list[tuple[str, Exception]]:
+        """Blocks until the background saves are written, then finishes
+        them like poll_saves."""
+        save_worker = self._save_worker
+        if save_worker:
+            # The worker does not use the inventory, so no lock is held
+            save_worker.wait(timeout)
+        return self.poll_saves()
+
+    def checkpoint(self) -> list[tuple[str, Exception]]:
+        """
+        Persists all changes now. The journal is compacted into the
+        snapshot if it is enabled, waiting for a background save, otherwise
+        the inventory is saved to the storage backend.
+        Returns the finished background saves like poll_saves.
+        """
+        if self._journal:
+            self.compact_journal()
+            return self.wait_for_saves()
+        self.save()
+        return []
+
+    @write_locked
+    def replay_journal(self):
+        """Applies the changes recorded in the journal to the inventory."""
+        if not self._journal:
+            return
+        for record in self._journal.records():
+            self._apply_journal_record(record)
+
+    def _record_change(self, record: dict):
+        """Passes a change record to the storage backend and the journal,
+        if enabled."""
+        if self._storage and self._storage.incremental:
+            # The records of a transaction are stored as one
+            self._storage.apply(record["records"]
+                                if record.get("op") == "transaction"
+                                else [record])
+        self._mark_record_changed(record)
+        if self._journal:
+            self._journal.append(record)
+            if (self._compact_threshold and not self._compacting
+                    and self._journal.count >= self._compact_threshold):
+                self.compact_journal()
+        if self._autosave_policy:
+            self.autosave()
+
+    def _apply_journal_record(self, record: dict):
+        """Applies a single journal record without logging it again."""
+        op = record.get("op")
+        if op == "add_category":
+            if record["id"] in self._categories:
+                self._untrack_category(self._categories[record["id"]])
+            category = Category(record["id"], record["name"])
+            self._categories[category.id] = category
+            self._track_category(category)
+            self._mark_record_changed(record)
+        elif op == "update_category_name":
+            category = self._categories.get(record["id"])
+            if category:
+                category.name = record["name"]
+        elif op == "add_product":
+            if record["id"] in self._products:
+                self._untrack_product(self._products[record["id"]])
+            product = self._product_from_dict(record)
+            self._products[product.id] = product
+            self._track_product(product)
+            self._mark_record_changed(record)
+        elif op == "add_products":
+            for prod in record["products"]:
+                self._apply_journal_record({**prod, "op": "add_product"})
+        elif op == "transaction":
+            for nested in record["records"]:
+                self._apply_journal_record(nested)
+        elif op == "update_products":
+            for update in record["updates"]:
+                product = self._products.get(update["id"])
+                if product:
+                    self._set_product_fields(product, update["values"],
+                                             record["last_modified"])
+        elif op == "remove_product":
+            product = self._products.pop(record["id"], None)
+            if product:
+                self._untrack_product(product)
+                self._mark_record_changed(record)
+        elif op == "update_product":
+            product = self._products.get(record["id"])
+            if product:
+                self._set_product_fields(
+                    product, {record["field"]: record["value"]},
+                    record["last_modified"])
+        else:
+            raise ValueError(f"Unknown journal operation '{op}'.")
+
+    # change tracking #
+    def _mark_changed(self, entity: str, entity_id: int):
+        """Counts a change of a product or category."""
+        self._change_count += 1
+        self._last_change_time = time.monotonic()
+        changes = (self._changed_products if entity == "product"
+                   else self._changed_categories)
+        changes[entity_id] = self._change_count
+        if entity == "product" and entity_id in self._products:
+            timestamp = self._products[entity_id].last_modified
+        else:
+            # Categories have no timestamp, removals happen now
+            timestamp = time.time()
+        self._modifications.touch((entity, entity_id), timestamp)
+
+    def _mark_record_changed(self, record: dict):
+        """Counts the products and categories a change record adds or
+        removes, updates are counted by the watchers."""
+        op = record.get("op")
+        if op == "add_category":
+            self._mark_changed("category", record["id"])
+        elif op in ("add_product", "remove_product"):
+            self._mark_changed("product", record["id"])
+        elif op == "add_products":
+            for prod in record["products"]:
+                self._mark_changed("product", prod["id"])
+
+    def _mark_saved(self, change_count: int):
+        """Marks the changes up to the given number as saved."""
+        if change_count <= self._saved_change_count:
+            return
+        self._saved_change_count = change_count
+        for changes in (self._changed_products, self._changed_categories):
+            for entity_id in [entity_id for entity_id, number
+                              in changes.items() if number <= change_count]:
+                del changes[entity_id]
+
+    @property
+    @read_locked
+    def change_count(self) -> int:
+        """Returns the number of changes since the inventory was created."""
+        return self._change_count
+
+    @property
+    @read_locked
+    def pending_changes(self) -> int:
+        """Returns the number of changes that are not saved yet."""
+        return self._change_count - self._saved_change_count
+
+    @read_locked
+    def is_dirty(self) -> bool:
+        """Returns True if there are changes that are not saved yet."""
+        return self.pending_changes > 0
+
+    @read_locked
+    def get_dirty_products(self) -> list[int]:
+        """Returns the sorted ids of the products with unsaved changes."""
+        return sorted(self._changed_products)
+
+    @read_locked
+    def get_dirty_categories(self) -> list[int]:
+        """Returns the sorted ids of the categories with unsaved changes."""
+        return sorted(self._changed_categories)
+
+    @write_locked
+    def enable_autosave(self, debounce: float = 2.0, max_pending: int = 100,
+                        min_interval: float = 1.0, max_busy: float = 0.2):
+        """
+        Saves pending changes automatically, see AutosavePolicy for the
+        parameters. A save compacts the journal if it is enabled, otherwise
+        it saves to the storage backend. Call autosave(idle=True) whenever
+        the application waits for the user.
+        """
+        if not self._journal and not self._storage:
+            raise ValueError("Autosave needs a journal or a storage backend.")
+        self._autosave_policy = AutosavePolicy(debounce, max_pending,
+                                               min_interval, max_busy)
+
+    @write_locked
+    def disable_autosave(self):
+        """Stops saving changes automatically."""
+        self._autosave_policy = None
+
+    @write_locked
+    def autosave(self, idle: bool = False) -> bool:
+        """
+        Saves the pending changes if the autosave policy says so.
+        :param idle: The application waits for the user.
+        Returns True if a save was started.
+        """
+        if not self._autosave_policy or self._compacting:
+            return False
+        if not self._autosave_policy.due(self.pending_changes,
+                                         self._last_change_time, idle):
+            return False
+        start = time.monotonic()
+        if self._journal:
+            self.compact_journal()
+        else:
+            self.save()
+        self._autosave_policy.saved(time.monotonic() - start)
+        return True
+
+    # indexes #
+    def _track_category(self, category: Category):
+        """Adds a category to the name index and watches it for changes."""
+        category.set_watcher(self._on_category_changed)
+        self._category_names.setdefault(category.name, set()).add(category.id)
+        self._next_category_id = max(self._next_category_id, category.id + 1)
+
+    def _untrack_category(self, category: Category):
+        """Removes a category from the name index."""
+        category.set_watcher(None)
+        self._discard_category_name(category.name, category.id)
+
+    def _discard_category_name(self, name: str, category_id: int):
+        """Removes a category id from the name index."""
+        category_ids = self._category_names.get(name)
+        if category_ids is None:
+            return
+        category_ids.discard(category_id)
+        if not category_ids:
+            del self._category_names[name]
+
+    def _on_category_changed(self, category: Category, field: str,
+                             old_value):
+        """Keeps the name index current when a category was renamed."""
+        self._mark_changed("category", category.id)
+        self._discard_category_name(old_value, category.id)
+        self._category_names.setdefault(category.name, set()).add(category.id)
+
+    def _track_product(self, product: Product):
+        """Adds a product to the indexes and watches it for changes."""
+        product.set_watcher(self._on_product_changed)
+        self._next_product_id = max(self._next_product_id, product.id + 1)
+        if (self._modifications_complete
+                and ("product", product.id) not in self._modifications):
+            self._modifications.touch(("product", product.id),
+                                      product.last_modified)
+        if self._columns is not None:
+            self._columns.add(product)
+        if self._search_index is not None:
+            self._search_index.add(product.id, product.name)
+        if self._category_index is not None:
+            self._category_index.setdefault(
+                product.category_id, set()).add(product.id)
+        if self._total_value is not None:
+            self._add_to_totals(product.category_id,
+                                product.price * product.quantity, 1)
+
+    def _untrack_product(self, product: Product):
+        """Removes a product from the indexes."""
+        product.set_watcher(None)
+        if self._columns is not None:
+            self._columns.remove(product.id)
+        if self._search_index is not None:
+            self._search_index.remove(product.id)
+        if self._category_index is not None:
+            self._discard_from_category_index(product.category_id,
+                                              product.id)
+        if self._total_value is not None:
+            self._add_to_totals(product.category_id,
+                                -product.price * product.quantity, -1)
+
+    def _on_product_changed(self, product: Product, field: str, old_value):
+        """Keeps the indexes current when a field of a product changed."""
+        self._mark_changed("product", product.id)
+        if self._columns is not None:
+            self._columns.update(product)
+        if field == "name" and self._search_index is not None:
+            self._search_index.add(product.id, product.name)
+        elif field == "category_id" and self._category_index is not None:
+            self._discard_from_category_index(old_value, product.id)
+            self._category_index.setdefault(
+                product.category_id, set()).add(product.id)
+        if self._total_value is None:
+            return
+        if field == "price":
+            self._add_to_totals(product.category_id,
+                                (product.price - old_value)
+                                * product.quantity, 0)
+        elif field == "quantity":
+            self._add_to_totals(product.category_id,
+                                product.price
+                                * (product.quantity - old_value), 0)
+        elif field == "category_id":
+            value = product.price * product.quantity
+            self._add_to_totals(old_value, -value, -1)
+            self._add_to_totals(product.category_id, value, 1)
+
+    def _add_to_totals(self, category_id: int, delta: float, count: int):
+        """Applies a value delta to the running totals. count is the change
+        of the number of products in the category."""
+        if self._products:
+            self._total_value += delta
+        else:
+            # Reset to avoid accumulating rounding errors
+            self._total_value = 0.0
+        entry = self._category_values.setdefault(category_id, [0.0, 0])
+        entry[1] += count
+        if entry[1] > 0:
+            entry[0] += delta
+        else:
+            del self._category_values[category_id]
+
+    def _compute_totals(self) -> tuple[float, dict[int, list]]:
+        """Computes the total and the per-category values from scratch."""
+        total = 0.0
+        category_values: dict[int, list] = {}
+        for product in self._products.values():
+            value = product.price * product.quantity
+            total += value
+            entry = category_values.setdefault(product.category_id, [0.0, 0])
+            entry[0] += value
+            entry[1] += 1
+        return total, category_values
+
+    def _ensure_totals(self):
+        """Builds the running totals on first use."""
+        if self._total_value is None:
+            with self._cache_lock:
+                if self._total_value is None:
+                    self._total_value, self._category_values = \
+                        self._compute_totals()
+
+    @read_locked
+    def verify_inventory_totals(self, tolerance: float = 1e-6) -> float:
+        """
+        Recomputes the inventory value from scratch and compares it with the
+        running totals. Any drift above the tolerance is logged, and the
+        running totals are reset to the recomputed values.
+        :return: The largest absolute drift found.
+        """
+        with self._cache_lock:
+            self._ensure_totals()
+            total, category_values = self._compute_totals()
+            drift = abs(self._total_value - total)
+            for category_id in (set(category_values)
+                                | set(self._category_values)):
+                running = self._category_values.get(category_id,
+                                                    [0.0, 0])[0]
+                exact = category_values.get(category_id, [0.0, 0])[0]
+                drift = max(drift, abs(running - exact))
+            if drift > tolerance:
+                self._logger.log(f"Inventory value drifted by {drift}, "
+                                 "running totals reset.")
+            self._total_value = total
+            self._category_values = category_values
+        return drift
+
+    def _discard_from_category_index(self, category_id: int,
+                                     product_id: int):
+        """Removes a product id from the index of its category."""
+        product_ids = self._category_index.get(category_id)
+        if product_ids is None:
+            return
+        product_ids.discard(product_id)
+        if not product_ids:
+            del self._category_index[category_id]
+
+    def _get_search_index(self) -> SearchIndex:
+        """Returns the search index, building it on first use."""
+        if self._search_index is None:
+            with self._cache_lock:
+                if self._search_index is None:
+                    index = SearchIndex()
+                    for product in self._products.values():
+                        index.add(product.id, product.name)
+                    self._search_index = index
+        return self._search_index
+
+    def _get_category_product_ids(self, category_id: int) -> list[int]:
+        """Returns the sorted product ids of a category, building the
+        category index on first use."""
+        if self._category_index is None:
+            with self._cache_lock:
+                if self._category_index is None:
+                    index: dict[int, set[int]] = {}
+                    for product in self._products.values():
+                        index.setdefault(product.category_id,
+                                         set()).add(product.id)
+                    self._category_index = index
+        return sorted(self._category_index.get(category_id, ()))
+
+    # columnar store #
+    @write_locked
+    def enable_columnar_store(self, use_numpy: bool = None):
+        """
+        Mirrors the numeric product fields into contiguous columns, which
+        makes range queries and analytics over many products vectorized.
+        :param use_numpy: Use NumPy arrays, by default if NumPy is installed.
+        """
+        columns = ColumnarStore(use_numpy=use_numpy)
+        for product in self._products.values():
+            columns.add(product)
+        self._columns = columns
+
+    @write_locked
+    def disable_columnar_store(self):
+        """Drops the numeric columns."""
+        self._columns = None
+
+    @property
+    @read_locked
+    def columnar_store(self) -> ColumnarStore:
+        """Returns the columnar store, or None if it is not enabled."""
+        return self._columns
+
+    @read_locked
+    def get_products_in_range(self, field: str, low=None,
+                              high=None) -> list[int]:
+        """
+        Returns the sorted ids of the products whose field lies between low
+        and high, both inclusive. None leaves a side of the range open.
+        :param field: One of "price", "quantity", "category_id",
+        "date_added" or "last_modified".
+        """
+        if field not in ColumnarStore.COLUMNS or field == "id":
+            raise ValueError(f"Invalid field '{field}' specified.")
+        if self._columns is not None:
+            return self._columns.ids_in_range(field, low, high)
+        return sorted(product.id for product in self._products.values()
+                      if (low is None or getattr(product, field) >= low)
+                      and (high is None or getattr(product, field) <= high))
+
+    # storage #
+    @write_locked
+    def set_storage(self, storage: StorageBackend):
+        """
+        Sets the storage backend the inventory is persisted in.
+        Incremental backends receive every change as it happens, the
+        others are written as a whole by save.
+        """
+        if storage is not None and not isinstance(storage, StorageBackend):
+            raise TypeError("Storage must be a StorageBackend or None.")
+        self._storage = storage
+        if (storage is not None and storage.incremental
+                and (self._products or self._categories)):
+            # The backend never received the data held so far, so the
+            # next save writes it as a whole
+            storage.dirty = True
+
+    @write_locked
+    def load_from_storage(self, lazy: bool = False):
+        """
+        Loads products and categories from the storage backend.
+        :param lazy: Only load the product ids, each product is read from
+        the storage on its first access.
+        """
+        if not self._storage:
+            raise ValueError("No storage backend is set.")
+        if not lazy:
+            self.load_data_from_json(self._storage.load())
+            return
+
+        if not isinstance(self._products, LazyProducts):
+            products = LazyProducts(self._hydrate_product,
+                                    lock=self._cache_lock)
+            products.update(self._products)
+            self._products = products
+        for key, record in self._storage.load_index():
+            if key == "products":
+                self._products.register(record)
+                self._next_product_id = max(self._next_product_id,
+                                            record + 1)
+            else:
+                self._load_record(key, record)
+        # Indexes built before do not know the registered ids
+        self._search_index = None
+        self._category_index = None
+        self._total_value = None
+        self._category_values = None
+        self._modifications_complete = False
+        if self._columns is not None:
+            self.enable_columnar_store(self._columns.uses_numpy)
+        if self._journal:
+            self.replay_journal()
+
+    def _hydrate_product(self, product_id: int) -> Product:
+        """Reads a lazily loaded product from the storage backend."""
+        product = self._product_from_dict(
+            self._storage.get_product(product_id))
+        self._track_product(product)
+        return product
+
+    @write_locked
+    def save(self):
+        """Persists the inventory in the storage backend. Incremental
+        backends are already up to date unless they are dirty."""
+        if not self._storage:
+            raise ValueError("No storage backend is set.")
+        change_count = self._change_count
+        if not self._storage.incremental or self._storage.dirty:
+            self._storage.save_all(self.export_to_json())
+        self._mark_saved(change_count)
+
+    # audit log #
+    @write_locked
+    def enable_audit_log(self, filename: str,
+                         max_bytes: int = 10 * 1024 * 1024,
+                         backup_count: int = 5):
+        """
+        Records every change with its old and new values in a structured,
+        rotating audit log.
+        """
+        self.disable_audit_log()
+        self._audit_log = AuditLog(filename, max_bytes=max_bytes,
+                                   backup_count=backup_count)
+
+    @write_locked
+    def disable_audit_log(self):
+        """Stops recording changes in the audit log."""
+        if self._audit_log:
+            self._audit_log.close()
+        self._audit_log = None
+
+    @read_locked
+    def get_audit_trail(self, product_id: int = None, since: float = None,
+                        until: float = None,
+                        category_id: int = None) -> list[dict]:
+        """
+        Returns the recorded changes, oldest first, optionally only those of
+        a product or a category and within a time range.
+        """
+        if not self._audit_log:
+            raise ValueError("The audit log is not enabled.")
+        if category_id is not None:
+            return self._audit_log.query(category_id, since, until,
+                                         entity="category")
+        return self._audit_log.query(product_id, since, until)
+
+    def _audit(self, event: str, entity_id: int, old=None, new=None,
+               timestamp: float = None, entity: str = "product"):
+        """Records a change in the audit log, if enabled."""
+        if self._audit_log:
+            self._audit_log.record(event, entity_id, old, new,
+                                   timestamp=timestamp, entity=entity)
+
+    def _record_product_update(self, product: Product, field: str,
+                               old_value):
+        """Journals and audits the new value of a single product field."""
+        new_value = getattr(product, field)
+        self._record_change({"op": "update_product", "id": product.id,
+                              "field": field, "value": new_value,
+                              "last_modified": product.last_modified})
+        self._audit(f"update_{field}", product.id, old_value, new_value,
+                    timestamp=product.last_modified)
 
     @property
+    @read_locked
     def products(self):
         return list(self._products.keys())
 
     @property
+    @read_locked
     def categories(self):
         return list(self._categories.keys())
 
+    @write_locked
     def load_categories(self, category: Category):
         """Loads categories to the inventory."""
         if not category and not isinstance(category, Category):
@@ -104,18 +938,25 @@ class InventoryManager:
         if category.id in self._categories:
             raise ValueError(f"Category ID {category.id} already exists.")
         self._categories[category.id] = category
+        self._track_category(category)
 
+    @write_locked
     def add_category(self, name: str) -> int:
         """Adds a category to the inventory."""
-        if name in [category.name for category in self._categories.values()]:
+        if name in self._category_names:
             raise ValueError(f"Category name '{name}' already exists.")
-        new_id = self.get_max_category_id() + 1  # Generate new category ID
+        new_id = self._next_category_id  # Generate new category ID
         new_category = Category(new_id, name)
         # Add the new category to the inventory
         self._categories[new_id] = new_category
+        self._track_category(new_category)
         self._logger.log(f"Adding new category {name}, id {new_id}.")
+        self._record_change({"op": "add_category", "id": new_id,
+                              "name": name})
+        self._audit("add", new_id, new=name, entity="category")
         return new_id
 
+    @write_locked
     def load_products(self, product: Product):
         """Load products to the inventory."""
 
@@ -126,9 +967,12 @@ class InventoryManager:
         if product.id in self._products:
             raise ValueError(f"Product ID {product.id} already exists.")
         self._products[product.id] = product
+        self._track_product(product)
 
-    def add_product(self, product_data: dict) -> id:
-        # Adds a product to the inventory.
+    @staticmethod
+    def _new_product(product_data: dict, new_id: int,
+                     date_added: float) -> Product:
+        """Creates a new product from the data given to add_product."""
         if not isinstance(product_data, dict):
             raise TypeError("Product data must be a dictionary.")
 
@@ -146,26 +990,35 @@ class InventoryManager:
         # Default to an empty string if not provided
         description = product_data.get("description", "")
 
-        # Generate new ID for the product
-        new_id = self.get_max_product_id() + 1
+        # Create a new Product object
+        return Product(id=new_id, name=name, price=price,
+                       quantity=quantity,
+                       category_id=category,
+                       date_added=date_added,
+                       last_modified=date_added,
+                       description=description
+                       )
 
+    @write_locked
+    def add_product(self, product_data: dict) -> id:
+        # Adds a product to the inventory.
+        # Generate new ID for the product
+        new_id = self._next_product_id
         date_added: float = float(time.time())
-        last_modified: float = date_added
-
-        # Create a new Product object
-        new_product = Product(id=new_id, name=name, price=price,
-                              quantity=quantity,
-                              category_id=category,
-                              date_added=date_added,
-                              last_modified=last_modified,
-                              description=description
-                              )
+        new_product = self._new_product(product_data, new_id, date_added)
+        name = new_product.name
 
         # Add the new product to the inventory
         self._products[new_id] = new_product
+        self._track_product(new_product)
         self._logger.log(f"Adding new product {name}, id {new_id}.")
+        record = self.product_to_dict(new_product)
+        self._audit("add", new_id, new=record, timestamp=date_added)
+        record["op"] = "add_product"
+        self._record_change(record)
         return new_id
 
+    @write_locked
     def remove_product(self, product_id: int):
         """Removes a product from the inventory."""
         if product_id not in self._products:
@@ -173,8 +1026,13 @@ class InventoryManager:
                 f"Product id {product_id} not found in inventory.")
         name = self._products[product_id].name
         self._logger.log(f"Removing product {name}, id {product_id}.")
-        del self._products[product_id]
+        product = self._products.pop(product_id)
+        self._untrack_product(product)
+        self._drop_reservations(product_id)
+        self._record_change({"op": "remove_product", "id": product_id})
+        self._audit("remove", product_id, old=self.product_to_dict(product))
 
+    @write_locked
     def remove_category(self, category_id: int):
         """Removes a category from the inventory."""
         if category_id not in self._categories:
@@ -184,22 +1042,32 @@ class InventoryManager:
         self._logger.log(f"Removing category {name}, id {category_id}.")
         # Set the name of the category to "Unknown"
         self._categories[category_id].name = "Unknown"
+        self._record_change({"op": "update_category_name",
+                              "id": category_id, "name": "Unknown"})
+        self._audit("remove", category_id, old=name, new="Unknown",
+                    entity="category")
 
+    @read_locked
     def get_products(self) -> dict[int, Product]:
         """Returns the dictionary of products."""
         return self._products
 
+    @read_locked
     def get_categories(self) -> dict[int, Category]:
         """Returns the dictionary of categories."""
         return self._categories
 
+    @read_locked
     def product_exists(self, product_id: int) -> bool:
-        return self.find_product_by_id(product_id) is not None
+        # A membership test does not load a lazily loaded product
+        return product_id in self._products
 
+    @read_locked
     def category_exists(self, category_id: int):
         return self.find_category_by_id(category_id) is not None
 
     # update product name
+    @write_locked
     def update_product_name(self, product_id: int, name: str):
         """
         Updates the name of a product in the inventory.
@@ -210,8 +1078,10 @@ class InventoryManager:
         self._logger.log(f"Updating product name {oldname} to {name}, "
                          f"id {product_id}.")
         product.name = name  # Calls the setter in the Product class
+        self._record_product_update(product, "name", oldname)
 
     # update category name
+    @write_locked
     def update_category_name(self, category_id: int, name: str):
         """
         Updates the name of a category in the inventory.
@@ -224,37 +1094,441 @@ class InventoryManager:
                          f"id {category_id}.")
         # Calls the setter in the Category class
         self._categories[category_id].name = name
+        self._record_change({"op": "update_category_name",
+                              "id": category_id, "name": name})
+        self._audit("update_name", category_id, oldname, name,
+                    entity="category")
 
+    @write_locked
     def update_product_quantity(self, product_id: int, quantity: int):
         """Updates the quantity of a product in the inventory."""
-        self.validate_product_id(product_id)
+        product = self.validate_product_id(product_id)
+        self._check_reserved(product_id, quantity)
+        old_quantity = product.quantity
         self._logger.log(f"Updating product quantity {quantity}, "
                          f"id {product_id}.")
-        self._products[product_id].quantity = quantity
+        product.quantity = quantity
+        self._record_product_update(product, "quantity", old_quantity)
 
+    @write_locked
     def update_product_price(self, product_id: int, price: float):
         """Updates the price of a product in the inventory."""
-        self.validate_product_id(product_id)
+        product = self.validate_product_id(product_id)
+        old_price = product.price
         self._logger.log(f"Updating product price {price}, "
                          f"id {product_id}.")
-        self._products[product_id].price = price
+        product.price = price
+        self._record_product_update(product, "price", old_price)
 
+    @write_locked
     def update_product_description(self, product_id: int, description: str):
         """Updates the price of a product in the inventory."""
-        self.validate_product_id(product_id)
+        product = self.validate_product_id(product_id)
+        old_description = product.description
         self._logger.log(f"Updating product description {description}, "
                          f"id {product_id}.")
-        self._products[product_id].description = description
+        product.description = description
+        self._record_product_update(product, "description", old_description)
 
+    @write_locked
     def update_product_category(self, product_id: int, category_id: int):
         """Update the category id of a product in the inventory."""
-        self.validate_product_id(product_id)
-        old_id = self._products[product_id].category_id
+        product = self.validate_product_id(product_id)
+        old_id = product.category_id
         self._logger.log(f"Updating product category {old_id} to "
                          f"{category_id}, product id {product_id}.")
-        self._products[product_id].category_id = category_id
+        product.category_id = category_id
+        self._record_product_update(product, "category_id", old_id)
+
+    # bulk #
+    @staticmethod
+    def _raise_bulk_errors(errors: list[str]):
+        """Raises a ValueError summarizing the invalid rows of a batch."""
+        if not errors:
+            return
+        shown = "; ".join(errors[:5])
+        more = f" and {len(errors) - 5} more" if len(errors) > 5 else ""
+        raise ValueError(f"{len(errors)} invalid rows, nothing was changed: "
+                         f"{shown}{more}.")
+
+    @write_locked
+    def bulk_add_products(self, products_data) -> list[int]:
+        """
+        Adds many products at once. All rows are validated before the
+        inventory is changed, so either all or none of them are added.
+        :param products_data: Iterable of dictionaries as for add_product.
+        :return: List of the new product ids, in the order of the rows.
+        """
+        first_id = self._next_product_id
+        date_added: float = float(time.time())
+        new_products: list[Product] = []
+        errors: list[str] = []
+        for row, product_data in enumerate(products_data):
+            try:
+                new_products.append(self._new_product(
+                    product_data, first_id + len(new_products), date_added))
+            except (TypeError, ValueError) as e:
+                errors.append(f"row {row}: {e}")
+        self._raise_bulk_errors(errors)
+        if not new_products:
+            return []
+
+        for product in new_products:
+            self._products[product.id] = product
+            self._track_product(product)
+        last_id = new_products[-1].id
+        self._logger.log(f"Adding {len(new_products)} new products, "
+                         f"ids {first_id} to {last_id}.")
+        records = [self.product_to_dict(product) for product in new_products]
+        self._record_change({"op": "add_products", "products": records})
+        for record in records:
+            self._audit("add", record["id"], new=record, timestamp=date_added)
+        return [product.id for product in new_products]
+
+    @write_locked
+    def bulk_update(self, updates) -> int:
+        """
+        Updates fields of many products at once. All rows are validated
+        before the inventory is changed, so either all or none of them are
+        applied.
+        :param updates: Iterable of dictionaries with the product "id" and
+        any of "name", "price", "quantity", "category_id" and "description".
+        :return: Number of updated products.
+        """
+        fields = ("name", "price", "quantity", "category_id", "description")
+        changes: list[tuple[Product, dict]] = []
+        errors: list[str] = []
+        for row, update in enumerate(updates):
+            try:
+                if not isinstance(update, dict):
+                    raise TypeError("Update must be a dictionary.")
+                product = self.validate_product_id(update.get("id"))
+                values = {key: value for key, value in update.items()
+                          if key != "id"}
+                unknown = set(values) - set(fields)
+                if unknown:
+                    raise ValueError("Unknown fields "
+                                     f"{', '.join(sorted(unknown))}.")
+                # A scratch product runs the same validation as Product
+                self._product_from_dict(
+                    {**self.product_to_dict(product), **values})
+                if "quantity" in values:
+                    self._check_reserved(product.id, values["quantity"])
+                if values:
+                    # A row without fields changes nothing
+                    changes.append((product, values))
+            except (TypeError, ValueError) as e:
+                errors.append(f"row {row}: {e}")
+        self._raise_bulk_errors(errors)
+        if not changes:
+            return 0
+
+        last_modified: float = time.time()
+        records = []
+        for product, values in changes:
+            old_values = {field: getattr(product, field) for field in values}
+            self._set_product_fields(product, values, last_modified)
+            records.append({"id": product.id, "values": values})
+            self._audit("update", product.id, old_values, values,
+                        timestamp=last_modified)
+        self._logger.log(f"Updating {len(changes)} products in bulk.")
+        self._record_change({"op": "update_products",
+                              "last_modified": last_modified,
+                              "updates": records})
+        return len(changes)
+
+    def _set_product_fields(self, product: Product, values: dict,
+                            last_modified: float):
+        """Sets several fields of a product with a single timestamp."""
+        for field, value in values.items():
+            setattr(product, field, value)
+        product.update_last_modified(last_modified)
+        self._modifications.touch(("product", product.id), last_modified)
+        if self._columns is not None:
+            # The watcher copied the fields, but not the shared timestamp
+            self._columns.update_last_modified(product.id, last_modified)
+
+    # transactions #
+    @contextmanager
+    def transaction(self):
+        """
+        Stages changes of several products and categories and applies them
+        together when the with block ends:
+
+            with inventory.transaction() as transaction:
+                transaction.update_product(1, name="Pen", price=1.5)
+                transaction.update_category_name(2, "Office")
+
+        All changes are validated first and share one last_modified
+        timestamp, one log line and one journal record. If the block
+        raises or a change is invalid, nothing is changed.
+        """
+        transaction = Transaction()
+        yield transaction
+        self.commit_transaction(transaction)
+
+    @write_locked
+    def commit_transaction(self, transaction: Transaction):
+        """
+        Validates and applies the changes staged in a transaction, all or
+        none. Used by transaction, or directly with a Transaction staged
+        elsewhere, e.g. by AsyncInventoryManager.transaction.
+        """
+        if not isinstance(transaction, Transaction):
+            raise TypeError("Transaction must be a Transaction.")
+        product_changes: list[tuple[Product, dict]] = []
+        category_changes: list[tuple[Category, str]] = []
+        errors: list[str] = []
+        for product_id, values in transaction.products.items():
+            try:
+                product = self.validate_product_id(product_id)
+                # A scratch product runs the same validation as Product
+                self._product_from_dict(
+                    {**self.product_to_dict(product), **values})
+                if "quantity" in values:
+                    self._check_reserved(product_id, values["quantity"])
+                product_changes.append((product, values))
+            except (TypeError, ValueError) as e:
+                errors.append(f"product {product_id}: {e}")
+        for category_id, name in transaction.categories.items():
+            try:
+                category = self.find_category_by_id(category_id)
+                if category is None:
+                    raise ValueError(f"Category ID {category_id} not "
+                                     "found in the inventory.")
+                Category(category_id, name)
+                category_changes.append((category, name))
+            except (TypeError, ValueError) as e:
+                errors.append(f"category {category_id}: {e}")
+        self._raise_bulk_errors(errors)
+        if not product_changes and not category_changes:
+            return
+
+        last_modified: float = time.time()
+        old_products = [(product, {field: getattr(product, field)
+                                   for field in values},
+                         product.last_modified)
+                        for product, values in product_changes]
+        old_categories = [(category, category.name)
+                          for category, _ in category_changes]
+        try:
+            for product, values in product_changes:
+                self._set_product_fields(product, values, last_modified)
+            for category, name in category_changes:
+                category.name = name
+        except Exception:
+            # Undo the changes applied before the error
+            for product, values, old_modified in old_products:
+                self._set_product_fields(product, values, old_modified)
+            for category, name in old_categories:
+                category.name = name
+            raise
+
+        records = []
+        if product_changes:
+            records.append({"op": "update_products",
+                            "last_modified": last_modified,
+                            "updates": [{"id": product.id, "values": values}
+                                        for product, values
+                                        in product_changes]})
+        records += [{"op": "update_category_name", "id": category.id,
+                     "name": name} for category, name in category_changes]
+        self._logger.log(f"Committing transaction of "
+                         f"{len(product_changes)} products and "
+                         f"{len(category_changes)} categories.")
+        self._record_change({"op": "transaction", "records": records})
+        for (product, values), (_, old_values, _) in zip(product_changes,
+                                                         old_products):
+            self._audit("update", product.id, old_values, values,
+                        timestamp=last_modified)
+        for (category, name), (_, old_name) in zip(category_changes,
+                                                   old_categories):
+            self._audit("update_name", category.id, old_name, name,
+                        entity="category")
+
+    # stock #
+    @staticmethod
+    def _validate_delta(delta):
+        """Validates a change of a quantity."""
+        if not isinstance(delta, int):
+            raise TypeError("Delta must be an integer.")
+        # bool is a subclass of int, but True is no quantity
+        if isinstance(delta, bool):
+            raise ValueError("Delta must be an integer, not a boolean.")
+
+    def _check_stock(self, product: Product, delta, reserved: int) -> int:
+        """Returns the quantity of a product after adding delta, which must
+        leave the reserved quantity in stock."""
+        self._validate_delta(delta)
+        quantity = product.quantity + delta
+        if quantity < reserved:
+            available = max(product.quantity - reserved, 0)
+            raise ValueError(f"Insufficient stock for product id "
+                             f"{product.id}: {available} available, "
+                             f"{-delta} requested.")
+        return quantity
+
+    def _check_reserved(self, product_id: int, quantity):
+        """Raises a ValueError if a new quantity of a product would not
+        cover its reserved stock."""
+        reserved = self._reserved.get(product_id, 0)
+        if isinstance(quantity, int) and quantity < reserved:
+            raise ValueError(f"Quantity of product id {product_id} cannot "
+                             f"be below its reserved {reserved}.")
+
+    @write_locked
+    def adjust_quantity(self, product_id: int, delta: int) -> int:
+        """
+        Changes the quantity of a product by delta, e.g. -1 for a sale.
+        Reserved stock cannot be taken.
+        :return: The new quantity.
+        """
+        product = self.validate_product_id(product_id)
+        old_quantity = product.quantity
+        quantity = self._check_stock(product, delta,
+                                     self._reserved.get(product_id, 0))
+        self._logger.log(f"Adjusting product quantity by {delta}, "
+                         f"id {product_id}.")
+        product.quantity = quantity
+        self._record_product_update(product, "quantity", old_quantity)
+        return quantity
+
+    @write_locked
+    def reserve(self, product_id: int, quantity: int) -> int:
+        """
+        Holds stock of a product for an open order. The stock stays in the
+        inventory until the reservation is committed, but can no longer be
+        taken by other adjustments.
+        :return: The reservation id, for release or commit.
+        """
+        product = self.validate_product_id(product_id)
+        if not isinstance(quantity, int):
+            raise TypeError("Quantity must be an integer.")
+        if quantity <= 0:
+            raise ValueError("Quantity must be a positive integer.")
+        reserved = self._reserved.get(product_id, 0)
+        self._check_stock(product, -quantity, reserved)
+        reservation_id = self._next_reservation_id
+        self._next_reservation_id += 1
+        self._reservations[reservation_id] = (product_id, quantity)
+        self._reserved[product_id] = reserved + quantity
+        self._logger.log(f"Reserving {quantity} of product id {product_id}, "
+                         f"reservation {reservation_id}.")
+        return reservation_id
+
+    def _pop_reservation(self, reservation_id: int) -> tuple[int, int]:
+        """Removes a reservation and returns its product id and quantity."""
+        if reservation_id not in self._reservations:
+            raise ValueError(f"Reservation {reservation_id} not found.")
+        product_id, quantity = self._reservations.pop(reservation_id)
+        reserved = self._reserved[product_id] - quantity
+        if reserved:
+            self._reserved[product_id] = reserved
+        else:
+            del self._reserved[product_id]
+        return product_id, quantity
+
+    def _drop_reservations(self, product_id: int):
+        """Removes the reservations of a removed product."""
+        if self._reserved.pop(product_id, None) is None:
+            return
+        for reservation_id in [reservation_id for reservation_id, (held, _)
+                               in self._reservations.items()
+                               if held == product_id]:
+            del self._reservations[reservation_id]
+
+    @write_locked
+    def release(self, reservation_id: int):
+        """Cancels a reservation, its stock becomes available again."""
+        product_id, quantity = self._pop_reservation(reservation_id)
+        self._logger.log(f"Releasing {quantity} of product id {product_id}, "
+                         f"reservation {reservation_id}.")
+
+    @write_locked
+    def commit(self, reservation_id: int) -> int:
+        """
+        Completes a reservation by taking its stock from the inventory.
+        :return: The new quantity of the product.
+        """
+        if reservation_id not in self._reservations:
+            raise ValueError(f"Reservation {reservation_id} not found.")
+        product_id, quantity = self._reservations[reservation_id]
+        product = self._products[product_id]
+        old_quantity = product.quantity
+        # The reservation's own stock may be taken
+        new_quantity = self._check_stock(
+            product, -quantity, self._reserved[product_id] - quantity)
+        self._pop_reservation(reservation_id)
+        self._logger.log(f"Committing {quantity} of product id {product_id}, "
+                         f"reservation {reservation_id}.")
+        product.quantity = new_quantity
+        self._record_product_update(product, "quantity", old_quantity)
+        return new_quantity
+
+    @read_locked
+    def get_available_quantity(self, product_id: int) -> int:
+        """Returns the quantity of a product that is not reserved."""
+        product = self.validate_product_id(product_id)
+        return max(product.quantity - self._reserved.get(product_id, 0), 0)
+
+    @write_locked
+    def apply_stock_movements(self, movements) -> int:
+        """
+        Applies many quantity changes at once, e.g. a batch of sales and
+        receipts. Movements of the same product are summed, and all of them
+        are validated before the inventory is changed, so either all or
+        none are applied. The batch is logged and journaled once.
+        :param movements: Iterable of (product_id, delta) pairs.
+        :return: Number of products whose quantity changed.
+        """
+        deltas: dict[int, int] = {}
+        errors: list[str] = []
+        for row, movement in enumerate(movements):
+            try:
+                if not isinstance(movement, (tuple, list)) \
+                        or len(movement) != 2:
+                    raise TypeError("Movement must be a (product_id, delta) "
+                                    "pair.")
+                product_id, delta = movement
+                self.validate_product_id(product_id)
+                self._validate_delta(delta)
+                deltas[product_id] = deltas.get(product_id, 0) + delta
+            except (TypeError, ValueError) as e:
+                errors.append(f"row {row}: {e}")
+        quantities: dict[int, int] = {}
+        for product_id, delta in deltas.items():
+            if not delta:
+                continue
+            try:
+                quantities[product_id] = self._check_stock(
+                    self._products[product_id], delta,
+                    self._reserved.get(product_id, 0))
+            except ValueError as e:
+                errors.append(str(e))
+        self._raise_bulk_errors(errors)
+        if not quantities:
+            return 0
+
+        last_modified: float = time.time()
+        records = []
+        for product_id, quantity in quantities.items():
+            product = self._products[product_id]
+            old_quantity = product.quantity
+            self._set_product_fields(product, {"quantity": quantity},
+                                     last_modified)
+            records.append({"id": product_id,
+                            "values": {"quantity": quantity}})
+            self._audit("update_quantity", product_id, old_quantity,
+                        quantity, timestamp=last_modified)
+        self._logger.log(f"Applying stock movements to {len(records)} "
+                         "products.")
+        self._record_change({"op": "update_products",
+                              "last_modified": last_modified,
+                              "updates": records})
+        return len(records)
 
     # get informations
+    @read_locked
     def get_category_info_by_id(self, category_id: int,
                                 info_type: str = None) -> str:
         """Returns the specified info (name) for a given category ID.
@@ -273,6 +1547,7 @@ class InventoryManager:
             raise ValueError(f"Invalid info type '{info_type}' specified. "
                              "Use 'name'.")
 
+    @read_locked
     def get_product_info_by_id(self, product_id: int,
                                info_type: str = None) -> str:
         """Returns the specified info (name, price, quantity)
@@ -302,6 +1577,7 @@ class InventoryManager:
             raise ValueError(f"Invalid info type '{info_type}' specified. Use "
                              "'name', 'price', 'quantity' or 'description'.")
 
+    @read_locked
     def get_max_product_id(self) -> int:
         """
         Returns the maximum ID of products in the inventory.
@@ -311,6 +1587,7 @@ class InventoryManager:
             return 0  # No products, so max product ID is 0
         return max(self._products.keys())  # Get max product ID
 
+    @read_locked
     def get_max_category_id(self) -> int:
         """
         Returns the maximum ID of categories in the inventory.
@@ -320,45 +1597,65 @@ class InventoryManager:
             return 0  # No categories, so max category ID is 0
         return max(self._categories.keys())  # Get max category ID
 
-    def get_total_inventory_value(self):
-        """Calculates the total value of the inventory."""
-        return (sum(product.price * product.quantity
-                    for product in self._products.values()))
+    @read_locked
+    def get_total_inventory_value(self, verify: bool = False):
+        """Returns the total value of the inventory.
+           With verify, the value is recomputed and drift is reported."""
+        if verify:
+            self.verify_inventory_totals()
+        self._ensure_totals()
+        return self._total_value
 
-    def get_total_inventory_value_by_category(self, category_id: int):
-        """Calculates the total value of the inventory for a given category."""
-        return (sum(product.price * product.quantity for product in
-                    self._products.values()
-                    if product.category_id == category_id))
+    @read_locked
+    def get_total_inventory_value_by_category(self, category_id: int,
+                                              verify: bool = False):
+        """Returns the total value of the inventory for a given category.
+           With verify, the value is recomputed and drift is reported."""
+        if verify:
+            self.verify_inventory_totals()
+        self._ensure_totals()
+        return self._category_values.get(category_id, [0, 0])[0]
 
     # search #
-    def search_product(self, keyword: str) -> list[Product]:
-        """Searches for products by a keyword in their names."""
+    @read_locked
+    def search_product(self, keyword: str,
+                       prefix: bool = False) -> list[Product]:
+        """Searches for products by a keyword in their names.
+           With prefix, only names starting with the keyword match."""
         # Find products matching the keyword in their names (case insensitive)
-        results = [product for product in self._products.values()
-                   if keyword.lower() in product.name.lower()]
+        ids = self._get_search_index().search(keyword, prefix=prefix)
+        results = [self._products[product_id] for product_id in sorted(ids)]
         if results:
             return results  # Return list of matching products
         else:
             return None
 
+    @read_locked
     def find_product_by_id(self, product_id: int) -> Product:
         """Finds a product by ID."""
         if product_id not in self._products:
             return None
         return self._products[product_id]
 
+    @read_locked
     def find_category_by_id(self, category_id: int) -> Category:
         """Finds a category by ID."""
         if category_id not in self._categories:
             return None
         return self._categories[category_id]
 
+    @read_locked
     def get_products_by_category(self, category_id: int) -> list:
         """Returns a list of product ids for a given category."""
-        return [product.get_info() for product in self._products.values()
-                if product.category_id == category_id]
+        return [self._products[product_id].get_info() for product_id in
+                self._get_category_product_ids(category_id)]
+
+    @read_locked
+    def get_product_ids_by_category(self, category_id: int) -> list[int]:
+        """Returns the sorted ids of the products of a category."""
+        return self._get_category_product_ids(category_id)
 
+    @read_locked
     def validate_product_id(self, product_id: int):
         """Validates the existence of a product in the inventory by its ID."""
         if product_id not in self._products:
@@ -366,6 +1663,7 @@ class InventoryManager:
                              "in the inventory.")
         return self._products[product_id]
 
+    @read_locked
     def get_product_category_name(self, product_id: int) -> str:
         # Validate and fetch the product
         product = self.validate_product_id(product_id)
@@ -378,6 +1676,7 @@ class InventoryManager:
                              "or does not exist.")
         return category_name
 
+    @read_locked
     def is_product_available(self, product_id: int) -> bool:
         """
         Checks if a product is available in the inventory by its ID.
@@ -0,0 +1,81 @@
+from collections.abc import MutableMapping
+from inventory.product import Product
+
+
+class LazyProducts(MutableMapping):
+    """
+    Dictionary of products by id that creates Product objects on first
+    access. Ids can be registered without their data, membership tests and
+    the list of ids never load a product.
+    """
+
+    # Placeholder of a registered product that is not loaded yet
+    _UNLOADED = object()
+
+    def __init__(self, loader, lock=None):
+        """
+        Initialize an empty dictionary.
+        :param loader: Callable returning the Product for an id.
+        :param lock: Lock held while a product is loaded, so concurrent
+        readers load each product only once.
+        """
+        if not callable(loader):
+            raise TypeError("Loader must be callable.")
+        self.__loader = loader
+        self.__lock = lock
+        self.__entries: dict[int, Product] = {}
+        self.__unloaded: int = 0
+
+    def register(self, product_id: int):
+        """Registers the id of a product that is loaded on first access."""
+        if product_id in self.__entries:
+            raise ValueError(f"Product ID {product_id} already exists.")
+        self.__entries[product_id] = self._UNLOADED
+        self.__unloaded += 1
+
+    @property
+    def unloaded(self) -> int:
+        """Returns the number of registered products not loaded yet."""
+        return self.__unloaded
+
+    def is_loaded(self, product_id: int) -> bool:
+        """Returns True if the product with the id is loaded."""
+        return self.__entries.get(product_id,
+                                  self._UNLOADED) is not self._UNLOADED
+
+    def __getitem__(self, product_id: int) -> Product:
+        product = self.__entries[product_id]
+        if product is self._UNLOADED:
+            if self.__lock is None:
+                return self._load(product_id)
+            with self.__lock:
+                return self._load(product_id)
+        return product
+
+    def _load(self, product_id: int) -> Product:
+        """Loads a registered product unless another reader did already."""
+        product = self.__entries[product_id]
+        if product is self._UNLOADED:
+            product = self.__loader(product_id)
+            self.__entries[product_id] = product
+            self.__unloaded -= 1
+        return product
+
+    def __setitem__(self, product_id: int, product: Product):
+        if self.__entries.get(product_id) is self._UNLOADED:
+            self.__unloaded -= 1
+        self.__entries[product_id] = product
+
+    def __delitem__(self, product_id: int):
+        if self.__entries[product_id] is self._UNLOADED:
+            self.__unloaded -= 1
+        del self.__entries[product_id]
+
+    def __contains__(self, product_id) -> bool:
+        return product_id in self.__entries
+
+    def __iter__(self):
+        return iter(self.__entries)
+
+    def __len__(self) -> int:
+        return len(self.__entries)
@@ -0,0 +1,75 @@
+import bisect
+
+
+class ModificationIndex:
+    """
+    Keys ordered by the time of their latest modification. The keys
+    modified since a timestamp are found with a binary search, so a query
+    costs the number of matching entries and not the number of keys.
+    """
+
+    def __init__(self):
+        """Initialize an empty index."""
+        # Modification times in ascending order and the key of each entry
+        self.__times: list[float] = []
+        self.__keys: list = []
+        # Time of the latest modification by key, older entries are stale
+        self.__latest: dict = {}
+
+    def __len__(self) -> int:
+        return len(self.__latest)
+
+    def __contains__(self, key) -> bool:
+        return key in self.__latest
+
+    def touch(self, key, timestamp: float):
+        """Records a modification of the key at the given time."""
+        if not isinstance(timestamp, (int, float)):
+            raise TypeError("Timestamp must be an integer or float.")
+        self.__latest[key] = timestamp
+        if not self.__times or timestamp >= self.__times[-1]:
+            self.__times.append(timestamp)
+            self.__keys.append(key)
+        else:
+            position = bisect.bisect_right(self.__times, timestamp)
+            self.__times.insert(position, timestamp)
+            self.__keys.insert(position, key)
+        # Drop stale entries once they make up most of the index
+        if len(self.__times) > 2 * len(self.__latest) + 64:
+            self._compact()
+
+    def extend(self, entries):
+        """Adds (key, timestamp) pairs of keys that are not indexed yet."""
+        added = False
+        for key, timestamp in entries:
+            if key not in self.__latest:
+                self.__latest[key] = timestamp
+                self.__times.append(timestamp)
+                self.__keys.append(key)
+                added = True
+        if added:
+            self._compact()
+
+    def get(self, key) -> float:
+        """Returns the time of the latest modification, or None."""
+        return self.__latest.get(key)
+
+    def since(self, timestamp: float) -> list:
+        """Returns the keys modified at or after the timestamp, in the
+        order of their latest modification."""
+        keys = []
+        seen = set()
+        start = bisect.bisect_left(self.__times, timestamp)
+        for position in range(start, len(self.__times)):
+            key = self.__keys[position]
+            if (key not in seen
+                    and self.__latest.get(key) == self.__times[position]):
+                seen.add(key)
+                keys.append(key)
+        return keys
+
+    def _compact(self):
+        """Removes the stale entries and sorts the remaining ones."""
+        entries = sorted(self.__latest.items(), key=lambda entry: entry[1])
+        self.__keys = [key for key, _ in entries]
+        self.__times = [timestamp for _, timestamp in entries]
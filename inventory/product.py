@@ -4,6 +4,11 @@ import time
 class Product:
     """Represents a product with a name, price, quantity, and category."""
 
+    # No per-instance __dict__, which keeps millions of products compact
+    __slots__ = ("__id", "__name", "__price", "__quantity", "__category_id",
+                 "__date_added", "__last_modified", "__description",
+                 "__watcher")
+
     def __init__(self, id: int, name: str, price: float, quantity: int,
                  date_added: float, last_modified: float,
                  category_id: int = 0,
@@ -45,13 +50,32 @@ class Product:
         self.__date_added: float = date_added
         self.__last_modified: float = last_modified
         self.__description = description
+        self.__watcher = None
 
     def __str__(self) -> str:
         return self.get_info()
 
-    def update_last_modified(self):
-        """Updates the last_modified timestamp."""
-        self.__last_modified = time.time()
+    def update_last_modified(self, timestamp: float = None):
+        """Updates the last_modified timestamp, by default to the current
+        time."""
+        if timestamp is None:
+            timestamp = time.time()
+        self.__last_modified = timestamp
+
+    def set_watcher(self, watcher):
+        """
+        Sets a callable that is notified after a field of the product
+        changed, as watcher(product, field, old_value).
+        None removes the watcher.
+        """
+        if watcher is not None and not callable(watcher):
+            raise TypeError("Watcher must be callable or None.")
+        self.__watcher = watcher
+
+    def _notify(self, field: str, old_value):
+        """Notifies the watcher about a changed field."""
+        if self.__watcher is not None:
+            self.__watcher(self, field, old_value)
 
     @property
     def id(self) -> int:
@@ -69,8 +93,10 @@ class Product:
             raise TypeError("Product name must be a string.")
         if not name.strip():
             raise ValueError("Product name must be a non-empty string.")
+        old_name = self.__name
         self.__name = name
         self.update_last_modified()
+        self._notify("name", old_name)
 
     @property
     def price(self) -> float:
@@ -83,8 +109,10 @@ class Product:
             raise TypeError("Price must be an integer or float.")
         if price < 0:
             raise ValueError("Price must be positive.")
+        old_price = self.__price
         self.__price = price
         self.update_last_modified()
+        self._notify("price", old_price)
 
     @property
     def quantity(self) -> int:
@@ -96,8 +124,10 @@ class Product:
             raise TypeError("Quantity must be an interger.")
         if quantity < 0:
             raise ValueError("Quantity cannot be negative.")
+        old_quantity = self.__quantity
         self.__quantity = quantity
         self.update_last_modified()
+        self._notify("quantity", old_quantity)
 
     @property
     def category_id(self) -> int:
@@ -108,8 +138,10 @@ class Product:
         """Update the category of the product."""
         if not (isinstance(category_id, int)):
             raise TypeError("category must be an interger.")
+        old_category_id = self.__category_id
         self.__category_id = category_id
         self.update_last_modified()
+        self._notify("category_id", old_category_id)
 
     @property
     def date_added(self) -> float:
@@ -127,8 +159,10 @@ class Product:
     def description(self, description: str):
         if not isinstance(description, str):
             raise TypeError("Description must be a string.")
+        old_description = self.__description
         self.__description = description
         self.update_last_modified()
+        self._notify("description", old_description)
 
     def get_info(self) -> str:
         """Return a string representation of the product's information."""
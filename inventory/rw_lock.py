@@ -0,0 +1,132 @@
+import functools
+import threading
+from contextlib import contextmanager
+
+
+class ReadWriteLock:
+    """
+    Lock that lets any number of readers in at the same time, or a single
+    writer. Waiting writers keep new readers out, so a steady stream of
+    reads cannot starve them. The lock is reentrant: a thread holding it
+    may take it again, and the writer may also read. A reader cannot
+    upgrade to a writer, that would deadlock with another reader doing
+    the same.
+    """
+
+    def __init__(self):
+        """Initialize an unlocked lock."""
+        self.__condition = threading.Condition(threading.Lock())
+        # Read depth by thread id
+        self.__readers: dict[int, int] = {}
+        self.__writer: int = None
+        self.__write_depth: int = 0
+        self.__waiting_writers: int = 0
+
+    @property
+    def readers(self) -> int:
+        """Returns the number of threads holding the lock for reading."""
+        with self.__condition:
+            return len(self.__readers)
+
+    def acquire_read(self):
+        """Blocks until the lock is held for reading."""
+        me = threading.get_ident()
+        with self.__condition:
+            if self.__writer != me and me not in self.__readers:
+                self.__condition.wait_for(
+                    lambda: (self.__writer is None
+                             and not self.__waiting_writers))
+            self.__readers[me] = self.__readers.get(me, 0) + 1
+
+    def release_read(self):
+        """Releases one read acquisition of the calling thread."""
+        me = threading.get_ident()
+        with self.__condition:
+            depth = self.__readers.get(me)
+            if depth is None:
+                raise RuntimeError("Read lock is not held by this thread.")
+            if depth > 1:
+                self.__readers[me] = depth - 1
+                return
+            del self.__readers[me]
+            if not self.__readers:
+                self.__condition.notify_all()
+
+    def acquire_write(self):
+        """Blocks until the lock is held for writing."""
+        me = threading.get_ident()
+        with self.__condition:
+            if self.__writer == me:
+                self.__write_depth += 1
+                return
+            if me in self.__readers:
+                raise RuntimeError("Cannot upgrade a read lock to a "
+                                   "write lock.")
+            self.__waiting_writers += 1
+            try:
+                self.__condition.wait_for(
+                    lambda: self.__writer is None and not self.__readers)
+            finally:
+                self.__waiting_writers -= 1
+            self.__writer = me
+            self.__write_depth = 1
+
+    def release_write(self):
+        """Releases one write acquisition of the calling thread."""
+        with self.__condition:
+            if self.__writer != threading.get_ident():
+                raise RuntimeError("Write lock is not held by this thread.")
+            self.__write_depth -= 1
+            if not self.__write_depth:
+                self.__writer = None
+                self.__condition.notify_all()
+
+    @contextmanager
+    def read(self):
+        """Holds the lock for reading within a with block."""
+        self.acquire_read()
+        try:
+            yield self
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self):
+        """Holds the lock for writing within a with block."""
+        self.acquire_write()
+        try:
+            yield self
+        finally:
+            self.release_write()
+
+
+def read_locked(method):
+    """Decorator holding the _lock of the instance, if set, for reading
+    while the method runs."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        lock = self._lock
+        if lock is None:
+            return method(self, *args, **kwargs)
+        lock.acquire_read()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            lock.release_read()
+    return wrapper
+
+
+def write_locked(method):
+    """Decorator holding the _lock of the instance, if set, for writing
+    while the method runs."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        lock = self._lock
+        if lock is None:
+            return method(self, *args, **kwargs)
+        lock.acquire_write()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            lock.release_write()
+    return wrapper
@@ -0,0 +1,106 @@
+import queue
+import threading
+
+
+class SaveWorker:
+    """
+    Runs save jobs in a background thread, one at a time. A job submitted
+    while another one is still waiting replaces it, so rapid saves are
+    coalesced into one write. Finished jobs are collected with poll on the
+    thread that submitted them, e.g. from a Tk window.after loop.
+    """
+
+    # Marks that no job is waiting
+    _NO_JOB = object()
+
+    def __init__(self, write):
+        """
+        Initialize the worker and start its thread.
+        :param write: Callable that is passed the data of a job.
+        """
+        if not callable(write):
+            raise TypeError("Write must be callable.")
+        self.__write = write
+        self.__condition = threading.Condition()
+        self.__pending = self._NO_JOB
+        self.__running: bool = False
+        self.__stopping: bool = False
+        self.__coalesced: int = 0
+        self.__results: queue.SimpleQueue = queue.SimpleQueue()
+        self.__thread = threading.Thread(target=self._run, daemon=True)
+        self.__thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+    @property
+    def busy(self) -> bool:
+        """Returns True if a job is waiting or running."""
+        with self.__condition:
+            return self.__pending is not self._NO_JOB or self.__running
+
+    @property
+    def coalesced(self) -> int:
+        """Returns the number of jobs replaced before they started."""
+        return self.__coalesced
+
+    def submit(self, data, tag=None):
+        """
+        Queues data to be written, replacing a job that has not started.
+        :param tag: Returned by poll with the result of the job.
+        """
+        with self.__condition:
+            if self.__stopping:
+                raise ValueError("Save worker is closed.")
+            if self.__pending is not self._NO_JOB:
+                self.__coalesced += 1
+            self.__pending = (data, tag)
+            self.__condition.notify_all()
+
+    def poll(self) -> list[tuple]:
+        """Returns the jobs finished since the last call as (tag, error)
+        pairs, the error is None if the job succeeded."""
+        results = []
+        while True:
+            try:
+                results.append(self.__results.get_nowait())
+            except queue.Empty:
+                return results
+
+    def wait(self, timeout: float = None) -> bool:
+        """Blocks until no job is waiting or running, False on timeout."""
+        with self.__condition:
+            return self.__condition.wait_for(
+                lambda: (self.__pending is self._NO_JOB
+                         and not self.__running), timeout)
+
+    def close(self):
+        """Writes the waiting job and stops the thread."""
+        with self.__condition:
+            self.__stopping = True
+            self.__condition.notify_all()
+        self.__thread.join()
+
+    def _run(self):
+        while True:
+            with self.__condition:
+                self.__condition.wait_for(
+                    lambda: (self.__pending is not self._NO_JOB
+                             or self.__stopping))
+                if self.__pending is self._NO_JOB:
+                    return
+                (data, tag), self.__pending = self.__pending, self._NO_JOB
+                self.__running = True
+            try:
+                self.__write(data)
+                error = None
+            except Exception as e:
+                error = e
+            self.__results.put((tag, error))
+            with self.__condition:
+                self.__running = False
+                self.__condition.notify_all()
@@ -0,0 +1,105 @@
+from array import array
+
+
+class SearchIndex:
+    """
+    Case insensitive n-gram index for substring searches.
+    Every text is indexed by its substrings of exactly gram_size
+    characters, so a search only touches the texts sharing its n-grams.
+    Keywords shorter than an n-gram are matched against the texts.
+    """
+
+    # Stale postings that are tolerated before the index is rebuilt
+    _MIN_STALE = 1024
+
+    def __init__(self, gram_size: int = 3):
+        """Initialize an empty index."""
+        if not isinstance(gram_size, int):
+            raise TypeError("Gram size must be an integer.")
+        if gram_size <= 0:
+            raise ValueError("Gram size must be a positive integer.")
+        self.__gram_size: int = gram_size
+        # Integer keys by n-gram, appended only. Entries of removed or
+        # changed texts stay until the index is compacted and are dropped
+        # by the verification of every search.
+        self.__grams: dict[str, array] = {}
+        self.__texts: dict[int, str] = {}
+        self.__postings: int = 0
+        self.__stale: int = 0
+
+    def __len__(self) -> int:
+        return len(self.__texts)
+
+    def __contains__(self, key: int) -> bool:
+        return key in self.__texts
+
+    def _grams(self, text: str) -> set[str]:
+        """Returns the substrings of text with the gram size."""
+        size = self.__gram_size
+        return {text[start:start + size]
+                for start in range(len(text) - size + 1)}
+
+    def _index(self, key: int, text: str):
+        """Appends the key to the postings of the n-grams of text."""
+        for gram in self._grams(text):
+            postings = self.__grams.get(gram)
+            if postings is None:
+                postings = self.__grams[gram] = array("q")
+            postings.append(key)
+            self.__postings += 1
+
+    def add(self, key: int, text: str):
+        """Adds or replaces the text indexed under key."""
+        if not isinstance(key, int):
+            raise TypeError("Key must be an integer.")
+        if key in self.__texts:
+            self.remove(key)
+        lowered = text.lower()
+        # Share the caller's string if lowering did not change it
+        self.__texts[key] = text if lowered == text else lowered
+        self._index(key, lowered)
+
+    def remove(self, key: int):
+        """Removes the text indexed under key."""
+        text = self.__texts.pop(key, None)
+        if text is None:
+            return
+        self.__stale += len(self._grams(text))
+        if (self.__stale > self._MIN_STALE
+                and 2 * self.__stale > self.__postings):
+            self._compact()
+
+    def _compact(self):
+        """Rebuilds the postings without the stale entries."""
+        self.__grams = {}
+        self.__postings = 0
+        self.__stale = 0
+        for key, text in self.__texts.items():
+            self._index(key, text)
+
+    def search(self, keyword: str, prefix: bool = False) -> set[int]:
+        """
+        Returns the keys of all texts containing the keyword.
+        :param prefix: Only match texts starting with the keyword.
+        """
+        keyword = keyword.lower()
+        texts = self.__texts
+        if not keyword:
+            return set(texts)
+        if len(keyword) < self.__gram_size:
+            # Short keywords match most texts, scanning them is cheapest
+            keys = {key for key, text in texts.items() if keyword in text}
+        else:
+            smallest = None
+            for gram in self._grams(keyword):
+                postings = self.__grams.get(gram)
+                if postings is None:
+                    return set()
+                if smallest is None or len(postings) < len(smallest):
+                    smallest = postings
+            # Verify the candidates, shared n-grams do not imply a match
+            keys = {key for key in set(smallest)
+                    if keyword in texts.get(key, "")}
+        if prefix:
+            keys = {key for key in keys if texts[key].startswith(keyword)}
+        return keys
@@ -0,0 +1,203 @@
+import sqlite3
+from inventory.storage import StorageBackend
+
+
+class SQLiteBackend(StorageBackend):
+    """
+    Stores the inventory in a SQLite database. Every change is written as
+    an indexed single-row statement, so saving does not rewrite the
+    whole inventory.
+    """
+
+    incremental = True
+
+    PRODUCT_FIELDS: tuple[str, ...] = (
+        "id", "name", "price", "quantity", "category_id", "date_added",
+        "last_modified", "description"
+    )
+
+    def __init__(self, filename: str):
+        """Open or create the database file, ":memory:" is allowed."""
+        if not isinstance(filename, str):
+            raise TypeError("Filename must be a string.")
+        if not filename.strip():
+            raise ValueError("Filename must be a non-empty string.")
+        self.__filename: str = filename
+        self.dirty: bool = False
+        self._connection = sqlite3.connect(filename, check_same_thread=False)
+        self._create_schema()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+    @property
+    def filename(self) -> str:
+        """Returns the filename of the database."""
+        return self.__filename
+
+    def _create_schema(self):
+        with self._connection:
+            self._connection.executescript("""
+                CREATE TABLE IF NOT EXISTS categories (
+                    id INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS products (
+                    id INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    price REAL NOT NULL,
+                    quantity INTEGER NOT NULL,
+                    category_id INTEGER NOT NULL,
+                    date_added REAL NOT NULL,
+                    last_modified REAL NOT NULL,
+                    description TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS sequences (
+                    name TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_categories_name
+                    ON categories (name);
+                CREATE INDEX IF NOT EXISTS idx_products_category_id
+                    ON products (category_id);
+                CREATE INDEX IF NOT EXISTS idx_products_name
+                    ON products (name);
+            """)
+
+    def _product_row(self, product: dict) -> tuple:
+        return tuple(product[field] if field != "description"
+                     else product.get("description", "")
+                     for field in self.PRODUCT_FIELDS)
+
+    def _product_from_row(self, row: tuple) -> dict:
+        return dict(zip(self.PRODUCT_FIELDS, row))
+
+    def load(self):
+        for category_id, name in self._connection.execute(
+                "SELECT id, name FROM categories ORDER BY id"):
+            yield "categories", {"id": category_id, "name": name}
+        fields = ", ".join(self.PRODUCT_FIELDS)
+        # The cursor streams the rows, they are not fetched all at once
+        for row in self._connection.execute(
+                f"SELECT {fields} FROM products ORDER BY id"):
+            yield "products", self._product_from_row(row)
+        yield "sequences", dict(self._connection.execute(
+            "SELECT name, value FROM sequences"))
+
+    def load_index(self):
+        for category_id, name in self._connection.execute(
+                "SELECT id, name FROM categories ORDER BY id"):
+            yield "categories", {"id": category_id, "name": name}
+        for product_id in self.product_ids():
+            yield "products", product_id
+        yield "sequences", dict(self._connection.execute(
+            "SELECT name, value FROM sequences"))
+
+    def product_ids(self) -> list[int]:
+        """Returns the ids of all stored products from the primary key."""
+        return [row[0] for row in self._connection.execute(
+            "SELECT id FROM products ORDER BY id")]
+
+    def get_product(self, product_id: int) -> dict:
+        """Returns a stored product, or None if it does not exist."""
+        fields = ", ".join(self.PRODUCT_FIELDS)
+        row = self._connection.execute(
+            f"SELECT {fields} FROM products WHERE id = ?",
+            (product_id,)).fetchone()
+        return None if row is None else self._product_from_row(row)
+
+    def _bump_sequence(self, name: str, value: int):
+        self._connection.execute(
+            "INSERT INTO sequences (name, value) VALUES (?, ?) "
+            "ON CONFLICT (name) DO UPDATE "
+            "SET value = max(value, excluded.value)", (name, value))
+
+    def _insert_products(self, products: list[dict]):
+        placeholders = ", ".join("?" for _ in self.PRODUCT_FIELDS)
+        self._connection.executemany(
+            f"INSERT OR REPLACE INTO products "
+            f"({', '.join(self.PRODUCT_FIELDS)}) VALUES ({placeholders})",
+            [self._product_row(product) for product in products])
+        if products:
+            last_id = max(product["id"] for product in products)
+            self._bump_sequence("product", last_id + 1)
+
+    def _update_product(self, product_id: int, values: dict,
+                        last_modified: float):
+        fields = [field for field in values
+                  if field in self.PRODUCT_FIELDS and field != "id"]
+        if len(fields) != len(values):
+            raise ValueError("Invalid product fields "
+                             f"{', '.join(sorted(values))}.")
+        assignments = ", ".join(f"{field} = ?" for field in fields)
+        self._execute_row(
+            f"UPDATE products SET {assignments}, last_modified = ? "
+            "WHERE id = ?",
+            [values[field] for field in fields]
+            + [last_modified, product_id])
+
+    def _execute_row(self, sql: str, parameters):
+        """Runs a statement that changes one existing row, marks the
+        backend dirty if the row is missing."""
+        if self._connection.execute(sql, parameters).rowcount == 0:
+            # The database lags behind the inventory, only save_all can
+            # bring it up to date
+            self.dirty = True
+
+    def _apply_record(self, record: dict):
+        op = record.get("op")
+        if op == "add_category":
+            self._connection.execute(
+                "INSERT OR REPLACE INTO categories (id, name) VALUES (?, ?)",
+                (record["id"], record["name"]))
+            self._bump_sequence("category", record["id"] + 1)
+        elif op == "update_category_name":
+            self._execute_row(
+                "UPDATE categories SET name = ? WHERE id = ?",
+                (record["name"], record["id"]))
+        elif op == "add_product":
+            self._insert_products([record])
+        elif op == "add_products":
+            self._insert_products(record["products"])
+        elif op == "remove_product":
+            self._execute_row("DELETE FROM products WHERE id = ?",
+                              (record["id"],))
+        elif op == "update_product":
+            self._update_product(record["id"],
+                                 {record["field"]: record["value"]},
+                                 record["last_modified"])
+        elif op == "update_products":
+            for update in record["updates"]:
+                self._update_product(update["id"], update["values"],
+                                     record["last_modified"])
+        else:
+            raise ValueError(f"Unknown change operation '{op}'.")
+
+    def apply(self, records: list[dict]):
+        # The connection commits on success and rolls back on an error
+        with self._connection:
+            for record in records:
+                self._apply_record(record)
+
+    def save_all(self, data: dict):
+        with self._connection:
+            self._connection.execute("DELETE FROM categories")
+            self._connection.execute("DELETE FROM products")
+            self._connection.execute("DELETE FROM sequences")
+            self._connection.executemany(
+                "INSERT INTO categories (id, name) VALUES (?, ?)",
+                [(cat["id"], cat["name"])
+                 for cat in data.get("categories", [])])
+            self._insert_products(data.get("products", []))
+            for name, value in data.get("sequences", {}).items():
+                self._bump_sequence(name, value)
+        self.dirty = False
+
+    def close(self):
+        if self._connection:
+            self._connection.close()
+            self._connection = None
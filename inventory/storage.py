@@ -0,0 +1,167 @@
+import os
+from abc import ABC, abstractmethod
+from data_handler import DataHandler
+
+
+class StorageBackend(ABC):
+    """
+    Interface of the persistence layer below InventoryManager.
+    Changes are passed as change records, the same dictionaries that are
+    written to the journal, e.g.
+    {"op": "update_product", "id": 1, "field": "price", "value": 9.99,
+     "last_modified": 1734447720.0}.
+    """
+
+    # True if apply persists every change, False if only save_all does
+    incremental: bool = False
+    # True if apply received changes that only save_all can persist
+    dirty: bool = False
+
+    @abstractmethod
+    def load(self):
+        """Yields the stored data as (key, record) pairs, like
+        DataHandler.iter_json_records."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def load_index(self):
+        """Like load, but yields ("products", product_id) instead of the
+        product records, which are read later with get_product."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_product(self, product_id: int) -> dict:
+        """Returns a stored product record, or None if it does not exist."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def apply(self, records: list[dict]):
+        """Persists a list of change records as one transaction."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def save_all(self, data: dict):
+        """Replaces the stored data with a full export of the inventory."""
+        raise NotImplementedError
+
+    def release(self):
+        """Closes the files kept open for lazy reads, called once every
+        product was read so that the files can be replaced."""
+
+    def close(self):
+        """Releases the resources of the backend."""
+
+
+class JsonFileBackend(StorageBackend):
+    """
+    Stores the whole inventory as one JSON file, compressed if the
+    filename ends with .gz or .xz. If the file does not match its
+    checksum, its newest good backup is loaded instead.
+    """
+
+    incremental = False
+
+    def __init__(self, filename: str, backups: int = 0,
+                 checksum: bool = False, layout: str = "records"):
+        """
+        Initialize the backend.
+        :param backups: Number of previous versions kept by save_all.
+        :param checksum: Write a checksum file with every save_all.
+        :param layout: Layout of the products, see DataHandler.LAYOUTS.
+        """
+        if not isinstance(filename, str):
+            raise TypeError("Filename must be a string.")
+        if not filename.strip():
+            raise ValueError("Filename must be a non-empty string.")
+        if not isinstance(backups, int):
+            raise TypeError("Backups must be an integer.")
+        if backups < 0:
+            raise ValueError("Backups must be non-negative.")
+        self.__filename: str = filename
+        self.__backups: int = backups
+        if layout not in DataHandler.LAYOUTS:
+            raise ValueError(f"Invalid layout '{layout}', expected one of "
+                             f"{', '.join(DataHandler.LAYOUTS)}.")
+        self.__checksum: bool = checksum
+        self.__layout: str = layout
+        # Byte offsets of the product records, filled by load_index
+        self.__offsets: dict[int, tuple[int, int]] = {}
+        # Product records of files that cannot be read at an offset
+        self.__records: dict[int, dict] = {}
+        self._file = None
+
+    @property
+    def filename(self) -> str:
+        """Returns the filename of the JSON file."""
+        return self.__filename
+
+    def _source(self) -> str:
+        """Returns the newest version of the file that is not corrupted."""
+        return (DataHandler.latest_valid_snapshot(self.__filename)
+                or self.__filename)
+
+    def load(self):
+        return DataHandler.iter_json_records(self._source())
+
+    def load_index(self):
+        self.close()
+        self.__offsets = {}
+        source = self._source()
+        if DataHandler.compression(source):
+            # A compressed file cannot be read at an offset
+            yield from self._load_index_in_memory(source)
+            return
+        self._file = open(source, "rb") if os.path.exists(source) else None
+        for key, value, start, end in DataHandler.iter_json_offsets(source):
+            if key == "columnar":
+                # Columnar products have no offsets, it is the first key
+                self.close()
+                yield from self._load_index_in_memory(source)
+                return
+            if key == "products":
+                self.__offsets[value["id"]] = (start, end)
+                yield key, value["id"]
+            else:
+                # Decode the record again, the offset scan reads Latin-1
+                yield key, DataHandler.read_json_record(self._file,
+                                                        start, end)
+
+    def _load_index_in_memory(self, source: str):
+        """Like load_index, but keeps the product records in memory."""
+        for key, value in DataHandler.iter_json_records(source):
+            if key == "products":
+                self.__records[value["id"]] = value
+                yield key, value["id"]
+            else:
+                yield key, value
+
+    def get_product(self, product_id: int) -> dict:
+        if product_id in self.__records:
+            return self.__records[product_id]
+        if product_id not in self.__offsets:
+            return None
+        return DataHandler.read_json_record(self._file,
+                                            *self.__offsets[product_id])
+
+    def apply(self, records: list[dict]):
+        # A JSON file can only be rewritten as a whole, see save_all
+        pass
+
+    def save_all(self, data: dict):
+        # The offsets are invalid once the file is rewritten
+        self.close()
+        DataHandler.save_to_json_file(data, self.__filename,
+                                      backups=self.__backups,
+                                      checksum=self.__checksum,
+                                      layout=self.__layout)
+
+    def release(self):
+        # Nothing is left to read at the offsets
+        self.close()
+
+    def close(self):
+        self.__offsets = {}
+        self.__records = {}
+        if self._file:
+            self._file.close()
+            self._file = None
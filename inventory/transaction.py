@@ -0,0 +1,48 @@
+class Transaction:
+    """
+    Changes of products and categories staged by
+    InventoryManager.transaction. Nothing is changed until the with block
+    ends, then all staged changes are validated and applied together, or
+    none of them.
+    """
+
+    # Product fields that can be staged
+    FIELDS = ("name", "price", "quantity", "category_id", "description")
+
+    def __init__(self):
+        """Initialize an empty transaction."""
+        # Staged values by product id and names by category id
+        self.__products: dict[int, dict] = {}
+        self.__categories: dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.__products) + len(self.__categories)
+
+    @property
+    def products(self) -> dict[int, dict]:
+        """Returns the staged field values by product id."""
+        return {product_id: dict(values)
+                for product_id, values in self.__products.items()}
+
+    @property
+    def categories(self) -> dict[int, str]:
+        """Returns the staged names by category id."""
+        return dict(self.__categories)
+
+    def update_product(self, product_id: int, **values):
+        """
+        Stages new values of product fields, later values of a field
+        replace earlier ones. Without values nothing is staged.
+        :param values: Any of name, price, quantity, category_id and
+        description.
+        """
+        unknown = set(values) - set(self.FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown fields {', '.join(sorted(unknown))}.")
+        if not values:
+            return
+        self.__products.setdefault(product_id, {}).update(values)
+
+    def update_category_name(self, category_id: int, name: str):
+        """Stages a new name of a category."""
+        self.__categories[category_id] = name
@@ -3,29 +3,46 @@ from tkinter import messagebox, scrolledtext
 # from inventory.product import Product
 # from inventory.category import Category
 from inventory.inventory_manager import InventoryManager
-from data_handler import DataHandler
-# from datetime import datetime
+from inventory.storage import JsonFileBackend
+from datetime import datetime
 # import os
 # import json
 # from PIL import Image, ImageTk  # Import Pillow to handle more image formats
 
 # Define file name for JSON storage
 DATA_FILE = "inventory/data.json"
+# Define file name for the journal of changes since the last snapshot
+JOURNAL_FILE = "inventory/data.journal"
+# Milliseconds between checks for finished background saves
+SAVE_POLL_INTERVAL = 500
 
-# Load data
-data = DataHandler.load_from_json_file(DATA_FILE)
-
-# Initialize inventory manager
+# Initialize inventory manager, products are read on first access
 inventory = InventoryManager()
-inventory.load_data_from_json(data)
+inventory.enable_journal(JOURNAL_FILE, DATA_FILE, backups=3,
+                         checksum=True)
+inventory.set_storage(JsonFileBackend(DATA_FILE))
+inventory.load_from_storage(lazy=True)
+# Save changes once they settle, when idle or when many are pending
+inventory.enable_autosave()
+# Snapshots are written off the Tk thread, see poll_saves
+inventory.enable_background_saves()
 
 
 def save():
-    try:
-        exported_data = inventory.export_to_json()
-    except TypeError as e:
-        print("Serialization error:", e)
-    DataHandler.save_to_json_file(exported_data, DATA_FILE)
+    # Changes are journaled as they happen, so only force them to disk
+    inventory.flush_journal()
+
+
+def poll_saves():
+    # Start due autosaves and report finished ones on the Tk thread
+    inventory.autosave()
+    for filename, error in inventory.poll_saves():
+        if error:
+            messagebox.showerror("Error", f"Saving {filename} failed: {error}")
+        else:
+            window.title("Inventory Management - saved at "
+                         f"{datetime.now().strftime('%H:%M:%S')}")
+    window.after(SAVE_POLL_INTERVAL, poll_saves)
 
 
 # Function to display output in a styled text widget
@@ -267,41 +284,25 @@ def update_product():
                     )
                 return
 
-            if choice.get() == 1:  # Update product name
-                inventory.update_product_name(int(product_id), str(new_value))
-                messagebox.showinfo(
-                    "Success",
-                    f"Product {product_id} name updated to '{new_value}'."
-                    )
-            elif choice.get() == 2:  # Update product price
-                inventory.update_product_price(
-                    int(product_id), float(new_value)
-                    )
-                messagebox.showinfo(
-                    "Success",
-                    f"Product {product_id} price updated to {new_value}."
-                    )
-            elif choice.get() == 3:  # Update product quantity
-                inventory.update_product_quantity(
-                    int(product_id), int(new_value)
-                    )
-                messagebox.showinfo(
-                    "Success",
-                    f"Product {product_id} quantity updated to {new_value}."
-                    )
-            elif choice.get() == 4:  # Update category
-                inventory.update_product_category(
-                    int(product_id), int(new_value)
-                    )
-                messagebox.showinfo(
-                    "Success",
-                    f"Product {product_id} category updated to '{new_value}'."
-                    )
-            else:
+            # Fields by update option, with the type of the new value
+            fields = {1: ("name", str), 2: ("price", float),
+                      3: ("quantity", int), 4: ("category_id", int)}
+            if choice.get() not in fields:
                 messagebox.showwarning(
                     "Input Error",
                     "Please select a valid update option."
                     )
+                return
+            field, convert = fields[choice.get()]
+            # Applied with one timestamp and journal record, or not at all
+            with inventory.transaction() as transaction:
+                transaction.update_product(int(product_id),
+                                           **{field: convert(new_value)})
+            messagebox.showinfo(
+                "Success",
+                f"Product {product_id} {field.replace('_id', '')} updated "
+                f"to '{new_value}'."
+                )
             save()
 
             # Lift the window to the front
@@ -641,4 +642,11 @@ output_box.pack(pady=10)
 output_box.config(state=tk.DISABLED)  # Make it read-only initially
 
 # Start the Tkinter event loop
+window.after(SAVE_POLL_INTERVAL, poll_saves)
 window.mainloop()
+
+# Fold the journaled changes into the snapshot on exit
+inventory.compact_journal()
+for filename, error in inventory.disable_background_saves():
+    if error:
+        print(f"Saving {filename} failed: {error}")
@@ -4,8 +4,8 @@ from user_manager import UserManager
 # from inventory.product import Product
 # from inventory.category import Category
 from inventory.inventory_manager import InventoryManager
-from data_handler import DataHandler
-# from datetime import datetime
+from inventory.storage import JsonFileBackend
+from datetime import datetime
 # import os
 # import json
 from PIL import Image, ImageTk
@@ -15,21 +15,38 @@ user_manager = UserManager()
 
 # Define file name for JSON storage
 DATA_FILE = "inventory/data.json"
+# Define file name for the journal of changes since the last snapshot
+JOURNAL_FILE = "inventory/data.journal"
+# Milliseconds between checks for finished background saves
+SAVE_POLL_INTERVAL = 500
 
-# Load data
-data = DataHandler.load_from_json_file(DATA_FILE)
-
-# Initialize inventory manager
+# Initialize inventory manager, products are read on first access
 inventory = InventoryManager()
-inventory.load_data_from_json(data)
+inventory.enable_journal(JOURNAL_FILE, DATA_FILE, backups=3,
+                         checksum=True)
+inventory.set_storage(JsonFileBackend(DATA_FILE))
+inventory.load_from_storage(lazy=True)
+# Save changes once they settle, when idle or when many are pending
+inventory.enable_autosave()
+# Snapshots are written off the Tk thread, see poll_saves
+inventory.enable_background_saves()
 
 
 def save():
-    try:
-        exported_data = inventory.export_to_json()
-    except TypeError as e:
-        print("Serialization error:", e)
-    DataHandler.save_to_json_file(exported_data, DATA_FILE)
+    # Changes are journaled as they happen, so only force them to disk
+    inventory.flush_journal()
+
+
+def poll_saves():
+    # Start due autosaves and report finished ones on the Tk thread
+    inventory.autosave()
+    for filename, error in inventory.poll_saves():
+        if error:
+            messagebox.showerror("Error", f"Saving {filename} failed: {error}")
+        else:
+            window.title("Inventory Management - saved at "
+                         f"{datetime.now().strftime('%H:%M:%S')}")
+    window.after(SAVE_POLL_INTERVAL, poll_saves)
 
 
 def show_login_window():
@@ -684,6 +701,7 @@ def show_main_window():
     output_box.pack(pady=10)
     output_box.config(state=tk.DISABLED)  # Make it read-only initially
 
+    window.after(SAVE_POLL_INTERVAL, poll_saves)
     window.mainloop()
 
 
@@ -693,3 +711,9 @@ window.withdraw()  # Hide the main window initially
 
 # Show login window when the application starts
 show_login_window()
+
+# Fold the journaled changes into the snapshot on exit
+inventory.compact_journal()
+for filename, error in inventory.disable_background_saves():
+    if error:
+        print(f"Saving {filename} failed: {error}")
@@ -1,19 +1,24 @@
 from inventory.product import Product
 from inventory.category import Category
 from inventory.inventory_manager import InventoryManager
-from data_handler import DataHandler
+from inventory.storage import JsonFileBackend
 from datetime import datetime
 import os
 import json
 
 # Define file name for JSON storage
 DATA_FILE = "inventory/data.json"
-# Load data
-data = DataHandler.load_from_json_file(DATA_FILE)
+# Define file name for the journal of changes since the last snapshot
+JOURNAL_FILE = "inventory/data.journal"
 
-# Initialize inventory manager
+# Initialize inventory manager, products are read on first access
 inventory = InventoryManager()
-inventory.load_data_from_json(data)
+inventory.enable_journal(JOURNAL_FILE, DATA_FILE, backups=3,
+                         checksum=True)
+inventory.set_storage(JsonFileBackend(DATA_FILE))
+inventory.load_from_storage(lazy=True)
+# Save changes once they settle, when idle or when many are pending
+inventory.enable_autosave()
 
 # Clears the terminal screen for a cleaner interface.
 
@@ -52,6 +57,8 @@ while True:
     9 - Show total inventory value by category
     0 - Exit
     """)
+    # Waiting for the user is a good moment to save
+    inventory.autosave(idle=True)
     x = input("Please enter choice: ")
     if x.isdigit():
         x = int(x)
@@ -421,6 +428,7 @@ try:
     # print(json_string)
 except TypeError as e:
     print("Serialization error:", e)
-DataHandler.save_to_json_file(exported_data, DATA_FILE)
+# Fold the journaled changes into the snapshot
+inventory.compact_journal()
 
 print("\nExiting inventory...")
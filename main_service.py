@@ -0,0 +1,39 @@
+from inventory.inventory_manager import InventoryManager
+from inventory.http_service import InventoryHTTPServer
+from inventory.storage import JsonFileBackend
+
+
+# Define file name for JSON storage
+DATA_FILE = "inventory/data.json"
+# Define file name for the journal of changes since the last snapshot
+JOURNAL_FILE = "inventory/data.journal"
+# The service only accepts local clients
+HOST = "127.0.0.1"
+PORT = 8765
+
+# Initialize inventory manager, products are read on first access
+inventory = InventoryManager()
+inventory.enable_journal(JOURNAL_FILE, DATA_FILE, backups=3,
+                         checksum=True)
+inventory.set_storage(JsonFileBackend(DATA_FILE))
+inventory.load_from_storage(lazy=True)
+# Save changes once they settle, when idle or when many are pending
+inventory.enable_autosave()
+
+
+def main():
+    server = InventoryHTTPServer((HOST, PORT), inventory)
+    print(f"Serving the inventory on http://{HOST}:{PORT}, "
+          "press Ctrl+C to stop.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        # Write all changes to the snapshot before exiting
+        inventory.compact_journal()
+
+
+if __name__ == "__main__":
+    main()
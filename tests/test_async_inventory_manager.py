@@ -0,0 +1,100 @@
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+from data_handler import DataHandler
+from inventory.async_inventory_manager import AsyncInventoryManager
+from inventory.inventory_manager import InventoryManager
+
+
+@patch("inventory.inventory_logger.InventoryLogger._open_filestream",
+       lambda *p: None)
+class TestAsyncInventoryManager(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.product_data = {
+            "name": "Laptop",
+            "price": 999.99,
+            "quantity": 50,
+            "category": 1
+        }
+
+    def test_init(self):
+        with self.assertRaises(TypeError):
+            AsyncInventoryManager("inventory")
+        inventory = InventoryManager()
+        self.assertIs(AsyncInventoryManager(inventory).inventory, inventory)
+        self.assertTrue(inventory.thread_safe)
+
+    async def test_concurrent_changes(self):
+        inventory = AsyncInventoryManager()
+        ids = await asyncio.gather(
+            *(inventory.add_product({**self.product_data,
+                                     "name": f"Laptop {n}"})
+              for n in range(50)))
+        self.assertEqual(sorted(ids), list(range(1, 51)))
+        quantities = await asyncio.gather(
+            *(inventory.adjust_quantity(ids[0], -1) for _ in range(20)))
+        self.assertEqual(sorted(quantities), list(range(30, 50)))
+        self.assertEqual(
+            (await inventory.find_product_by_id(ids[0])).quantity, 30)
+        self.assertEqual(len(await inventory.search_product("Laptop")), 50)
+        self.assertAlmostEqual(await inventory.get_total_inventory_value(),
+                               999.99 * (49 * 50 + 30))
+        with self.assertRaises(ValueError):
+            await inventory.adjust_quantity(ids[0], -31)
+
+    async def test_transaction(self):
+        inventory = AsyncInventoryManager()
+        cat_id = await inventory.add_category("Computers")
+        product_id = await inventory.add_product(self.product_data)
+        async with inventory.transaction() as transaction:
+            transaction.update_product(product_id, name="Notebook",
+                                       category_id=cat_id)
+            transaction.update_category_name(cat_id, "Portables")
+        self.assertEqual(
+            await inventory.get_product_info_by_id(product_id, "name"),
+            "Notebook")
+        with self.assertRaises(ValueError):
+            async with inventory.transaction() as transaction:
+                transaction.update_product(product_id, price=-1)
+        self.assertEqual(
+            (await inventory.find_product_by_id(product_id)).price, 999.99)
+
+    async def test_checkpoint(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            journal_file = os.path.join(tmpdir, "data.journal")
+            data_file = os.path.join(tmpdir, "data.json")
+            inventory = AsyncInventoryManager()
+            inventory.inventory.enable_journal(journal_file, data_file)
+            inventory.inventory.enable_background_saves()
+            await inventory.bulk_add_products([self.product_data] * 3)
+            save = DataHandler.save_to_json_file
+            ticks = 0
+
+            def slow_save(*args, **kwargs):
+                time.sleep(0.2)
+                save(*args, **kwargs)
+
+            async def tick():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            ticker = asyncio.create_task(tick())
+            with patch.object(DataHandler, "save_to_json_file", slow_save):
+                self.assertEqual(await inventory.checkpoint(),
+                                 [(data_file, None)])
+            ticker.cancel()
+            # The event loop kept running while the snapshot was written
+            self.assertGreater(ticks, 5)
+            self.assertEqual(DataHandler.load_from_json_file(data_file),
+                             await inventory.export_to_json())
+            self.assertFalse(inventory.inventory.is_dirty())
+            inventory.inventory.disable_journal()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+from inventory.audit_log import AuditLog
+
+
+class TestAuditLog(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmpdir.name, "audit.jsonl")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_init(self):
+        with self.assertRaises(TypeError):
+            AuditLog(1)
+        with self.assertRaises(ValueError):
+            AuditLog(self.filename, max_bytes=0)
+        with self.assertRaises(ValueError):
+            AuditLog(self.filename, backup_count=-1)
+
+    def test_query(self):
+        with AuditLog(self.filename) as log:
+            log.record("update_price", 42, 9.99, 8.99, timestamp=100)
+            log.record("update_price", 7, 1, 2, timestamp=200)
+            log.record("update_quantity", 42, 1, 2, timestamp=300)
+            log.record("update_name", 42, "A", "B", timestamp=300,
+                       entity="category")
+            entries = log.query(42)
+            self.assertEqual([e["event"] for e in entries],
+                             ["update_price", "update_quantity"])
+            self.assertEqual(entries[0]["old"], 9.99)
+            self.assertEqual(len(log.query(42, since=150)), 1)
+            self.assertEqual(len(log.query(42, until=150)), 1)
+            self.assertEqual(len(log.query(42, entity="category")), 1)
+            self.assertEqual(len(log.query(since=200)), 3)
+
+    def test_reopen(self):
+        with AuditLog(self.filename) as log:
+            log.record("update_price", 42, 1, 2, timestamp=100)
+        # A torn last line is skipped and not glued to the next entry
+        with open(self.filename, "ab") as file:
+            file.write(b'{"ts": 150, "eve')
+        with AuditLog(self.filename) as log:
+            log.record("update_price", 42, 2, 3, timestamp=200)
+            self.assertEqual([e["new"] for e in log.query(42)], [2, 3])
+            self.assertEqual(len(log.query()), 2)
+
+    def test_rotation(self):
+        with AuditLog(self.filename, max_bytes=300, backup_count=2) as log:
+            for i in range(30):
+                log.record("update_quantity", i % 3, i, i + 1, timestamp=i)
+            self.assertTrue(os.path.exists(self.filename + ".1"))
+            self.assertTrue(os.path.exists(self.filename + ".1.idx"))
+            self.assertTrue(os.path.exists(self.filename + ".2"))
+            self.assertFalse(os.path.exists(self.filename + ".3"))
+            entries = log.query(1)
+            self.assertTrue(entries)
+            self.assertEqual(entries[-1]["ts"], 28)
+            self.assertTrue(all(e["id"] == 1 for e in entries))
+            timestamps = [e["ts"] for e in log.query()]
+            self.assertEqual(timestamps, sorted(timestamps))
+            self.assertEqual(timestamps[-1], 29)
+
+        # Rotated segments are queried through their index files
+        with AuditLog(self.filename, max_bytes=300, backup_count=2) as log:
+            self.assertEqual(log.query(1)[-1]["ts"], 28)
+
+
+if __name__ == "__main__":
+    unittest.main()
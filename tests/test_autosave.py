@@ -0,0 +1,38 @@
+import unittest
+from inventory.autosave import AutosavePolicy
+
+
+class TestAutosavePolicy(unittest.TestCase):
+    def test_init(self):
+        with self.assertRaises(TypeError):
+            AutosavePolicy(debounce="1")
+        with self.assertRaises(ValueError):
+            AutosavePolicy(min_interval=-1)
+        with self.assertRaises(ValueError):
+            AutosavePolicy(max_pending=0)
+        with self.assertRaises(ValueError):
+            AutosavePolicy(max_busy=0)
+
+    def test_due(self):
+        policy = AutosavePolicy(debounce=2, max_pending=10, min_interval=5)
+        self.assertFalse(policy.due(0, 0, idle=True, now=100))
+        # Waits until no change came in for the debounce interval
+        self.assertFalse(policy.due(1, 99, now=100))
+        self.assertTrue(policy.due(1, 98, now=100))
+        self.assertTrue(policy.due(1, 99, idle=True, now=100))
+        self.assertTrue(policy.due(10, 100, now=100))
+
+    def test_min_interval(self):
+        policy = AutosavePolicy(debounce=0, min_interval=5, max_busy=0.5)
+        policy.saved(1, now=100)
+        self.assertFalse(policy.due(100, 0, idle=True, now=104))
+        self.assertTrue(policy.due(100, 0, idle=True, now=105))
+        # Slow saves space the next ones out
+        policy.saved(4, now=105)
+        self.assertEqual(policy.interval, 8)
+        self.assertFalse(policy.due(100, 0, idle=True, now=112))
+        self.assertTrue(policy.due(100, 0, idle=True, now=113))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from inventory.binary_storage import BinaryFileBackend
+from inventory.inventory_manager import InventoryManager
+
+
+class TestBinaryStorage(unittest.TestCase):
+    def setUp(self):
+        # Started here, a class decorator would not cover setUp
+        patcher = patch(
+            "inventory.inventory_logger.InventoryLogger._open_filestream",
+            lambda *p: None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmpdir.name, "data.bin")
+        self.inventory = InventoryManager()
+        self.cat_id = self.inventory.add_category("Test category")
+        self.ids = self.inventory.bulk_add_products([
+            {"name": "Laptop", "price": 999.99, "quantity": 50,
+             "category": self.cat_id, "description": "Gerät"},
+            {"name": "Mouse", "price": 19.5, "quantity": 3,
+             "category": self.cat_id},
+        ])
+        BinaryFileBackend(self.filename).save_all(
+            self.inventory.export_to_json())
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def load(self, lazy=True) -> InventoryManager:
+        loaded = InventoryManager()
+        loaded.set_storage(BinaryFileBackend(self.filename))
+        loaded.load_from_storage(lazy=lazy)
+        return loaded
+
+    def test_load(self):
+        for lazy in (False, True):
+            loaded = self.load(lazy)
+            self.assertEqual(loaded.export_to_json(),
+                             self.inventory.export_to_json())
+            loaded._storage.close()
+
+    def test_missing_file(self):
+        storage = BinaryFileBackend(self.filename + ".missing")
+        self.assertEqual(list(storage.load()), [])
+        self.assertIsNone(storage.get_product(1))
+
+    def test_invalid_file(self):
+        with open(self.filename, "wb") as file:
+            file.write(b"{\"products\": []}" * 4)
+        with self.assertRaises(ValueError):
+            BinaryFileBackend(self.filename).get_product(1)
+
+    def test_column(self):
+        with BinaryFileBackend(self.filename) as storage:
+            with storage.column("price") as prices:
+                self.assertEqual(prices.tolist(), [999.99, 19.5])
+            with self.assertRaises(ValueError):
+                storage.column("name")
+
+    def test_patch_in_place(self):
+        loaded = self.load()
+        size = os.path.getsize(self.filename)
+        loaded.update_product_quantity(self.ids[0], 7)
+        loaded.bulk_update([{"id": self.ids[1], "price": 25}])
+        loaded.remove_product(self.ids[1])
+        self.assertFalse(loaded._storage.dirty)
+        loaded._storage.flush()
+
+        # Another reader sees the patched bytes without a save
+        with BinaryFileBackend(self.filename, readonly=True) as reader:
+            product = reader.get_product(self.ids[0])
+            self.assertEqual(product["quantity"], 7)
+            self.assertEqual(product["last_modified"],
+                             loaded.find_product_by_id(
+                                 self.ids[0]).last_modified)
+            self.assertIsNone(reader.get_product(self.ids[1]))
+            with self.assertRaises(ValueError):
+                reader.apply([{"op": "remove_product", "id": self.ids[0]}])
+        self.assertEqual(os.path.getsize(self.filename), size)
+        loaded._storage.close()
+
+    def test_rewrite_when_dirty(self):
+        loaded = self.load()
+        loaded.update_product_name(self.ids[0], "Notebook")
+        new_id = loaded.add_product({"name": "Cable", "price": 5,
+                                     "quantity": 1,
+                                     "category": self.cat_id})
+        self.assertTrue(loaded._storage.dirty)
+        loaded.save()
+        self.assertFalse(loaded._storage.dirty)
+
+        reloaded = self.load()
+        self.assertEqual(reloaded.find_product_by_id(self.ids[0]).name,
+                         "Notebook")
+        self.assertEqual(reloaded.find_product_by_id(new_id).price, 5)
+        self.assertEqual(reloaded.export_to_json(), loaded.export_to_json())
+        reloaded._storage.close()
+        loaded._storage.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -38,6 +38,18 @@ class TestCategory(unittest.TestCase):
         self.assertEqual(result, "Test category 2")
         self.assertIsInstance(result, str)
 
+    def test_set_watcher(self):
+        changes = []
+        self.category.set_watcher(
+            lambda category, field, old: changes.append((field, old)))
+        self.category.name = "Test category 2"
+        self.assertEqual(changes, [("name", "Test category")])
+        self.category.set_watcher(None)
+        self.category.name = "Test category 3"
+        self.assertEqual(len(changes), 1)
+        with self.assertRaises(TypeError):
+            self.category.set_watcher("watcher")
+
     def test_get_info(self):
         self.assertIsInstance(self.category.get_info(), str)
         self.assertIsNot(self.category.get_info(), "")
@@ -0,0 +1,75 @@
+import unittest
+from inventory.columnar_store import ColumnarStore, np
+from inventory.product import Product
+
+
+class TestColumnarStore(unittest.TestCase):
+    use_numpy = False
+
+    def setUp(self):
+        self.store = ColumnarStore(use_numpy=self.use_numpy)
+        self.products = [
+            Product(id=i, name=f"Product {i}", price=float(i), quantity=i * 2,
+                    date_added=100.0 + i, last_modified=200.0 + i,
+                    category_id=i % 2)
+            for i in range(1, 41)
+        ]
+        for product in self.products:
+            self.store.add(product)
+
+    def test_add(self):
+        self.assertEqual(len(self.store), 40)
+        self.assertIn(40, self.store)
+        self.assertEqual(list(self.store.column("id")), list(range(1, 41)))
+        with self.assertRaises(ValueError):
+            self.store.column("name")
+
+    def test_total_value(self):
+        expected = sum(p.price * p.quantity for p in self.products)
+        self.assertAlmostEqual(self.store.total_value(), expected)
+        expected = sum(p.price * p.quantity for p in self.products
+                       if p.category_id == 1)
+        self.assertAlmostEqual(self.store.total_value(1), expected)
+        self.assertEqual(self.store.total_value(5), 0)
+
+    def test_value_by_category(self):
+        values = self.store.value_by_category()
+        self.assertEqual(set(values), {0, 1})
+        self.assertAlmostEqual(values[0], self.store.total_value(0))
+
+    def test_update(self):
+        self.products[0].quantity = 100
+        self.store.update(self.products[0])
+        self.assertEqual(self.store.ids_in_range("quantity", 81), [1])
+        self.store.update_last_modified(2, 500.0)
+        self.assertEqual(
+            self.store.ids_in_range("last_modified", 400, 600), [2])
+
+    def test_remove(self):
+        self.store.remove(1)
+        self.store.remove(1)
+        self.assertEqual(len(self.store), 39)
+        self.assertNotIn(1, self.store)
+        # The moved last row is still found by its id
+        self.products[-1].price = 0.5
+        self.store.update(self.products[-1])
+        self.assertEqual(self.store.ids_in_range("price", high=1), [40])
+
+    def test_ids_in_range(self):
+        self.assertEqual(self.store.ids_in_range("price", 3, 5), [3, 4, 5])
+        self.assertEqual(self.store.ids_in_range("quantity", low=79), [40])
+        self.assertEqual(self.store.ids_in_range("date_added", high=101.5),
+                         [1])
+        self.assertEqual(len(self.store.ids_in_range("price")), 40)
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class TestColumnarStoreNumpy(TestColumnarStore):
+    use_numpy = True
+
+    def test_uses_numpy(self):
+        self.assertTrue(self.store.uses_numpy)
+
+
+if __name__ == "__main__":
+    unittest.main()
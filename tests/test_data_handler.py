@@ -0,0 +1,243 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from data_handler import DataHandler
+
+
+class TestDataHandler(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmpdir.name, "data.json")
+        self.data = {
+            "categories": [{"id": 1, "name": "Laptops [new], {\"x\"}"}],
+            "products": [
+                {"id": 1, "name": "Laptop", "price": 999.99,
+                 "quantity": 12345, "tags": [1, 2, {"a": []}]},
+                {"id": 2, "name": "Smartphone", "price": 699,
+                 "quantity": 0, "tags": []}
+            ],
+            "empty": [],
+            "sequences": {"product": 3, "category": 2}
+        }
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_save_and_load(self):
+        DataHandler.save_to_json_file(self.data, self.filename)
+        self.assertEqual(DataHandler.load_from_json_file(self.filename),
+                         self.data)
+
+    def test_profiles(self):
+        sizes = {}
+        for profile in DataHandler.PROFILES:
+            DataHandler.save_to_json_file(self.data, self.filename,
+                                          profile=profile)
+            sizes[profile] = os.path.getsize(self.filename)
+            self.assertEqual(DataHandler.load_from_json_file(
+                self.filename, profile=profile), self.data)
+        self.assertLess(sizes["compact"], sizes["pretty"])
+        self.assertEqual(sizes["fast"], sizes["compact"])
+        with self.assertRaises(ValueError):
+            DataHandler.dumps(self.data, profile="tiny")
+        with self.assertRaises(ValueError):
+            DataHandler.load_from_json_file(self.filename, profile="tiny")
+
+    def test_fast_profile_fallback(self):
+        # Integers beyond 64 bits are handled by the standard library
+        data = {"products": [{"id": 1, "quantity": 1 << 70}]}
+        self.assertEqual(DataHandler.loads(DataHandler.dumps(data)), data)
+        with patch("data_handler.orjson", None), \
+                patch("data_handler.ujson", None):
+            self.assertEqual(DataHandler.fast_json_library(), "json")
+            content = DataHandler.dumps(self.data)
+            self.assertEqual(DataHandler.loads(content), self.data)
+            self.assertEqual(content,
+                             DataHandler.dumps(self.data, "compact"))
+
+    def test_compressed(self):
+        self.assertEqual(DataHandler.compression("data.json.gz.2"), "gz")
+        self.assertEqual(DataHandler.compression("data.json.xz"), "xz")
+        self.assertIsNone(DataHandler.compression("data.json"))
+        records = [
+            ("categories", self.data["categories"][0]),
+            ("products", self.data["products"][0]),
+            ("products", self.data["products"][1]),
+            ("sequences", self.data["sequences"])
+        ]
+        for extension in ("", ".gz", ".xz"):
+            filename = self.filename + extension
+            for layout in DataHandler.LAYOUTS:
+                for profile in DataHandler.PROFILES:
+                    DataHandler.save_to_json_file(
+                        self.data, filename, profile=profile, layout=layout)
+                    self.assertEqual(
+                        DataHandler.load_from_json_file(filename), self.data)
+                    self.assertEqual(list(DataHandler.iter_json_records(
+                        filename, chunk_size=7)), records)
+        with open(self.filename + ".gz", "rb") as file:
+            self.assertEqual(file.read(2), b"\x1f\x8b")
+        with self.assertRaises(ValueError):
+            DataHandler.save_to_json_file(self.data, self.filename,
+                                          layout="rows")
+
+    def test_columnar(self):
+        columnar = DataHandler.to_columnar(self.data)
+        # The products differ in their tags only, not in their keys
+        self.assertEqual(columnar["columnar"], ["categories", "products"])
+        self.assertEqual(columnar["products"]["id"], [1, 2])
+        self.assertEqual(columnar["empty"], [])
+        self.assertEqual(DataHandler.from_columnar(columnar), self.data)
+        mixed = {"products": [{"id": 1}, {"id": 2, "name": "Laptop"}]}
+        self.assertEqual(DataHandler.to_columnar(mixed)["columnar"], [])
+
+    def test_load_truncated_compressed(self):
+        filename = self.filename + ".gz"
+        DataHandler.save_to_json_file(self.data, filename, backups=1)
+        DataHandler.save_to_json_file({"products": []}, filename, backups=1)
+        with open(filename, "rb") as file:
+            content = file.read()
+        with open(filename, "wb") as file:
+            file.write(content[:len(content) // 2])
+        self.assertEqual(DataHandler.load_from_json_file(filename), self.data)
+
+    def test_save_atomic(self):
+        DataHandler.save_to_json_file(self.data, self.filename)
+        with patch("os.fsync", side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                DataHandler.save_to_json_file({}, self.filename)
+        # The interrupted save neither touched the file nor left a temp file
+        self.assertEqual(DataHandler.load_from_json_file(self.filename),
+                         self.data)
+        self.assertEqual(os.listdir(self.tmpdir.name), ["data.json"])
+        with self.assertRaises(ValueError):
+            DataHandler.save_to_json_file(self.data, self.filename,
+                                          backups=-1)
+
+    def test_save_backups(self):
+        for version in range(4):
+            DataHandler.save_to_json_file({"version": version},
+                                          self.filename, backups=2,
+                                          checksum=True)
+        self.assertEqual(DataHandler.snapshot_candidates(self.filename),
+                         [self.filename, self.filename + ".1",
+                          self.filename + ".2"])
+        for number, version in (("", 3), (".1", 2), (".2", 1)):
+            self.assertTrue(DataHandler.verify_checksum(
+                self.filename + number))
+            with open(self.filename + number, encoding="utf-8") as file:
+                self.assertEqual(json.load(file), {"version": version})
+        # A save without checksum removes the stale checksum file
+        DataHandler.save_to_json_file({"version": 4}, self.filename)
+        self.assertFalse(os.path.exists(self.filename + ".sha256"))
+
+    def test_save_interrupted_before_checksum(self):
+        DataHandler.save_to_json_file({"version": 1}, self.filename,
+                                      backups=1, checksum=True)
+        replace = os.replace
+
+        def crash_on_checksum(source, target):
+            if target.endswith(".sha256") and source.endswith(".new"):
+                raise KeyboardInterrupt
+            replace(source, target)
+
+        with patch("os.replace", crash_on_checksum):
+            with self.assertRaises(KeyboardInterrupt):
+                DataHandler.save_to_json_file({"version": 2}, self.filename,
+                                              backups=1, checksum=True)
+        # The pending checksum vouches for the new file
+        self.assertTrue(DataHandler.verify_checksum(self.filename))
+        self.assertEqual(DataHandler.load_from_json_file(self.filename),
+                         {"version": 2})
+        # The next save completes it before the file becomes a backup
+        DataHandler.save_to_json_file({"version": 3}, self.filename,
+                                      backups=1, checksum=True)
+        self.assertTrue(DataHandler.verify_checksum(self.filename + ".1"))
+        self.assertFalse(os.path.exists(self.filename + ".sha256.new"))
+
+    def test_load_ignores_checksum_as_last_resort(self):
+        DataHandler.save_to_json_file(self.data, self.filename,
+                                      checksum=True)
+        with open(self.filename + ".sha256", "w", encoding="utf-8") as file:
+            file.write("0" * 64)
+        self.assertIsNone(DataHandler.latest_valid_snapshot(self.filename))
+        self.assertEqual(DataHandler.load_from_json_file(self.filename),
+                         self.data)
+
+    def test_load_falls_back_to_backup(self):
+        DataHandler.save_to_json_file(self.data, self.filename, backups=2,
+                                      checksum=True)
+        DataHandler.save_to_json_file({"products": []}, self.filename,
+                                      backups=2, checksum=True)
+        # Corrupted but still valid JSON is caught by the checksum
+        with open(self.filename, "w", encoding="utf-8") as file:
+            file.write("{}")
+        self.assertEqual(DataHandler.latest_valid_snapshot(self.filename),
+                         self.filename + ".1")
+        self.assertEqual(DataHandler.load_from_json_file(self.filename),
+                         self.data)
+        # Without checksum, a truncated file is detected while decoding
+        os.remove(self.filename + ".sha256")
+        with open(self.filename, "w", encoding="utf-8") as file:
+            file.write('{"products": [')
+        self.assertEqual(DataHandler.load_from_json_file(self.filename),
+                         self.data)
+        os.remove(self.filename)
+        self.assertEqual(DataHandler.load_from_json_file(self.filename),
+                         self.data)
+        os.remove(self.filename + ".1")
+        self.assertEqual(DataHandler.load_from_json_file(self.filename),
+                         {"products": [], "categories": []})
+
+    def test_iter_json_records(self):
+        for indent in (None, 4):
+            with open(self.filename, "w", encoding="utf-8") as file:
+                json.dump(self.data, file, indent=indent)
+            # Small chunks split values at every possible position
+            for chunk_size in (1, 2, 7, 1 << 16):
+                records = list(DataHandler.iter_json_records(
+                    self.filename, chunk_size=chunk_size))
+                self.assertEqual(records, [
+                    ("categories", self.data["categories"][0]),
+                    ("products", self.data["products"][0]),
+                    ("products", self.data["products"][1]),
+                    ("sequences", self.data["sequences"])
+                ])
+
+    def test_iter_json_records_numbers(self):
+        content = ('{"categories": [-25.0, 1e5, 2.5E-3], "x": 1.25e+2, '
+                   '"products": [{"price": 0.5, "quantity": 10}, -1e-2]}')
+        with open(self.filename, "w", encoding="utf-8") as file:
+            file.write(content)
+        expected = [("categories", -25.0), ("categories", 1e5),
+                    ("categories", 2.5e-3), ("x", 125.0),
+                    ("products", {"price": 0.5, "quantity": 10}),
+                    ("products", -1e-2)]
+        # Every chunk size splits some number after its "." or "e"
+        for chunk_size in range(1, len(content) + 1):
+            self.assertEqual(list(DataHandler.iter_json_records(
+                self.filename, chunk_size=chunk_size)), expected)
+
+    def test_iter_json_records_empty(self):
+        missing = os.path.join(self.tmpdir.name, "missing.json")
+        self.assertEqual(list(DataHandler.iter_json_records(missing)), [])
+        for content in ("", " \n", "{}"):
+            with open(self.filename, "w", encoding="utf-8") as file:
+                file.write(content)
+            self.assertEqual(
+                list(DataHandler.iter_json_records(self.filename)), [])
+
+    def test_iter_json_records_invalid(self):
+        for content in ('[1, 2]', '{"products": [{"id": 1}', '{"a": 1 "b"}',
+                        '{"products": [1, 2,]}'):
+            with open(self.filename, "w", encoding="utf-8") as file:
+                file.write(content)
+            with self.assertRaises(json.JSONDecodeError):
+                list(DataHandler.iter_json_records(self.filename,
+                                                   chunk_size=3))
+
+
+if __name__ == "__main__":
+    unittest.main()
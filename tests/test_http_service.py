@@ -0,0 +1,164 @@
+import http.client
+import json
+import threading
+import unittest
+from unittest.mock import patch
+from inventory.http_service import InventoryHTTPServer, InventoryService
+from inventory.inventory_manager import InventoryManager
+
+
+@patch("inventory.inventory_logger.InventoryLogger._open_filestream",
+       lambda *p: None)
+class TestInventoryService(unittest.TestCase):
+    def setUp(self):
+        self.product_data = {
+            "name": "Laptop",
+            "price": 999.99,
+            "quantity": 50,
+            "category": 1
+        }
+
+    def make_service(self) -> InventoryService:
+        service = InventoryService(InventoryManager())
+        self.assertTrue(service.inventory.thread_safe)
+        return service
+
+    def test_init(self):
+        with self.assertRaises(TypeError):
+            InventoryService("inventory")
+
+    def test_products(self):
+        service = self.make_service()
+        self.assertEqual(service.handle("POST", "/products",
+                                        self.product_data),
+                         (201, {"id": 1}))
+        status, body = service.handle(
+            "POST", "/products",
+            [{**self.product_data, "name": "Phone", "category": 2}] * 2)
+        self.assertEqual((status, body), (201, {"ids": [2, 3]}))
+        status, body = service.handle("GET", "/products/1")
+        self.assertEqual((status, body["name"]), (200, "Laptop"))
+        status, body = service.handle("PATCH", "/products/1",
+                                      {"name": "Notebook", "price": 10})
+        self.assertEqual((status, body["name"], body["price"]),
+                         (200, "Notebook", 10))
+        # An empty update changes nothing
+        change_count = service.inventory.change_count
+        self.assertEqual(service.handle("PATCH", "/products/1", {}),
+                         (200, body))
+        self.assertEqual(service.inventory.change_count, change_count)
+        self.assertEqual(service.handle("PATCH", "/products",
+                                        [{"id": 2, "quantity": 5}]),
+                         (200, {"updated": 1}))
+
+        status, body = service.handle("GET", "/products")
+        self.assertEqual([product["id"] for product in body], [1, 2, 3])
+        status, body = service.handle("GET", "/products?category_id=2")
+        self.assertEqual([product["id"] for product in body], [2, 3])
+        status, body = service.handle("GET", "/products?q=note")
+        self.assertEqual([product["id"] for product in body], [1])
+        status, body = service.handle("GET", "/products?offset=1&limit=1")
+        self.assertEqual([product["id"] for product in body], [2])
+        status, body = service.handle("GET",
+                                      "/products?category_id=2&offset=1")
+        self.assertEqual([product["id"] for product in body], [3])
+        self.assertEqual(service.handle("GET", "/products?limit=0"),
+                         (200, []))
+        self.assertEqual(service.handle("GET", "/products?offset=-1")[0], 400)
+        self.assertEqual(service.handle("DELETE", "/products/3"),
+                         (200, {"removed": 3}))
+        self.assertEqual(service.handle("GET", "/products/3")[0], 404)
+        self.assertEqual(service.handle("GET", "/value"),
+                         (200, {"value": 10 * 50 + 999.99 * 5}))
+
+    def test_categories(self):
+        service = self.make_service()
+        self.assertEqual(service.handle("POST", "/categories",
+                                        {"name": "Computers"}),
+                         (201, {"id": 1}))
+        self.assertEqual(service.handle("PATCH", "/categories/1",
+                                        {"name": "Portables"}),
+                         (200, {"id": 1, "name": "Portables"}))
+        self.assertEqual(service.handle("GET", "/categories"),
+                         (200, [{"id": 1, "name": "Portables"}]))
+        self.assertEqual(service.handle("PATCH", "/categories/2",
+                                        {"name": "Phones"})[0], 404)
+
+    def test_stock(self):
+        service = self.make_service()
+        service.handle("POST", "/products", [self.product_data] * 2)
+        self.assertEqual(service.handle("POST", "/products/1/stock",
+                                        {"delta": -5}),
+                         (200, {"quantity": 45}))
+        self.assertEqual(service.handle("POST", "/stock",
+                                        {"movements": [[1, -5], [2, 10]]}),
+                         (200, {"updated": 2}))
+        status, body = service.handle("POST", "/stock",
+                                      {"movements": [[1, -41]]})
+        self.assertEqual(status, 400)
+        self.assertIn("Insufficient stock", body["error"])
+        # JSON true is no delta
+        self.assertEqual(service.handle("POST", "/products/1/stock",
+                                        {"delta": True})[0], 400)
+        self.assertEqual(service.handle("POST", "/stock",
+                                        {"movements": [[1, False]]})[0], 400)
+        self.assertEqual(service.handle("GET", "/value?category_id=1"),
+                         (200, {"value": 999.99 * 100}))
+
+    def test_batch(self):
+        service = self.make_service()
+        status, body = service.handle("POST", "/batch", {"requests": [
+            {"method": "POST", "path": "/products",
+             "body": self.product_data},
+            {"method": "POST", "path": "/products/1/stock",
+             "body": {"delta": -1}},
+            {"path": "/products/2"},
+            {"method": "POST", "path": "/batch", "body": {"requests": []}},
+        ]})
+        self.assertEqual(status, 200)
+        self.assertEqual([response["status"]
+                          for response in body["responses"]],
+                         [201, 200, 404, 400])
+        self.assertEqual(body["responses"][1]["body"], {"quantity": 49})
+
+    def test_errors(self):
+        service = self.make_service()
+        self.assertEqual(service.handle("GET", "/missing")[0], 404)
+        self.assertEqual(service.handle("PUT", "/products")[0], 405)
+        self.assertEqual(service.handle("POST", "/products", "Laptop")[0],
+                         400)
+        self.assertEqual(service.handle("POST", "/categories", {})[0], 400)
+        self.assertEqual(service.handle("GET", "/value?category_id=x")[0],
+                         400)
+        self.assertEqual(service.handle_raw("POST", "/products", b"{")[0],
+                         400)
+
+    def test_http_server(self):
+        server = InventoryHTTPServer(("127.0.0.1", 0), InventoryManager())
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            connection = http.client.HTTPConnection(*server.server_address,
+                                                    timeout=5)
+            # Both requests use the same kept-alive connection
+            for method, path, body, expected in (
+                    ("POST", "/products", self.product_data, 201),
+                    ("GET", "/products/1", None, 200)):
+                connection.request(
+                    method, path,
+                    json.dumps(body) if body is not None else None,
+                    {"Content-Type": "application/json"})
+                response = connection.getresponse()
+                self.assertEqual(response.status, expected)
+                self.assertEqual(response.getheader("Content-Type"),
+                                 "application/json")
+                payload = json.loads(response.read())
+            self.assertEqual(payload["name"], "Laptop")
+            connection.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+from inventory.inventory_journal import InventoryJournal
+
+
+class TestInventoryJournal(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmpdir.name, "data.journal")
+        self.journal = InventoryJournal(self.filename)
+
+    def tearDown(self):
+        self.journal.close()
+        self.tmpdir.cleanup()
+
+    def test_init(self):
+        with self.assertRaises(TypeError):
+            InventoryJournal(1)
+        with self.assertRaises(ValueError):
+            InventoryJournal(" ")
+
+    def test_append(self):
+        self.journal.append({"op": "remove_product", "id": 1})
+        self.journal.append({"op": "remove_product", "id": 2})
+        self.assertEqual(self.journal.count, 2)
+        self.assertEqual([r["id"] for r in self.journal.records()], [1, 2])
+        with self.assertRaises(TypeError):
+            self.journal.append("remove product 1")
+
+    def test_count_existing_file(self):
+        self.journal.append({"op": "remove_product", "id": 1})
+        self.journal.close()
+        journal = InventoryJournal(self.filename)
+        self.assertEqual(journal.count, 1)
+
+    def test_torn_record(self):
+        self.journal.append({"op": "remove_product", "id": 1})
+        self.journal.close()
+        with open(self.filename, "a", encoding="utf-8") as file:
+            file.write('{"op": "remove_pro')
+        self.assertEqual(len(list(self.journal.records())), 1)
+        # The next record starts on a new line and survives replays
+        self.journal.append({"op": "remove_product", "id": 2})
+        self.journal.close()
+        self.assertEqual([r["id"] for r in self.journal.records()], [1, 2])
+        self.assertEqual([r["id"] for r
+                          in InventoryJournal(self.filename).records()],
+                         [1, 2])
+
+    def test_truncate(self):
+        self.journal.append({"op": "remove_product", "id": 1})
+        self.journal.truncate()
+        self.assertEqual(self.journal.count, 0)
+        self.assertEqual(list(self.journal.records()), [])
+
+    def test_truncate_position(self):
+        self.journal.append({"op": "remove_product", "id": 1})
+        position = self.journal.position
+        self.journal.append({"op": "remove_product", "id": 2})
+        self.journal.truncate(position)
+        self.assertEqual([r["id"] for r in self.journal.records()], [2])
+        self.assertEqual(self.journal.position, 2)
+        # Positions stay valid after records were removed
+        self.journal.append({"op": "remove_product", "id": 3})
+        self.journal.truncate(position)
+        self.assertEqual(self.journal.count, 2)
+        self.journal.truncate(3)
+        self.assertEqual(list(self.journal.records()), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
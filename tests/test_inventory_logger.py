@@ -0,0 +1,70 @@
+import os
+import tempfile
+import time
+import unittest
+from inventory.inventory_logger import InventoryLogger
+
+
+class TestInventoryLogger(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmpdir.name, "inventory.log")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def read_lines(self) -> list[str]:
+        with open(self.filename, "r") as file:
+            return file.read().splitlines()
+
+    def test_init(self):
+        with self.assertRaises(ValueError):
+            InventoryLogger(max_messages=0)
+        with self.assertRaises(TypeError):
+            InventoryLogger(flush_size="10")
+        with self.assertRaises(ValueError):
+            InventoryLogger(flush_interval=0)
+
+    def test_get_logs(self):
+        logger = InventoryLogger(max_messages=2)
+        logger.log("First")
+        logger.log("Second")
+        logger.log("Third")
+        self.assertEqual(logger.get_logs(), "Second\nThird")
+
+    def test_log_to_file(self):
+        with InventoryLogger(self.filename) as logger:
+            logger.log("Message")
+            self.assertFalse(logger.buffered)
+        lines = self.read_lines()
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[1].endswith("]Message"))
+
+    def test_buffered(self):
+        logger = InventoryLogger(self.filename, buffered=True,
+                                 flush_size=1000, flush_interval=60)
+        for i in range(10):
+            logger.log(f"Message {i}")
+        self.assertEqual(self.read_lines(), [])
+        logger.flush()
+        self.assertEqual(len(self.read_lines()), 11)
+        logger.log("Last message")
+        logger._close_filestream()
+        lines = self.read_lines()
+        self.assertEqual(len(lines), 13)
+        self.assertTrue(lines[-1].startswith("[") and "Stop" in lines[-1])
+
+    def test_buffered_flush_size(self):
+        logger = InventoryLogger(self.filename, buffered=True,
+                                 flush_size=5, flush_interval=60)
+        for i in range(5):
+            logger.log(f"Message {i}")
+        deadline = time.time() + 5
+        while len(self.read_lines()) < 5 and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertGreaterEqual(len(self.read_lines()), 5)
+        logger._close_filestream()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,13 @@
+import os
+import sys
+import tempfile
+import threading
 import unittest
 from unittest.mock import patch
+from data_handler import DataHandler
 from inventory.inventory_manager import InventoryManager
+from inventory.storage import JsonFileBackend
+from inventory.transaction import Transaction
 
 
 class TestInventoryManager(unittest.TestCase):
@@ -38,6 +45,77 @@ class TestInventoryManager(unittest.TestCase):
         self.assertIn(id, self.inventory_manager.products)
         self.inventory_manager.remove_product(id)
 
+    def test_id_sequence(self):
+        """Test ids are allocated from a persistent sequence."""
+        id1 = self.inventory_manager.add_product(self.product1_data)
+        self.inventory_manager.remove_product(id1)
+        id2 = self.inventory_manager.add_product(self.product1_data)
+        self.assertEqual(id2, id1 + 1)
+        cat_id = self.inventory_manager.add_category("Test category")
+
+        data = self.inventory_manager.export_to_json()
+        self.assertEqual(data["sequences"],
+                         {"product": id2 + 1, "category": cat_id + 1})
+        self.inventory_manager.remove_product(id2)
+        with patch("inventory.inventory_logger.InventoryLogger."
+                   "_open_filestream", lambda *p: None):
+            inventory = InventoryManager()
+        inventory.load_data_from_json(
+            self.inventory_manager.export_to_json())
+        self.assertEqual(inventory.add_product(self.product1_data), id2 + 1)
+        self.assertEqual(inventory.add_category("Test category 2"),
+                         cat_id + 1)
+
+    def test_bulk_add_products(self):
+        """Test adding many products at once."""
+        ids = self.inventory_manager.bulk_add_products(
+            [self.product1_data, self.product2_data])
+        self.assertEqual(len(ids), 2)
+        self.assertEqual(self.inventory_manager.products, ids)
+        self.assertEqual(
+            self.inventory_manager.search_product("phone")[0].id, ids[1])
+        self.assertEqual(self.inventory_manager.bulk_add_products([]), [])
+
+        # An invalid row rejects the whole batch
+        invalid = dict(self.product1_data, price=-1)
+        with self.assertRaises(ValueError):
+            self.inventory_manager.bulk_add_products(
+                [self.product1_data, invalid, "product"])
+        self.assertEqual(self.inventory_manager.products, ids)
+
+    def test_bulk_update(self):
+        """Test updating many products at once."""
+        id1, id2 = self.inventory_manager.bulk_add_products(
+            [self.product1_data, self.product2_data])
+        count = self.inventory_manager.bulk_update(
+            [{"id": id1, "price": 10, "quantity": 1},
+             {"id": id2, "name": "Phone", "category_id": 1}])
+        self.assertEqual(count, 2)
+        product1 = self.inventory_manager.find_product_by_id(id1)
+        product2 = self.inventory_manager.find_product_by_id(id2)
+        self.assertEqual((product1.price, product1.quantity), (10, 1))
+        self.assertEqual((product2.name, product2.category_id), ("Phone", 1))
+        self.assertAlmostEqual(
+            self.inventory_manager.get_total_inventory_value_by_category(1),
+            10 + 699.99 * 200)
+
+        # An invalid row rejects the whole batch
+        with self.assertRaises(ValueError):
+            self.inventory_manager.bulk_update(
+                [{"id": id1, "price": 20}, {"id": id2, "quantity": -1}])
+        with self.assertRaises(ValueError):
+            self.inventory_manager.bulk_update([{"id": id1, "color": "red"}])
+        with self.assertRaises(ValueError):
+            self.inventory_manager.bulk_update([{"id": -1, "price": 20}])
+        self.assertEqual(product1.price, 10)
+        # Rows without fields change nothing
+        last_modified = product1.last_modified
+        self.assertEqual(self.inventory_manager.bulk_update([{"id": id1}]),
+                         0)
+        with self.inventory_manager.transaction() as transaction:
+            transaction.update_product(id1)
+        self.assertEqual(product1.last_modified, last_modified)
+
     def test_remove_product(self):
         """Test removing a product from the inventory."""
         id = self.inventory_manager.add_product(self.product1_data)
@@ -52,6 +130,190 @@ class TestInventoryManager(unittest.TestCase):
         self.assertEqual(product.quantity, 150)
         self.inventory_manager.remove_product(id)
 
+    def test_transaction(self):
+        """Test applying staged changes together."""
+        cat_id = self.inventory_manager.add_category("Computers")
+        id1, id2 = self.inventory_manager.bulk_add_products(
+            [self.product1_data, self.product2_data])
+        change_count = self.inventory_manager.change_count
+        with self.inventory_manager.transaction() as transaction:
+            transaction.update_product(id1, name="Notebook", price=899.99)
+            transaction.update_product(id2, quantity=150)
+            transaction.update_product(id1, category_id=cat_id)
+            transaction.update_category_name(cat_id, "Portables")
+            # Nothing is changed before the block ends
+            self.assertEqual(
+                self.inventory_manager.find_product_by_id(id1).name, "Laptop")
+        product1 = self.inventory_manager.find_product_by_id(id1)
+        product2 = self.inventory_manager.find_product_by_id(id2)
+        self.assertEqual((product1.name, product1.price, product1.category_id),
+                         ("Notebook", 899.99, cat_id))
+        self.assertEqual(product2.quantity, 150)
+        self.assertEqual(product1.last_modified, product2.last_modified)
+        self.assertEqual(
+            self.inventory_manager.get_category_info_by_id(cat_id, "name"),
+            "Portables")
+        self.assertGreater(self.inventory_manager.change_count, change_count)
+        self.assertAlmostEqual(
+            self.inventory_manager.get_total_inventory_value(),
+            899.99 * 50 + 699.99 * 150)
+
+        # A transaction staged elsewhere is committed directly
+        transaction = Transaction()
+        transaction.update_product(id2, quantity=100)
+        self.inventory_manager.commit_transaction(transaction)
+        self.assertEqual(product2.quantity, 100)
+        with self.assertRaises(TypeError):
+            self.inventory_manager.commit_transaction({id2: {"quantity": 1}})
+
+    def test_transaction_rollback(self):
+        """Test that a failed transaction changes nothing."""
+        id1, id2 = self.inventory_manager.bulk_add_products(
+            [self.product1_data, self.product2_data])
+        snapshot = self.inventory_manager.export_to_json()
+        with self.assertRaises(ValueError):
+            with self.inventory_manager.transaction() as transaction:
+                transaction.update_product(id1, name="Notebook")
+                transaction.update_product(id2, price=-1)
+        with self.assertRaises(ValueError):
+            with self.inventory_manager.transaction() as transaction:
+                transaction.update_product(id1, name="Notebook")
+                transaction.update_category_name(99, "Missing")
+        with self.assertRaises(KeyError):
+            with self.inventory_manager.transaction() as transaction:
+                transaction.update_product(id1, name="Notebook")
+                raise KeyError("cancelled")
+        with self.assertRaises(ValueError):
+            with self.inventory_manager.transaction() as transaction:
+                transaction.update_product(id1, color="red")
+        self.assertEqual(self.inventory_manager.export_to_json(), snapshot)
+
+    def test_transaction_journal(self):
+        """Test that a transaction is journaled as one record."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            journal_file = os.path.join(tmpdir, "data.journal")
+            data_file = os.path.join(tmpdir, "data.json")
+            self.inventory_manager.enable_journal(journal_file, data_file)
+            cat_id = self.inventory_manager.add_category("Computers")
+            id = self.inventory_manager.add_product(self.product1_data)
+            count = self.inventory_manager._journal.count
+            with self.inventory_manager.transaction() as transaction:
+                transaction.update_product(id, name="Notebook", quantity=3)
+                transaction.update_category_name(cat_id, "Portables")
+            self.assertEqual(self.inventory_manager._journal.count, count + 1)
+            self.inventory_manager.flush_journal()
+            with patch("inventory.inventory_logger.InventoryLogger."
+                       "_open_filestream", lambda *p: None):
+                replayed = InventoryManager()
+            replayed.enable_journal(journal_file, data_file)
+            replayed.replay_journal()
+            self.assertEqual(replayed.export_to_json(),
+                             self.inventory_manager.export_to_json())
+            replayed.disable_journal()
+            self.inventory_manager.disable_journal()
+
+    def test_adjust_quantity(self):
+        """Test changing the quantity of a product by a delta."""
+        id = self.inventory_manager.add_product(self.product1_data)
+        self.assertEqual(self.inventory_manager.adjust_quantity(id, -5), 45)
+        self.assertEqual(self.inventory_manager.adjust_quantity(id, 10), 55)
+        with self.assertRaises(ValueError):
+            self.inventory_manager.adjust_quantity(id, -56)
+        with self.assertRaises(TypeError):
+            self.inventory_manager.adjust_quantity(id, 1.5)
+        with self.assertRaises(ValueError):
+            self.inventory_manager.adjust_quantity(id, True)
+        self.assertEqual(
+            self.inventory_manager.find_product_by_id(id).quantity, 55)
+        self.assertAlmostEqual(
+            self.inventory_manager.get_total_inventory_value(), 999.99 * 55)
+
+    def test_reservations(self):
+        """Test reserving, releasing and committing stock."""
+        id = self.inventory_manager.add_product(self.product1_data)
+        first = self.inventory_manager.reserve(id, 30)
+        second = self.inventory_manager.reserve(id, 15)
+        self.assertEqual(self.inventory_manager.get_available_quantity(id), 5)
+        # Reserved stock can neither be reserved again nor taken
+        with self.assertRaises(ValueError):
+            self.inventory_manager.reserve(id, 6)
+        with self.assertRaises(ValueError):
+            self.inventory_manager.adjust_quantity(id, -6)
+        with self.assertRaises(ValueError):
+            self.inventory_manager.reserve(id, 0)
+        # Nor can a quantity below the reserved stock be set
+        with self.assertRaises(ValueError):
+            self.inventory_manager.update_product_quantity(id, 44)
+        with self.assertRaises(ValueError):
+            self.inventory_manager.bulk_update([{"id": id, "quantity": 44}])
+        with self.assertRaises(ValueError):
+            with self.inventory_manager.transaction() as transaction:
+                transaction.update_product(id, quantity=44)
+        self.assertEqual(
+            self.inventory_manager.find_product_by_id(id).quantity, 50)
+        self.inventory_manager.update_product_quantity(id, 45)
+        self.inventory_manager.update_product_quantity(id, 50)
+
+        self.assertEqual(self.inventory_manager.commit(first), 20)
+        self.inventory_manager.release(second)
+        self.assertEqual(self.inventory_manager.get_available_quantity(id),
+                         20)
+        with self.assertRaises(ValueError):
+            self.inventory_manager.commit(first)
+        with self.assertRaises(ValueError):
+            self.inventory_manager.release(second)
+
+        self.inventory_manager.reserve(id, 20)
+        self.inventory_manager.remove_product(id)
+        self.assertEqual(self.inventory_manager._reserved, {})
+        self.assertEqual(self.inventory_manager._reservations, {})
+
+    def test_apply_stock_movements(self):
+        """Test applying a batch of quantity changes."""
+        id1, id2 = self.inventory_manager.bulk_add_products(
+            [self.product1_data, self.product2_data])
+        self.inventory_manager.reserve(id2, 150)
+        count = self.inventory_manager.apply_stock_movements(
+            [(id1, -10), (id2, -50), (id1, 5), (id2, 20), (id2, -20)])
+        self.assertEqual(count, 2)
+        self.assertEqual(
+            self.inventory_manager.find_product_by_id(id1).quantity, 45)
+        self.assertEqual(
+            self.inventory_manager.find_product_by_id(id2).quantity, 150)
+        self.assertEqual(self.inventory_manager.apply_stock_movements([]), 0)
+
+        # An invalid movement rejects the whole batch
+        for movements in ([(id1, -1), (id2, -1)], [(id1, -1), (-1, 1)],
+                          [(id1, 1.5)], [id1]):
+            with self.assertRaises((TypeError, ValueError)):
+                self.inventory_manager.apply_stock_movements(movements)
+        self.assertEqual(
+            self.inventory_manager.find_product_by_id(id1).quantity, 45)
+        self.assertAlmostEqual(
+            self.inventory_manager.get_total_inventory_value(),
+            999.99 * 45 + 699.99 * 150)
+
+    def test_stock_movements_journal(self):
+        """Test replaying journaled stock movements."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            journal_file = os.path.join(tmpdir, "data.journal")
+            data_file = os.path.join(tmpdir, "data.json")
+            self.inventory_manager.enable_journal(journal_file, data_file)
+            id = self.inventory_manager.add_product(self.product1_data)
+            self.inventory_manager.adjust_quantity(id, -1)
+            self.inventory_manager.apply_stock_movements([(id, -2)])
+            self.inventory_manager.commit(
+                self.inventory_manager.reserve(id, 3))
+            self.inventory_manager.flush_journal()
+            with patch("inventory.inventory_logger.InventoryLogger."
+                       "_open_filestream", lambda *p: None):
+                replayed = InventoryManager()
+            replayed.enable_journal(journal_file, data_file)
+            replayed.replay_journal()
+            self.assertEqual(replayed.find_product_by_id(id).quantity, 44)
+            replayed.disable_journal()
+            self.inventory_manager.disable_journal()
+
     def test_get_product_info_by_id(self):
         """Test getting product info."""
         id = self.inventory_manager.add_product(self.product1_data)
@@ -80,6 +342,75 @@ class TestInventoryManager(unittest.TestCase):
         self.inventory_manager.remove_product(id1)
         self.inventory_manager.remove_product(id2)
 
+    def test_running_inventory_value(self):
+        """Test the running totals follow every change."""
+        self.assertEqual(self.inventory_manager.get_total_inventory_value(), 0)
+        id1 = self.inventory_manager.add_product(self.product1_data)
+        id2 = self.inventory_manager.add_product(self.product2_data)
+        self.inventory_manager.update_product_price(id1, 10)
+        self.inventory_manager.update_product_quantity(id2, 3)
+        self.inventory_manager.update_product_category(id2, 1)
+        self.assertAlmostEqual(
+            self.inventory_manager.get_total_inventory_value(),
+            10 * 50 + 699.99 * 3)
+        self.assertAlmostEqual(
+            self.inventory_manager.get_total_inventory_value_by_category(1),
+            10 * 50 + 699.99 * 3)
+        self.assertEqual(
+            self.inventory_manager.get_total_inventory_value_by_category(2),
+            0)
+        self.assertLess(self.inventory_manager.verify_inventory_totals(),
+                        1e-6)
+        self.inventory_manager.remove_product(id1)
+        self.inventory_manager.remove_product(id2)
+        self.assertEqual(self.inventory_manager.get_total_inventory_value(), 0)
+
+    def test_verify_inventory_totals(self):
+        """Test the verification reports and repairs drift."""
+        id1 = self.inventory_manager.add_product(self.product1_data)
+        self.inventory_manager.get_total_inventory_value()
+        self.inventory_manager._total_value += 5
+        self.assertAlmostEqual(
+            self.inventory_manager.verify_inventory_totals(), 5)
+        self.assertEqual(
+            self.inventory_manager.get_total_inventory_value(), 999.99 * 50)
+        self.inventory_manager._total_value += 5
+        self.assertEqual(
+            self.inventory_manager.get_total_inventory_value(verify=True),
+            999.99 * 50)
+        self.inventory_manager.remove_product(id1)
+
+    def test_get_products_in_range(self):
+        """Test range queries with and without the columnar store."""
+        id1, id2 = self.inventory_manager.bulk_add_products(
+            [self.product1_data, self.product2_data])
+        for enabled in (False, True):
+            if enabled:
+                self.inventory_manager.enable_columnar_store(use_numpy=False)
+            self.assertEqual(
+                self.inventory_manager.get_products_in_range("price", 700),
+                [id1])
+            self.assertEqual(self.inventory_manager.get_products_in_range(
+                "quantity", 100, 200), [id2])
+        self.inventory_manager.update_product_quantity(id1, 150)
+        self.assertEqual(self.inventory_manager.get_products_in_range(
+            "quantity", 100, 200), [id1, id2])
+        # Bulk changes share one timestamp in the columns too
+        self.inventory_manager.bulk_update([{"id": id1, "price": 800},
+                                            {"id": id2, "quantity": 5}])
+        last_modified = self.inventory_manager.find_product_by_id(
+            id1).last_modified
+        self.assertEqual(self.inventory_manager.get_products_in_range(
+            "last_modified", last_modified, last_modified), [id1, id2])
+        self.assertEqual(self.inventory_manager.get_products_in_range(
+            "price", 750, 850), [id1])
+        self.inventory_manager.bulk_update([{"id": id2, "quantity": 150}])
+        self.inventory_manager.remove_product(id2)
+        self.assertEqual(self.inventory_manager.get_products_in_range(
+            "quantity", 100, 200), [id1])
+        with self.assertRaises(ValueError):
+            self.inventory_manager.get_products_in_range("name")
+
     def test_search_product(self):
         """Test searching for products by keyword."""
         id1 = self.inventory_manager.add_product(self.product1_data)
@@ -93,6 +424,18 @@ class TestInventoryManager(unittest.TestCase):
         search_results = self.inventory_manager.search_product("phoe")
         self.assertEqual(search_results, None)
 
+        search_results = self.inventory_manager.search_product("lap", True)
+        self.assertEqual([product.id for product in search_results], [id1])
+        search_results = self.inventory_manager.search_product("top", True)
+        self.assertEqual(search_results, None)
+
+        # The index follows renamed products
+        self.inventory_manager.update_product_name(id1, "Notebook")
+        self.assertEqual(self.inventory_manager.search_product("laptop"),
+                         None)
+        search_results = self.inventory_manager.search_product("book")
+        self.assertEqual(search_results[0].id, id1)
+
         self.inventory_manager.remove_product(id1)
         self.inventory_manager.remove_product(id2)
 
@@ -156,6 +499,13 @@ class TestInventoryManager(unittest.TestCase):
         id = self.inventory_manager.add_category("Test category 1")
         self.inventory_manager.remove_category(id)
 
+        # Renamed categories free their old name
+        id = self.inventory_manager.add_category("Test category 3")
+        self.inventory_manager.update_category_name(id, "Test category 4")
+        with self.assertRaises(ValueError):
+            self.inventory_manager.add_category("Test category 4")
+        self.inventory_manager.add_category("Test category 3")
+
     def test_get_categories(self):
         """Test getting all categories in a dict."""
         result = self.inventory_manager.get_categories()
@@ -195,6 +545,30 @@ class TestInventoryManager(unittest.TestCase):
         self.inventory_manager.remove_product(product.id)
         self.inventory_manager.remove_category(cat_id)
 
+    def test_get_products_by_category(self):
+        """Test listing the products of a category."""
+        id1 = self.inventory_manager.add_product(self.product1_data)
+        id2 = self.inventory_manager.add_product(self.product2_data)
+        result = self.inventory_manager.get_products_by_category(1)
+        product1 = self.inventory_manager.find_product_by_id(id1)
+        self.assertEqual(result, [product1.get_info()])
+
+        # The index follows category changes and removals
+        self.inventory_manager.update_product_category(id2, 1)
+        result = self.inventory_manager.get_products_by_category(1)
+        self.assertEqual(len(result), 2)
+        self.assertEqual(
+            self.inventory_manager.get_product_ids_by_category(1), [id1, id2])
+        self.assertEqual(
+            self.inventory_manager.get_products_by_category(2), [])
+        self.inventory_manager.remove_product(id1)
+        result = self.inventory_manager.get_products_by_category(1)
+        self.assertEqual(len(result), 1)
+        self.assertEqual(
+            self.inventory_manager.get_total_inventory_value_by_category(1),
+            699.99 * 200)
+        self.inventory_manager.remove_product(id2)
+
     def test_is_product_available(self):
         """Test if a product is available. """
         id = self.inventory_manager.add_product(self.product1_data)
@@ -206,6 +580,315 @@ class TestInventoryManager(unittest.TestCase):
         self.assertEqual(result, False)
         self.inventory_manager.remove_product(id)
 
+    @patch("inventory.inventory_logger.InventoryLogger._open_filestream",
+           lambda *p: None)
+    def test_load_data_from_records(self):
+        """Test loading from a stream of records."""
+        self.inventory_manager.add_category("Test category")
+        self.inventory_manager.bulk_add_products(
+            [self.product1_data, self.product2_data])
+        with tempfile.TemporaryDirectory() as tmpdir:
+            data_file = os.path.join(tmpdir, "data.json")
+            DataHandler.save_to_json_file(
+                self.inventory_manager.export_to_json(), data_file)
+            inventory = InventoryManager()
+            inventory.load_data_from_json(
+                DataHandler.iter_json_records(data_file))
+        self.assertEqual(inventory.export_to_json(),
+                         self.inventory_manager.export_to_json())
+
+    def test_audit_trail(self):
+        """Test changes are recorded in the audit log."""
+        with self.assertRaises(ValueError):
+            self.inventory_manager.get_audit_trail()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            self.inventory_manager.enable_audit_log(
+                os.path.join(tmpdir, "audit.jsonl"))
+            id1 = self.inventory_manager.add_product(self.product1_data)
+            id2 = self.inventory_manager.add_product(self.product2_data)
+            self.inventory_manager.update_product_price(id1, 250)
+            self.inventory_manager.bulk_update([{"id": id1, "quantity": 3}])
+            self.inventory_manager.remove_product(id2)
+            cat_id = self.inventory_manager.add_category("Test category")
+            self.inventory_manager.update_category_name(cat_id, "Test 2")
+
+            trail = self.inventory_manager.get_audit_trail(id1)
+            self.assertEqual([e["event"] for e in trail],
+                             ["add", "update_price", "update"])
+            self.assertEqual((trail[1]["old"], trail[1]["new"]),
+                             (999.99, 250))
+            self.assertEqual(trail[2]["old"], {"quantity": 50})
+            trail = self.inventory_manager.get_audit_trail(id2)
+            self.assertEqual(trail[-1]["event"], "remove")
+            trail = self.inventory_manager.get_audit_trail(
+                category_id=cat_id)
+            self.assertEqual(trail[-1]["new"], "Test 2")
+            self.assertEqual(
+                len(self.inventory_manager.get_audit_trail(
+                    since=trail[0]["ts"])), 2)
+            self.inventory_manager.disable_audit_log()
+
+    @patch("inventory.inventory_logger.InventoryLogger._open_filestream",
+           lambda *p: None)
+    def test_journal(self):
+        """Test replaying and compacting the journal."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            journal_file = os.path.join(tmpdir, "data.journal")
+            data_file = os.path.join(tmpdir, "data.json")
+            self.inventory_manager.enable_journal(journal_file, data_file)
+            # Invalid arguments leave the current journal in place
+            journal = self.inventory_manager._journal
+            with self.assertRaises(ValueError):
+                self.inventory_manager.enable_journal(
+                    journal_file + ".new", data_file, layout="rows")
+            self.assertIs(self.inventory_manager._journal, journal)
+            cat_id = self.inventory_manager.add_category("Test category")
+            id1 = self.inventory_manager.add_product(self.product1_data)
+            id2 = self.inventory_manager.add_product(self.product2_data)
+            self.inventory_manager.update_product_price(id1, 250)
+            self.inventory_manager.update_product_category(id1, cat_id)
+            self.inventory_manager.remove_product(id2)
+            self.inventory_manager.bulk_add_products([self.product2_data])
+            self.inventory_manager.bulk_update([{"id": id1, "quantity": 3}])
+            self.inventory_manager.disable_journal()
+
+            inventory = InventoryManager()
+            inventory.enable_journal(journal_file, data_file)
+            inventory.load_data_from_json({})
+            self.assertEqual(inventory.export_to_json(),
+                             self.inventory_manager.export_to_json())
+
+            inventory.update_product_quantity(id1, 7)
+            inventory.compact_journal()
+            self.assertEqual(list(inventory._journal.records()), [])
+            inventory.disable_journal()
+            data = DataHandler.load_from_json_file(data_file)
+            self.assertEqual(data, inventory.export_to_json())
+
+    @patch("inventory.inventory_logger.InventoryLogger._open_filestream",
+           lambda *p: None)
+    def test_journal_compact_threshold(self):
+        """Test automatic compaction of the journal."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            journal_file = os.path.join(tmpdir, "data.journal")
+            data_file = os.path.join(tmpdir, "data.json")
+            self.inventory_manager.enable_journal(journal_file, data_file,
+                                                  compact_threshold=2)
+            self.inventory_manager.add_product(self.product1_data)
+            self.assertFalse(os.path.exists(data_file))
+            self.inventory_manager.add_product(self.product2_data)
+            self.assertTrue(os.path.exists(data_file))
+            self.assertEqual(self.inventory_manager._journal.count, 0)
+            self.inventory_manager.disable_journal()
+
+    @patch("inventory.inventory_logger.InventoryLogger._open_filestream",
+           lambda *p: None)
+    def test_dirty_tracking(self):
+        """Test counting unsaved changes."""
+        self.assertFalse(self.inventory_manager.is_dirty())
+        cat_id = self.inventory_manager.add_category("Test category")
+        id1 = self.inventory_manager.add_product(self.product1_data)
+        id2 = self.inventory_manager.add_product(self.product2_data)
+        self.assertEqual(self.inventory_manager.pending_changes, 3)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            self.inventory_manager.set_storage(
+                JsonFileBackend(os.path.join(tmpdir, "data.json")))
+            self.inventory_manager.save()
+            self.assertFalse(self.inventory_manager.is_dirty())
+            # Setters called directly on a product are tracked as well
+            self.inventory_manager.find_product_by_id(id2).price = 5
+            self.inventory_manager.update_category_name(cat_id, "Other")
+            self.inventory_manager.remove_product(id1)
+            self.assertEqual(self.inventory_manager.pending_changes, 3)
+            self.assertEqual(self.inventory_manager.change_count, 6)
+            self.assertEqual(self.inventory_manager.get_dirty_products(),
+                             [id1, id2])
+            self.assertEqual(self.inventory_manager.get_dirty_categories(),
+                             [cat_id])
+            self.inventory_manager.save()
+            self.assertEqual(self.inventory_manager.get_dirty_products(), [])
+            self.assertEqual(self.inventory_manager.get_dirty_categories(),
+                             [])
+
+    @patch("inventory.inventory_logger.InventoryLogger._open_filestream",
+           lambda *p: None)
+    def test_export_delta(self):
+        """Test exporting only the changes since a timestamp."""
+        cat_id = self.inventory_manager.add_category("Test category")
+        id1 = self.inventory_manager.add_product(self.product1_data)
+        id2 = self.inventory_manager.add_product(self.product2_data)
+        # Loaded products are found by their last_modified
+        inventory = InventoryManager()
+        inventory.load_data_from_json(self.inventory_manager.export_to_json())
+        since = inventory.find_product_by_id(id2).last_modified
+        delta = inventory.export_to_json(since=since)
+        self.assertEqual([prod["id"] for prod in delta["products"]], [id2])
+        self.assertEqual(delta["categories"], [])
+
+        delta = inventory.export_to_json(since=delta["until"])
+        self.assertEqual(delta["products"], [])
+        inventory.bulk_update([{"id": id1, "quantity": 3}])
+        inventory.update_category_name(cat_id, "Other")
+        inventory.remove_product(id2)
+        delta = inventory.export_to_json(since=delta["until"])
+        self.assertEqual(delta["products"],
+                         [inventory.product_to_dict(
+                             inventory.find_product_by_id(id1))])
+        self.assertEqual(delta["categories"],
+                         [{"id": cat_id, "name": "Other"}])
+        self.assertEqual([prod["id"] for prod in delta["removed_products"]],
+                         [id2])
+        self.assertEqual(delta["sequences"], {"product": 3, "category": 2})
+        with self.assertRaises(TypeError):
+            inventory.export_to_json(since="yesterday")
+
+    @patch("inventory.inventory_logger.InventoryLogger._open_filestream",
+           lambda *p: None)
+    def test_autosave(self):
+        """Test saving changes automatically."""
+        with self.assertRaises(ValueError):
+            self.inventory_manager.enable_autosave()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            journal_file = os.path.join(tmpdir, "data.journal")
+            data_file = os.path.join(tmpdir, "data.json")
+            self.inventory_manager.enable_journal(journal_file, data_file,
+                                                  compact_threshold=0)
+            self.inventory_manager.enable_autosave(
+                debounce=60, max_pending=3, min_interval=0)
+            self.inventory_manager.add_product(self.product1_data)
+            self.assertFalse(self.inventory_manager.autosave())
+            self.assertTrue(self.inventory_manager.is_dirty())
+            self.assertTrue(self.inventory_manager.autosave(idle=True))
+            self.assertFalse(self.inventory_manager.is_dirty())
+            self.assertFalse(self.inventory_manager.autosave(idle=True))
+
+            # Saved without asking once too many changes are pending, a
+            # new policy forgets the time of the last save
+            self.inventory_manager.enable_autosave(
+                debounce=60, max_pending=3, min_interval=0)
+            self.inventory_manager.bulk_add_products(
+                [self.product2_data] * 3)
+            self.assertFalse(self.inventory_manager.is_dirty())
+            self.assertEqual(self.inventory_manager._journal.count, 0)
+            self.assertEqual(DataHandler.load_from_json_file(data_file),
+                             self.inventory_manager.export_to_json())
+            self.inventory_manager.disable_autosave()
+            self.inventory_manager.disable_journal()
+
+    @patch("inventory.inventory_logger.InventoryLogger._open_filestream",
+           lambda *p: None)
+    def test_background_saves(self):
+        """Test compacting the journal in the background."""
+        with self.assertRaises(ValueError):
+            self.inventory_manager.enable_background_saves()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            journal_file = os.path.join(tmpdir, "data.journal")
+            data_file = os.path.join(tmpdir, "data.json")
+            self.inventory_manager.enable_journal(journal_file, data_file,
+                                                  compact_threshold=2)
+            self.inventory_manager.enable_background_saves()
+            self.inventory_manager.add_product(self.product1_data)
+            self.inventory_manager.add_product(self.product2_data)
+            snapshot = self.inventory_manager.export_to_json()
+            # Changes after the snapshot stay in the journal
+            self.inventory_manager.update_product_price(1, 250)
+            self.inventory_manager._save_worker.wait(timeout=5)
+            self.assertEqual(self.inventory_manager.poll_saves(),
+                             [(data_file, None)])
+            self.assertEqual(DataHandler.load_from_json_file(data_file),
+                             snapshot)
+            self.assertEqual(self.inventory_manager._journal.count, 1)
+
+            self.inventory_manager.compact_journal()
+            self.assertEqual(self.inventory_manager.disable_background_saves(),
+                             [(data_file, None)])
+            self.assertEqual(self.inventory_manager._journal.count, 0)
+            self.assertEqual(DataHandler.load_from_json_file(data_file),
+                             self.inventory_manager.export_to_json())
+            self.inventory_manager.disable_journal()
+
+    def test_checkpoint(self):
+        """Test persisting all changes at once."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            data_file = os.path.join(tmpdir, "data.json")
+            self.inventory_manager.set_storage(JsonFileBackend(data_file))
+            self.inventory_manager.add_product(self.product1_data)
+            self.assertEqual(self.inventory_manager.checkpoint(), [])
+            self.assertFalse(self.inventory_manager.is_dirty())
+
+            journal_file = os.path.join(tmpdir, "data.journal")
+            self.inventory_manager.enable_journal(journal_file, data_file)
+            self.inventory_manager.add_product(self.product2_data)
+            self.assertEqual(self.inventory_manager.checkpoint(), [])
+            self.assertEqual(self.inventory_manager._journal.count, 0)
+            self.assertEqual(DataHandler.load_from_json_file(data_file),
+                             self.inventory_manager.export_to_json())
+            self.inventory_manager.disable_journal()
+
+    def test_thread_safety(self):
+        """Test concurrent writers and readers lose no updates."""
+        inventory = self.inventory_manager
+        inventory.enable_thread_safety()
+        self.assertTrue(inventory.thread_safe)
+        added: list[list[int]] = []
+        errors = []
+        writing = threading.Event()
+
+        def write(worker: int):
+            try:
+                ids = [inventory.add_product(
+                    {**self.product1_data, "name": f"Item {worker} {n}",
+                     "category": worker % 3}) for n in range(200)]
+                ids += inventory.bulk_add_products(
+                    [self.product2_data] * 10)
+                added.append(ids)
+                for step in range(1, 4):
+                    for product_id in ids:
+                        inventory.update_product_quantity(product_id, step)
+            except Exception as e:
+                errors.append(e)
+
+        def read():
+            try:
+                while writing.is_set():
+                    inventory.get_total_inventory_value()
+                    inventory.find_product_by_id(1)
+                    inventory.search_product("Item")
+                    inventory.get_products_by_category(1)
+            except Exception as e:
+                errors.append(e)
+
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-5)
+        try:
+            writing.set()
+            readers = [threading.Thread(target=read) for _ in range(4)]
+            writers = [threading.Thread(target=write, args=(worker,))
+                       for worker in range(8)]
+            for thread in readers + writers:
+                thread.start()
+            for thread in writers:
+                thread.join()
+            writing.clear()
+            for thread in readers:
+                thread.join()
+        finally:
+            sys.setswitchinterval(interval)
+
+        self.assertEqual(errors, [])
+        ids = [product_id for worker_ids in added for product_id in worker_ids]
+        self.assertEqual(len(set(ids)), 8 * 210)
+        self.assertEqual(sorted(inventory.products), sorted(ids))
+        # The add and 3 updates of each product were counted
+        self.assertEqual(inventory.change_count, 8 * 210 * 4)
+        # Only rounding errors, a lost update would be off by a price
+        self.assertLess(inventory.verify_inventory_totals(), 1e-3)
+        self.assertAlmostEqual(inventory.get_total_inventory_value(),
+                               3 * (8 * 200 * 999.99 + 8 * 10 * 699.99),
+                               places=3)
+        inventory.disable_thread_safety()
+        self.assertFalse(inventory.thread_safe)
+
 
 if __name__ == "__main__":
     unittest.main()
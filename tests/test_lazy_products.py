@@ -0,0 +1,76 @@
+import threading
+import unittest
+from inventory.lazy_products import LazyProducts
+from inventory.product import Product
+
+
+class TestLazyProducts(unittest.TestCase):
+    def setUp(self):
+        self.loaded = []
+        self.products = LazyProducts(self.load)
+        for product_id in (1, 2, 3):
+            self.products.register(product_id)
+
+    def load(self, product_id: int) -> Product:
+        self.loaded.append(product_id)
+        return Product(id=product_id, name=f"Product {product_id}",
+                       price=1.0, quantity=1, date_added=1.0,
+                       last_modified=1.0)
+
+    def test_init(self):
+        with self.assertRaises(TypeError):
+            LazyProducts(None)
+
+    def test_register(self):
+        with self.assertRaises(ValueError):
+            self.products.register(1)
+        self.assertEqual(len(self.products), 3)
+        self.assertEqual(list(self.products), [1, 2, 3])
+        self.assertIn(2, self.products)
+        self.assertEqual(self.loaded, [])
+
+    def test_getitem(self):
+        self.assertEqual(self.products[2].id, 2)
+        self.assertEqual(self.products.get(2).id, 2)
+        self.assertEqual(self.loaded, [2])
+        self.assertTrue(self.products.is_loaded(2))
+        self.assertEqual(self.products.unloaded, 2)
+        self.assertIsNone(self.products.get(4))
+        self.assertEqual([p.id for p in self.products.values()], [1, 2, 3])
+        self.assertEqual(self.products.unloaded, 0)
+
+    def test_setitem_and_delitem(self):
+        self.products[2] = self.load(2)
+        self.assertEqual(self.products.unloaded, 2)
+        del self.products[1]
+        self.assertEqual(self.products.unloaded, 1)
+        self.assertEqual(self.products.pop(3).id, 3)
+        self.assertEqual(list(self.products), [2])
+        self.assertEqual(self.products.unloaded, 0)
+
+    def test_lock(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def load(product_id: int) -> Product:
+            started.set()
+            release.wait()
+            return self.load(product_id)
+
+        products = LazyProducts(load, lock=threading.Lock())
+        products.register(1)
+        threads = [threading.Thread(target=products.__getitem__, args=(1,))
+                   for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        started.wait()
+        release.set()
+        for thread in threads:
+            thread.join()
+        # The readers waiting for the lock find the product loaded
+        self.assertEqual(self.loaded, [1])
+        self.assertEqual(products.unloaded, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
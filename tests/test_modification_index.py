@@ -0,0 +1,38 @@
+import unittest
+from inventory.modification_index import ModificationIndex
+
+
+class TestModificationIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = ModificationIndex()
+
+    def test_touch(self):
+        self.index.touch("a", 1.0)
+        self.index.touch("b", 2.0)
+        self.index.touch("c", 3.0)
+        self.assertEqual(self.index.since(2.0), ["b", "c"])
+        # Only the latest modification of a key counts
+        self.index.touch("a", 4.0)
+        self.index.touch("c", 1.5)
+        self.assertEqual(self.index.since(0), ["c", "b", "a"])
+        self.assertEqual(self.index.since(2.5), ["a"])
+        self.assertEqual(self.index.get("c"), 1.5)
+        self.assertEqual(len(self.index), 3)
+        with self.assertRaises(TypeError):
+            self.index.touch("a", "now")
+
+    def test_extend(self):
+        self.index.touch("a", 5.0)
+        self.index.extend([("a", 1.0), ("b", 2.0)])
+        self.assertEqual(self.index.since(0), ["b", "a"])
+        self.assertNotIn("c", self.index)
+
+    def test_compact(self):
+        for timestamp in range(1000):
+            self.index.touch(timestamp % 3, float(timestamp))
+        self.assertEqual(self.index.since(0), [1, 2, 0])
+        self.assertEqual(self.index.since(998), [2, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -160,6 +160,27 @@ class TestProduct(unittest.TestCase):
         product.update_last_modified()
         self.assertIsNot(date_last, product.last_modified)
 
+        product.update_last_modified(12.5)
+        self.assertEqual(product.last_modified, 12.5)
+
+    def test_set_watcher(self):
+        changes = []
+        self.product.set_watcher(
+            lambda product, field, old: changes.append((field, old)))
+        self.product.name = "Notebook"
+        self.product.quantity = 10
+        self.assertEqual(changes, [("name", "Laptop"), ("quantity", 50)])
+
+        with self.assertRaises(ValueError):
+            self.product.price = -1
+        self.assertEqual(len(changes), 2)
+
+        self.product.set_watcher(None)
+        self.product.price = 1.0
+        self.assertEqual(len(changes), 2)
+        with self.assertRaises(TypeError):
+            self.product.set_watcher("watcher")
+
     def test_description(self):
         with self.assertRaises(TypeError):
             self.product.description = 1234
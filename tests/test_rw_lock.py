@@ -0,0 +1,101 @@
+import threading
+import unittest
+from inventory.rw_lock import ReadWriteLock
+
+
+class TestReadWriteLock(unittest.TestCase):
+    def setUp(self):
+        self.lock = ReadWriteLock()
+
+    def test_parallel_readers(self):
+        barrier = threading.Barrier(3, timeout=5)
+
+        def read():
+            with self.lock.read():
+                # Only passes if all readers hold the lock at once
+                barrier.wait()
+
+        threads = [threading.Thread(target=read) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.lock.readers, 0)
+
+    def test_writer_excludes_readers(self):
+        acquired = threading.Event()
+
+        def read():
+            with self.lock.read():
+                acquired.set()
+
+        with self.lock.write():
+            thread = threading.Thread(target=read)
+            thread.start()
+            self.assertFalse(acquired.wait(timeout=0.05))
+        self.assertTrue(acquired.wait(timeout=5))
+        thread.join()
+
+    def test_waiting_writer_blocks_new_readers(self):
+        events = []
+        reading = threading.Event()
+        release = threading.Event()
+
+        def first_reader():
+            with self.lock.read():
+                reading.set()
+                release.wait()
+
+        def writer():
+            with self.lock.write():
+                events.append("write")
+
+        def second_reader():
+            with self.lock.read():
+                events.append("read")
+
+        threads = [threading.Thread(target=first_reader)]
+        threads[0].start()
+        reading.wait()
+        threads.append(threading.Thread(target=writer))
+        threads[1].start()
+        # Wait until the writer is queued behind the first reader
+        while not self.lock._ReadWriteLock__waiting_writers:
+            threading.Event().wait(0.001)
+        threads.append(threading.Thread(target=second_reader))
+        threads[2].start()
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(events, ["write", "read"])
+
+    def test_reentrant(self):
+        with self.lock.write():
+            with self.lock.write():
+                with self.lock.read():
+                    self.assertEqual(self.lock.readers, 1)
+        with self.lock.read():
+            with self.lock.read():
+                pass
+        self.assertEqual(self.lock.readers, 0)
+        # The lock is free again
+        with self.lock.write():
+            pass
+
+    def test_upgrade(self):
+        with self.lock.read():
+            with self.assertRaises(RuntimeError):
+                self.lock.acquire_write()
+        with self.lock.write():
+            pass
+
+    def test_release_unheld(self):
+        with self.assertRaises(RuntimeError):
+            self.lock.release_read()
+        with self.assertRaises(RuntimeError):
+            self.lock.release_write()
+
+
+if __name__ == "__main__":
+    unittest.main()
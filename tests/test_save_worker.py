@@ -0,0 +1,59 @@
+import threading
+import unittest
+from inventory.save_worker import SaveWorker
+
+
+class TestSaveWorker(unittest.TestCase):
+    def test_init(self):
+        with self.assertRaises(TypeError):
+            SaveWorker("write")
+
+    def test_coalesce(self):
+        started = threading.Event()
+        release = threading.Event()
+        written = []
+
+        def write(data):
+            started.set()
+            release.wait()
+            written.append(data)
+
+        with SaveWorker(write) as worker:
+            worker.submit(1, tag="a")
+            started.wait()
+            # Jobs waiting behind the running one are replaced
+            worker.submit(2, tag="b")
+            worker.submit(3, tag="c")
+            self.assertTrue(worker.busy)
+            self.assertFalse(worker.wait(timeout=0.01))
+            release.set()
+            self.assertTrue(worker.wait(timeout=5))
+            self.assertFalse(worker.busy)
+            self.assertEqual(written, [1, 3])
+            self.assertEqual(worker.coalesced, 1)
+            self.assertEqual(worker.poll(), [("a", None), ("c", None)])
+            self.assertEqual(worker.poll(), [])
+
+    def test_error(self):
+        def write(data):
+            raise OSError("disk full")
+
+        with SaveWorker(write) as worker:
+            worker.submit(1, tag="a")
+            worker.wait(timeout=5)
+            [(tag, error)] = worker.poll()
+        self.assertEqual(tag, "a")
+        self.assertIsInstance(error, OSError)
+
+    def test_close_writes_pending(self):
+        written = []
+        worker = SaveWorker(written.append)
+        worker.submit(1)
+        worker.close()
+        self.assertEqual(written, [1])
+        with self.assertRaises(ValueError):
+            worker.submit(2)
+
+
+if __name__ == "__main__":
+    unittest.main()
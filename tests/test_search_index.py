@@ -0,0 +1,81 @@
+import random
+import string
+import tracemalloc
+import unittest
+from inventory.search_index import SearchIndex
+
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = SearchIndex()
+        self.index.add(1, "Laptop X")
+        self.index.add(2, "Smartphone")
+        self.index.add(3, "Headphones")
+
+    def test_init(self):
+        with self.assertRaises(TypeError):
+            SearchIndex(gram_size="3")
+        with self.assertRaises(ValueError):
+            SearchIndex(gram_size=0)
+
+    def test_search(self):
+        self.assertEqual(self.index.search("phone"), {2, 3})
+        self.assertEqual(self.index.search("PHONES"), {3})
+        self.assertEqual(self.index.search("p"), {1, 2, 3})
+        self.assertEqual(self.index.search("phoe"), set())
+        self.assertEqual(self.index.search("ptop x"), {1})
+        self.assertEqual(self.index.search(""), {1, 2, 3})
+
+    def test_search_prefix(self):
+        self.assertEqual(self.index.search("smart", prefix=True), {2})
+        self.assertEqual(self.index.search("phone", prefix=True), set())
+
+    def test_add(self):
+        self.index.add(1, "Tablet")
+        self.assertEqual(self.index.search("laptop"), set())
+        self.assertEqual(self.index.search("tablet"), {1})
+        self.assertEqual(len(self.index), 3)
+
+    def test_remove(self):
+        self.index.remove(2)
+        self.assertEqual(self.index.search("phone"), {3})
+        self.assertNotIn(2, self.index)
+        self.index.remove(2)
+
+    def test_short_keywords(self):
+        self.index.add(4, "TV")
+        self.assertEqual(self.index.search("tv"), {4})
+        self.assertEqual(self.index.search("x"), {1})
+        self.assertEqual(self.index.search("ph"), {2, 3})
+        self.assertEqual(self.index.search("he", prefix=True), {3})
+
+    def test_compaction(self):
+        # Renames leave stale postings until the index is rebuilt
+        for round_ in range(2000):
+            self.index.add(2, f"Smartphone {round_}")
+        self.assertEqual(self.index.search("smartphone"), {2})
+        self.assertEqual(self.index.search("phone 1999"), {2})
+        self.assertEqual(self.index.search("phone 1998"), set())
+        self.index.remove(2)
+        self.assertEqual(self.index.search("smart"), set())
+
+    def test_memory_per_entry(self):
+        random.seed(0)
+        words = ["".join(random.choices(string.ascii_letters,
+                                        k=random.randint(3, 9)))
+                 for _ in range(500)]
+        names = [" ".join(random.choices(words, k=4))[:30]
+                 for _ in range(5000)]
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        index = SearchIndex()
+        for key, name in enumerate(names):
+            index.add(key, name)
+        after = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        # About 400 bytes, n-grams of every length took about 3.4 KB
+        self.assertLess((after - before) / len(names), 600)
+
+
+if __name__ == "__main__":
+    unittest.main()
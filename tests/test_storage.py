@@ -0,0 +1,239 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from inventory.binary_storage import BinaryFileBackend
+from inventory.inventory_manager import InventoryManager
+from inventory.sqlite_storage import SQLiteBackend
+from inventory.storage import JsonFileBackend, StorageBackend
+
+
+@patch("inventory.inventory_logger.InventoryLogger._open_filestream",
+       lambda *p: None)
+class TestStorage(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.product_data = {
+            "name": "Laptop",
+            "price": 999.99,
+            "quantity": 50,
+            "category": 1
+        }
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def fill(self, inventory: InventoryManager) -> list[int]:
+        cat_id = inventory.add_category("Test category")
+        ids = inventory.bulk_add_products([self.product_data] * 3)
+        inventory.update_product_price(ids[0], 250)
+        inventory.update_product_category(ids[0], cat_id)
+        inventory.update_category_name(cat_id, "Test category 2")
+        inventory.bulk_update([{"id": ids[1], "name": "Notebook",
+                                "quantity": 7}])
+        inventory.remove_product(ids[2])
+        with inventory.transaction() as transaction:
+            transaction.update_product(ids[1], description="Refurbished",
+                                       quantity=5)
+            transaction.update_category_name(cat_id, "Test category 3")
+        return ids
+
+    def test_storage_backend(self):
+        with self.assertRaises(TypeError):
+            StorageBackend()
+        with self.assertRaises(TypeError):
+            InventoryManager().set_storage("data.json")
+        with self.assertRaises(ValueError):
+            InventoryManager().save()
+
+    def test_json_file_backend(self):
+        filename = os.path.join(self.tmpdir.name, "data.json")
+        inventory = InventoryManager()
+        inventory.set_storage(JsonFileBackend(filename))
+        self.fill(inventory)
+        inventory.save()
+
+        loaded = InventoryManager()
+        loaded.set_storage(JsonFileBackend(filename))
+        loaded.load_from_storage()
+        self.assertEqual(loaded.export_to_json(), inventory.export_to_json())
+
+    def test_json_file_backend_backup(self):
+        filename = os.path.join(self.tmpdir.name, "data.json")
+        inventory = InventoryManager()
+        storage = JsonFileBackend(filename, backups=1, checksum=True)
+        inventory.set_storage(storage)
+        ids = self.fill(inventory)
+        inventory.save()
+        expected = inventory.export_to_json()
+        inventory.remove_product(ids[0])
+        inventory.save()
+        with open(filename, "a", encoding="utf-8") as file:
+            file.write(" ")
+
+        for lazy in (False, True):
+            loaded = InventoryManager()
+            loaded.set_storage(JsonFileBackend(filename))
+            loaded.load_from_storage(lazy=lazy)
+            self.assertEqual(loaded.export_to_json(), expected)
+            loaded._storage.close()
+
+    def test_sqlite_backend(self):
+        filename = os.path.join(self.tmpdir.name, "data.db")
+        inventory = InventoryManager()
+        inventory.set_storage(SQLiteBackend(filename))
+        ids = self.fill(inventory)
+
+        # Every change is already stored, without calling save
+        storage = SQLiteBackend(filename)
+        self.assertEqual(storage.product_ids(), ids[:2])
+        self.assertEqual(storage.get_product(ids[0])["price"], 250)
+        self.assertIsNone(storage.get_product(ids[2]))
+        loaded = InventoryManager()
+        loaded.set_storage(storage)
+        loaded.load_from_storage()
+        self.assertEqual(loaded.export_to_json(), inventory.export_to_json())
+        self.assertEqual(loaded.add_product(self.product_data), ids[2] + 1)
+        storage.close()
+        inventory._storage.close()
+
+    def test_migrate_through_save(self):
+        json_file = os.path.join(self.tmpdir.name, "data.json")
+        inventory = InventoryManager()
+        inventory.set_storage(JsonFileBackend(json_file))
+        self.fill(inventory)
+        inventory.save()
+
+        for make_storage in (
+                lambda: SQLiteBackend(os.path.join(self.tmpdir.name,
+                                                   "data.db")),
+                lambda: BinaryFileBackend(os.path.join(self.tmpdir.name,
+                                                       "data.bin"))):
+            migrated = InventoryManager()
+            migrated.set_storage(JsonFileBackend(json_file))
+            migrated.load_from_storage()
+            # The new backend has seen none of the loaded data
+            migrated.set_storage(make_storage())
+            migrated.save()
+            migrated.update_product_price(1, 300)
+            migrated.save()
+            migrated._storage.close()
+
+            loaded = InventoryManager()
+            loaded.set_storage(make_storage())
+            loaded.load_from_storage()
+            self.assertEqual(len(loaded.products), 2)
+            self.assertEqual(loaded.export_to_json(),
+                             migrated.export_to_json())
+            loaded._storage.close()
+
+    def test_sqlite_missing_rows(self):
+        inventory = InventoryManager()
+        ids = self.fill(inventory)
+        with SQLiteBackend(":memory:") as storage:
+            # Changes of rows the database does not have are not lost
+            storage.apply([{"op": "update_product", "id": ids[0],
+                            "field": "price", "value": 1.0,
+                            "last_modified": 0.0}])
+            self.assertTrue(storage.dirty)
+            storage.save_all(inventory.export_to_json())
+            self.assertFalse(storage.dirty)
+            storage.apply([{"op": "remove_product", "id": ids[2]}])
+            self.assertTrue(storage.dirty)
+
+    def test_load_lazy(self):
+        inventory = InventoryManager()
+        ids = self.fill(inventory)
+        json_file = os.path.join(self.tmpdir.name, "data.json")
+        JsonFileBackend(json_file).save_all(inventory.export_to_json())
+        sqlite_backend = SQLiteBackend(":memory:")
+        sqlite_backend.save_all(inventory.export_to_json())
+
+        for storage in (JsonFileBackend(json_file), sqlite_backend):
+            loaded = InventoryManager()
+            loaded.get_total_inventory_value()
+            loaded.set_storage(storage)
+            loaded.load_from_storage(lazy=True)
+            products = loaded.get_products()
+            self.assertEqual(products.unloaded, 2)
+            self.assertEqual(loaded.products, ids[:2])
+            self.assertTrue(loaded.product_exists(ids[0]))
+            self.assertEqual(products.unloaded, 2)
+
+            product = loaded.find_product_by_id(ids[0])
+            self.assertEqual(product.price, 250)
+            self.assertEqual(products.unloaded, 1)
+            self.assertFalse(products.is_loaded(ids[1]))
+            # Values computed before the lazy load include new products
+            self.assertEqual(loaded.get_total_inventory_value(),
+                             inventory.get_total_inventory_value())
+            self.assertEqual(products.unloaded, 0)
+            self.assertEqual(loaded.export_to_json(),
+                             inventory.export_to_json())
+            self.assertEqual(loaded.add_product(self.product_data),
+                             ids[2] + 1)
+            storage.close()
+
+    def test_load_lazy_compact_journal(self):
+        inventory = InventoryManager()
+        self.fill(inventory)
+        json_file = os.path.join(self.tmpdir.name, "data.json")
+        journal_file = os.path.join(self.tmpdir.name, "data.journal")
+        JsonFileBackend(json_file).save_all(inventory.export_to_json())
+        loaded = InventoryManager()
+        loaded.set_storage(JsonFileBackend(json_file))
+        loaded.enable_journal(journal_file, json_file, backups=1)
+        loaded.load_from_storage(lazy=True)
+        self.assertIsNotNone(loaded._storage._file)
+        # The snapshot replaces the file the lazy reads were kept open on
+        loaded.compact_journal()
+        self.assertIsNone(loaded._storage._file)
+        self.assertEqual(loaded.export_to_json(), inventory.export_to_json())
+        loaded.disable_journal()
+        reloaded = InventoryManager()
+        reloaded.set_storage(JsonFileBackend(json_file))
+        reloaded.load_from_storage(lazy=True)
+        self.assertEqual(reloaded.export_to_json(),
+                         inventory.export_to_json())
+        reloaded._storage.close()
+
+    def test_load_lazy_compressed(self):
+        inventory = InventoryManager()
+        ids = self.fill(inventory)
+        for filename, layout in (("data.json.gz", "records"),
+                                 ("data.json.xz", "columnar"),
+                                 ("data.json", "columnar")):
+            filename = os.path.join(self.tmpdir.name, filename)
+            JsonFileBackend(filename, layout=layout).save_all(
+                inventory.export_to_json())
+            loaded = InventoryManager()
+            loaded.set_storage(JsonFileBackend(filename))
+            loaded.load_from_storage(lazy=True)
+            self.assertEqual(loaded.get_products().unloaded, 2)
+            self.assertEqual(loaded.find_product_by_id(ids[0]).price, 250)
+            self.assertEqual(loaded.export_to_json(),
+                             inventory.export_to_json())
+            loaded._storage.close()
+
+    def test_sqlite_save_all(self):
+        inventory = InventoryManager()
+        self.fill(inventory)
+        with SQLiteBackend(":memory:") as storage:
+            storage.save_all(inventory.export_to_json())
+            loaded = InventoryManager()
+            loaded.load_data_from_json(storage.load())
+            self.assertEqual(loaded.export_to_json(),
+                             inventory.export_to_json())
+
+    def test_sqlite_apply_rollback(self):
+        with SQLiteBackend(":memory:") as storage:
+            with self.assertRaises(ValueError):
+                storage.apply([
+                    {"op": "add_category", "id": 1, "name": "Test"},
+                    {"op": "unknown"}
+                ])
+            self.assertEqual(list(storage.load()), [("sequences", {})])
+
+
+if __name__ == "__main__":
+    unittest.main()
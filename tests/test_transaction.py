@@ -0,0 +1,28 @@
+import unittest
+from inventory.transaction import Transaction
+
+
+class TestTransaction(unittest.TestCase):
+    def test_stage(self):
+        transaction = Transaction()
+        self.assertEqual(len(transaction), 0)
+        transaction.update_product(1, name="Pen", price=1.5)
+        transaction.update_product(1, price=2.0)
+        transaction.update_category_name(3, "Office")
+        self.assertEqual(transaction.products,
+                         {1: {"name": "Pen", "price": 2.0}})
+        self.assertEqual(transaction.categories, {3: "Office"})
+        self.assertEqual(len(transaction), 2)
+        # The returned dictionaries are copies
+        transaction.products[1]["name"] = "Pencil"
+        self.assertEqual(transaction.products[1]["name"], "Pen")
+
+    def test_unknown_field(self):
+        transaction = Transaction()
+        with self.assertRaises(ValueError):
+            transaction.update_product(1, color="red")
+        self.assertEqual(transaction.products, {})
+
+
+if __name__ == "__main__":
+    unittest.main()